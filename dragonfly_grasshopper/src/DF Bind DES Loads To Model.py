@@ -28,6 +28,13 @@ software interface.
             bound to it for simulation of a District Energy System (DES).
         _scenario: The path to the URBANopt .csv file for the scenario. This CSV
             file can be obtained form the "DF Run URBANopt" component.
+        worker_: Set to True to send requests for CPython to a persistent worker
+            process, which stays running for the Rhino session with the
+            dragonfly_energy library already imported. This avoids the start-up
+            time of a new CPython process on each run of the component, which
+            happens on Mac. If the worker fails or does not respond within 10
+            minutes, it is stopped and a new process is used like usual.
+            (Default: False).
 
     Returns:
         model: The input Dragonfly Model with DES loads assigned to it. The Model
@@ -38,15 +45,18 @@ software interface.
 
 ghenv.Component.Name = 'DF Bind DES Loads To Model'
 ghenv.Component.NickName = 'BindDESLoads'
-ghenv.Component.Message = '1.10.1'
+ghenv.Component.Message = '1.10.4'
 ghenv.Component.Category = 'Dragonfly'
 ghenv.Component.SubCategory = '5 :: District Thermal'
 ghenv.Component.AdditionalHelpFromDocStrings = '0'
 
 import os
 import subprocess
+import threading
 import json
 
+import scriptcontext as sc
+
 try:
     from ladybug.datacollection import HourlyContinuousCollection
 except ImportError as e:
@@ -68,6 +78,108 @@ except ImportError as e:
     raise ImportError('\nFailed to import ladybug_rhino:\n\t{}'.format(e))
 
 
+# sticky key of the persistent CPython worker and the script that it runs
+WORKER_KEY = 'dragonfly_cpython_worker'
+WORKER_SCRIPT = '''
+import io, json, os, runpy, sys, traceback
+import honeybee_energy.cli, dragonfly_energy.cli
+# move the request and response pipes off of the standard file descriptors such
+# that commands and their sub-processes can neither read requests nor write responses
+requests, responses = os.fdopen(os.dup(0), 'r'), os.fdopen(os.dup(1), 'wb')
+os.dup2(os.open(os.devnull, os.O_RDONLY), 0)
+os.dup2(2, 1)
+sys.stdin = open(os.devnull)
+for line in requests:
+    argv, code, out, err = json.loads(line), 0, io.BytesIO(), io.BytesIO()
+    sys.argv = argv[1:] if argv[0] == '-m' else argv
+    sys.stdout = io.TextIOWrapper(out, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(err, encoding='utf-8')
+    try:
+        if argv[0] == '-m':
+            runpy.run_module(argv[1], run_name='__main__', alter_sys=True)
+        else:
+            runpy.run_path(argv[0], run_name='__main__')
+    except SystemExit as e:
+        code = 0 if e.code is None else e.code if isinstance(e.code, int) else 1
+    except Exception:
+        code = 1
+        traceback.print_exc()
+    sys.stdout.flush()
+    sys.stderr.flush()
+    data, err_data = out.getvalue(), err.getvalue()
+    sys.stdout, sys.stderr = sys.__stdout__, sys.__stderr__
+    head = '%d %d %d\\n' % (code, len(data), len(err_data))
+    responses.write(head.encode('ascii') + data + err_data)
+    responses.flush()
+'''
+WORKER_TIMEOUT = 600  # seconds to wait for a response from the worker
+
+
+def worker_process():
+    """Get the CPython worker of this Rhino session, starting it if it is not running."""
+    worker = sc.sticky.get(WORKER_KEY)
+    if worker is None or worker.poll() is not None:
+        custom_env = os.environ.copy()
+        custom_env['PYTHONHOME'] = ''
+        worker = subprocess.Popen(
+            [folders.python_exe_path, '-c', WORKER_SCRIPT], env=custom_env,
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        sc.sticky[WORKER_KEY] = worker
+    return worker
+
+
+def read_response(worker):
+    """Read the stdout and stderr of a command from the worker.
+
+    The response is read on a separate thread such that an exception is raised
+    if the worker does not respond within WORKER_TIMEOUT seconds.
+    """
+    response = []
+
+    def read():
+        try:
+            code, out_len, err_len = worker.stdout.readline().split()
+            response.append(
+                (worker.stdout.read(int(out_len)), worker.stdout.read(int(err_len))))
+        except Exception:
+            pass  # the worker has died or was killed
+
+    reader = threading.Thread(target=read)
+    reader.daemon = True
+    reader.start()
+    reader.join(WORKER_TIMEOUT)
+    if len(response) == 0:
+        raise IOError('The CPython worker did not respond.')
+    return response[0]
+
+
+def run_cli(cmds):
+    """Run a CPython command and return its stdout and stderr.
+
+    If worker_ is True, the command is sent to the persistent worker, which
+    already has the honeybee_energy and dragonfly_energy libraries imported.
+    Should the worker fail or hang, it is killed and the command is run in
+    a new process.
+    """
+    if worker_:
+        try:
+            worker = worker_process()
+            worker.stdin.write(json.dumps(cmds[1:]) + '\n')
+            worker.stdin.flush()
+            return read_response(worker)
+        except Exception:  # the worker has died or hung; use a new process
+            worker = sc.sticky.pop(WORKER_KEY, None)
+            if worker is not None and worker.poll() is None:
+                worker.kill()
+    use_shell = True if os.name == 'nt' else False
+    custom_env = os.environ.copy()
+    custom_env['PYTHONHOME'] = ''
+    process = subprocess.Popen(
+        cmds, stdout=subprocess.PIPE, stderr=subprocess.PIPE, shell=use_shell,
+        env=custom_env)
+    return process.communicate()
+
+
 if all_required_inputs(ghenv.Component):
     # duplicate the input model
     assert isinstance(_model, Model), 'Expected Dragonfly Model. ' \
@@ -82,11 +194,12 @@ if all_required_inputs(ghenv.Component):
         # Execute the honybee CLI to obtain the results via CPython
         cmds = [folders.python_exe_path, '-m', 'dragonfly_energy', 'translate',
                 'building-district-loads', _scenario, '--loads-to-log']
-        custom_env = os.environ.copy()
-        custom_env['PYTHONHOME'] = ''
-        process = subprocess.Popen(cmds, stdout=subprocess.PIPE, env=custom_env)
-        stdout = process.communicate()
-        res_dict = json.loads(stdout[0])
+        stdout, stderr = run_cli(cmds)
+        try:
+            res_dict = json.loads(stdout)
+        except ValueError:
+            raise ValueError(
+                'Failed to get the building loads with CPython:\n{}'.format(stderr))
         warnings = res_dict['warnings']
         building_loads = res_dict['building_loads']
         for building in model.buildings:
@@ -26,6 +26,15 @@ results.
         period_: A Ladybug analysis period to be applied to all of the input _data.
         legend_par_: An optional LegendParameter object to change the display
             of the colored output. (Default: None).
+        animate_: Set to True to use an animation mode, which is useful for
+            scrubbing through the sim_step_ with a slider. In this mode,
+            the _data is matched to the _network geometry only once and the
+            colors of all simulation steps are precomputed. Changing the
+            sim_step_ then only updates the colors of the existing geometry.
+            Note that, when in this mode, the legend uses the minimum and
+            maximum across all steps (unless they are set in the legend_par_)
+            such that the colors are comparable between steps. This input
+            has no effect unless the sim_step_ is an integer. (Default: False).
 
     Returns:
         vis_geo: Meshes and line segments colored according to the results.
@@ -41,17 +50,29 @@ results.
 
 ghenv.Component.Name = 'DF Color Network Results'
 ghenv.Component.NickName = 'ColorNetResults'
-ghenv.Component.Message = '1.10.0'
+ghenv.Component.Message = '1.10.1'
 ghenv.Component.Category = 'Dragonfly'
 ghenv.Component.SubCategory = '4 :: Electric Grid'
 ghenv.Component.AdditionalHelpFromDocStrings = '4'
 
+from array import array
+
+try:  # import the module for caching geometry in the Rhino session
+    import scriptcontext as sc
+except ImportError as e:
+    raise ImportError('\nFailed to import scriptcontext:\n\t{}'.format(e))
+
 try:  # import the ladybug_geometry dependencies
     from ladybug_geometry.geometry2d import Polygon2D, Polyline2D, LineSegment2D
     from ladybug_geometry.geometry3d import Face3D, Point3D
 except ImportError as e:
     raise ImportError('\nFailed to import ladybug_geometry:\n\t{}'.format(e))
 
+try:  # import the ladybug dependencies
+    from ladybug.graphic import GraphicContainer
+except ImportError as e:
+    raise ImportError('\nFailed to import ladybug:\n\t{}'.format(e))
+
 try:  # import the core dragonfly dependencies
     from dragonfly_energy.opendss.colorobj import ColorNetworkResults
 except ImportError as e:
@@ -63,40 +84,158 @@ try:  # import the ladybug_rhino dependencies
     from ladybug_rhino.colorize import ColoredPolyline, ColoredLine
     from ladybug_rhino.text import text_objects
     from ladybug_rhino.fromobjects import legend_objects
-    from ladybug_rhino.color import color_to_color
-    from ladybug_rhino.grasshopper import all_required_inputs, schedule_solution
+    from ladybug_rhino.color import color_to_color, argb_color_to_color
+    from ladybug_rhino.grasshopper import all_required_inputs, schedule_solution, \
+        recommended_processor_count, run_function_in_parallel
 except ImportError as e:
     raise ImportError('\nFailed to import ladybug_rhino:\n\t{}'.format(e))
 
 
+def network_geometry(geo_obj, col):
+    """Get a colored Rhino display object for a geometry of an ElectricalNetwork."""
+    if isinstance(geo_obj, Polygon2D):
+        face_obj = Face3D([Point3D(pt.x, pt.y, 0) for pt in geo_obj.vertices])
+        return from_face3ds_to_colored_mesh([face_obj], col)
+    elif isinstance(geo_obj, Polyline2D):
+        col_line = ColoredPolyline(from_polyline2d(geo_obj))
+    elif isinstance(geo_obj, LineSegment2D):
+        col_line = ColoredLine(from_linesegment2d(geo_obj))
+    else:
+        return None
+    col_line.color = color_to_color(col)
+    col_line.thickness = 3
+    return col_line
+
+
+def recolor_geometry(geo, col):
+    """Update the color of a display object created with network_geometry."""
+    if isinstance(geo, (ColoredPolyline, ColoredLine)):
+        geo.color = color_to_color(col)
+    elif geo is not None:
+        geo.VertexColors.CreateMonotoneMesh(argb_color_to_color(col))
+
+
+def animation_scene(data, network, legend_par, period):
+    """Match data to a network and precompute the colors of all simulation steps.
+
+    Args:
+        data: A list of data collections to color the network.
+        network: The ElectricalNetwork to be colored.
+        legend_par: Optional LegendParameters for the colors.
+        period: An optional AnalysisPeriod to be applied to the data.
+
+    Returns:
+        A dictionary with the following keys.
+
+        -   color_obj -- The ColorNetworkResults matching the data to the network.
+
+        -   graphic -- A GraphicContainer with the legend used for all steps.
+
+        -   legend -- The Rhino geometry of the legend.
+
+        -   geometry -- A list of Rhino display objects for the matched geometry.
+
+        -   palette -- A list of ladybug Colors that can be assigned to geometry.
+
+        -   indices -- A list with an array of palette indices for each
+            matched geometry, which has one item per simulation step.
+    """
+    # match the data to the network
+    if period is not None:
+        data = [coll.filter_by_analysis_period(period) for coll in data]
+    color_obj = ColorNetworkResults(data, network, legend_par, '0')
+    matched_vals = [dat.values for dat in color_obj.matched_data]
+
+    # set up a legend that spans the values of all steps
+    l_par = color_obj.legend_parameters
+    if l_par.min is None:
+        l_par.min = min(min(vals) for vals in matched_vals)
+    if l_par.max is None:
+        l_par.max = max(max(vals) for vals in matched_vals)
+    graphic = GraphicContainer(
+        [vals[0] for vals in matched_vals], color_obj.min_point,
+        color_obj.max_point, l_par, color_obj.data_type, str(color_obj.unit))
+    l_par = graphic.legend_parameters
+
+    # sample the colors of the legend into a palette
+    color_range = graphic.legend.color_range
+    v_min, v_max = l_par.min, l_par.max
+    v_step = (v_max - v_min) / float(PALETTE_SIZE - 1)
+    palette = [color_range.color(v_min + i * v_step) for i in range(PALETTE_SIZE)]
+    scale = 1 / v_step if v_step != 0 else 0
+    last = PALETTE_SIZE - 1
+
+    # compute the palette index of each geometry at each step
+    indices = [None] * len(matched_vals)
+
+    def index_values(count):
+        indices[count] = array('B', [
+            0 if v <= v_min else last if v >= v_max else
+            int(round((v - v_min) * scale)) for v in matched_vals[count]])
+
+    run_function_in_parallel(
+        index_values, len(matched_vals), recommended_processor_count())
+
+    # create the display geometry with the colors of the first step
+    geometry = [network_geometry(geo, palette[ind[0]]) for geo, ind in
+                zip(color_obj.matched_geometries, indices)]
+    return {
+        'color_obj': color_obj, 'graphic': graphic,
+        'legend': legend_objects(graphic.legend), 'geometry': geometry,
+        'palette': palette, 'indices': indices
+    }
+
+
+# sticky key under which the geometry and colors of the animation mode are cached
+SCENE_KEY = 'dragonfly_network_animation'
+# number of colors that are sampled from the legend in the animation mode
+PALETTE_SIZE = 256
+
+
 if all_required_inputs(ghenv.Component):
-    # apply analysis period to the data if connected
-    if period_ is not None:
-        _data = [coll.filter_by_analysis_period(period_) for coll in _data]
-
-    # create the ColorNetwork visualization object and output geometry
-    sim_step = 'max' if sim_step_ is None else sim_step_
-    color_obj = ColorNetworkResults(_data, _network, legend_par_, sim_step)
-    graphic = color_obj.graphic_container
-    vis_geo = []
-    for geo_obj, col in zip(color_obj.matched_geometries, graphic.value_colors):
-        if isinstance(geo_obj, Polygon2D):
-            face_obj = Face3D([Point3D(pt.x, pt.y, 0) for pt in geo_obj.vertices])
-            vis_geo.append(from_face3ds_to_colored_mesh([face_obj], col))
-        elif isinstance(geo_obj, Polyline2D):
-            col_line = ColoredPolyline(from_polyline2d(geo_obj))
-            col_line.color = color_to_color(col)
-            col_line.thickness = 3
-            vis_geo.append(col_line)
-        elif isinstance(geo_obj, LineSegment2D):
-            col_line = ColoredLine(from_linesegment2d(geo_obj))
-            col_line.color = color_to_color(col)
-            col_line.thickness = 3
-            vis_geo.append(col_line)
-    legend = legend_objects(graphic.legend)
-    title = text_objects(color_obj.title_text, graphic.lower_title_location,
-                         graphic.legend_parameters.text_height,
-                         graphic.legend_parameters.font)
-    values = color_obj.matched_values
-    colors = [color_to_color(col) for col in graphic.value_colors]
-    schedule_solution(ghenv.Component, 2)
\ No newline at end of file
+    if animate_ and str(sim_step_).isdigit():
+        # get the cached scene or create it if the inputs have changed
+        inputs = tuple(_data) + (_network, period_, legend_par_)
+        scene_key = '{}_{}'.format(SCENE_KEY, ghenv.Component.InstanceGuid)
+        cached = sc.sticky.get(scene_key)
+        if cached is None or len(cached[0]) != len(inputs) or \
+                not all(a is b for a, b in zip(cached[0], inputs)):
+            cached = sc.sticky[scene_key] = \
+                (inputs, animation_scene(_data, _network, legend_par_, period_))
+        scene = cached[1]
+
+        # update the colors of the cached geometry for the simulation step
+        color_obj, graphic = scene['color_obj'], scene['graphic']
+        color_obj.attribute = sim_step_
+        step, palette = color_obj.attribute, scene['palette']
+        step_cols = [palette[ind[step]] for ind in scene['indices']]
+        for geo, col in zip(scene['geometry'], step_cols):
+            recolor_geometry(geo, col)
+        vis_geo = [geo for geo in scene['geometry'] if geo is not None]
+        legend = scene['legend']
+        title = text_objects(color_obj.title_text, graphic.lower_title_location,
+                             graphic.legend_parameters.text_height,
+                             graphic.legend_parameters.font)
+        values = color_obj.matched_values
+        colors = [color_to_color(col) for col in step_cols]
+    else:
+        # apply analysis period to the data if connected
+        if period_ is not None:
+            _data = [coll.filter_by_analysis_period(period_) for coll in _data]
+
+        # create the ColorNetwork visualization object and output geometry
+        sim_step = 'max' if sim_step_ is None else sim_step_
+        color_obj = ColorNetworkResults(_data, _network, legend_par_, sim_step)
+        graphic = color_obj.graphic_container
+        vis_geo = []
+        for geo_obj, col in zip(color_obj.matched_geometries, graphic.value_colors):
+            geo = network_geometry(geo_obj, col)
+            if geo is not None:
+                vis_geo.append(geo)
+        legend = legend_objects(graphic.legend)
+        title = text_objects(color_obj.title_text, graphic.lower_title_location,
+                             graphic.legend_parameters.text_height,
+                             graphic.legend_parameters.font)
+        values = color_obj.matched_values
+        colors = [color_to_color(col) for col in graphic.value_colors]
+    schedule_solution(ghenv.Component, 2)
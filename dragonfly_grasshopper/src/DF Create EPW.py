@@ -10,6 +10,9 @@
 """
 Create a custom EPW object from a location and data collections of annual
 hourly data.
+_
+All of the input data collections are validated together before any data is
+assigned to the EPW and every invalid input is listed in the error message.
 -
 
     Args:
@@ -49,7 +52,7 @@ hourly data.
 
 ghenv.Component.Name = 'DF Create EPW'
 ghenv.Component.NickName = 'CreateEPW'
-ghenv.Component.Message = '1.10.0'
+ghenv.Component.Message = '1.10.1'
 ghenv.Component.Category = "Dragonfly"
 ghenv.Component.SubCategory = '6 :: AlternativeWeather'
 ghenv.Component.AdditionalHelpFromDocStrings = '3'
@@ -79,19 +82,38 @@ except ImportError as e:
     raise ImportError('\nFailed to import ladybug_rhino:\n\t{}'.format(e))
 
 
-def check_data(name, data_coll, data_type, unit, is_leap_year):
-    assert isinstance(data_coll, HourlyContinuousCollection), \
-        '{} must be an hourly continuous data collection. Got {}.'.format(
-            name, type(data_coll))
-    assert data_coll.header.analysis_period.is_annual, '{} analysis_period must ' \
-        'be annual. Got {}'.format(header.analysis_period)
-    assert data_coll.header.analysis_period.is_leap_year == is_leap_year, \
-        '{} analysis_period must is_leap_year must match across input data collections.'
-    assert isinstance(data_coll.header.data_type, data_type), '{} data_type is not {}. '\
-        'Got {}.'.format(name, data_type(), data_coll.header.data_type)
-    assert data_coll.header.unit == unit, '{} unit is not {}. '\
-        'Got {}.'.format(name, unit, data_coll.header.unit)
-    return data_coll.values
+def validate_columns(columns, is_leap_year):
+    """Validate all of the input data collections in a single pass.
+
+    Args:
+        columns: A list of tuples with the input name, data collection, data type,
+            unit and EPW attributes of each input. The data type and unit can
+            be None to only check that the data collection is annual and hourly.
+        is_leap_year: Boolean for whether the data collections are for a leap year.
+
+    Returns:
+        A list of messages for all of the invalid data collections.
+    """
+    errors = []
+    for name, data_coll, data_type, unit, _ in columns:
+        if not isinstance(data_coll, HourlyContinuousCollection):
+            errors.append('{} must be an hourly continuous data collection. '
+                          'Got {}.'.format(name, type(data_coll)))
+            continue
+        header = data_coll.header
+        a_per = header.analysis_period
+        if not a_per.is_annual or a_per.timestep != 1:
+            errors.append('{} analysis_period must be annual and hourly. '
+                          'Got {}.'.format(name, a_per))
+        elif a_per.is_leap_year != is_leap_year:
+            errors.append('{} analysis_period is_leap_year must match across '
+                          'input data collections.'.format(name))
+        if data_type is not None and not isinstance(header.data_type, data_type):
+            errors.append('{} data_type is not {}. Got {}.'.format(
+                name, data_type(), header.data_type))
+        if unit is not None and header.unit != unit:
+            errors.append('{} unit is not {}. Got {}.'.format(name, unit, header.unit))
+    return errors
 
 
 if all_required_inputs(ghenv.Component) and _run:
@@ -106,46 +128,42 @@ if all_required_inputs(ghenv.Component) and _run:
             leap_yr = False
         epw_obj = EPW.from_missing_values(is_leap_year=leap_yr)
 
+    # validate all of the input data collections in one pass
+    columns = [
+        ('_dry_bulb_temp_', _dry_bulb_temp_, Temperature, 'C',
+         ('dry_bulb_temperature',)),
+        ('_dew_point_temp_', _dew_point_temp_, Temperature, 'C',
+         ('dew_point_temperature',)),
+        ('_wind_speed_', _wind_speed_, Speed, 'm/s', ('wind_speed',)),
+        ('_wind_direction_', _wind_direction_, Angle, 'degrees', ('wind_direction',)),
+        ('_direct_normal_rad_', _direct_normal_rad_, None, None,
+         ('direct_normal_radiation',)),
+        ('_diffuse_horiz_rad_', _diffuse_horiz_rad_, None, None,
+         ('diffuse_horizontal_radiation',)),
+        ('_horiz_infrared_rad_', _horiz_infrared_rad_, EnergyFlux, 'W/m2',
+         ('horizontal_infrared_radiation_intensity',)),
+        ('_direct_normal_ill_', _direct_normal_ill_, Illuminance, 'lux',
+         ('direct_normal_illuminance',)),
+        ('_diffuse_horiz_ill_', _diffuse_horiz_ill_, Illuminance, 'lux',
+         ('diffuse_horizontal_illuminance',)),
+        ('_total_sky_cover_', _total_sky_cover_, Fraction, 'tenths',
+         ('total_sky_cover', 'opaque_sky_cover')),
+        ('_atmos_pressure_', _atmos_pressure_, Pressure, 'Pa',
+         ('atmospheric_station_pressure',)),
+        ('_visibility_', _visibility_, Distance, 'km', ('visibility',)),
+        ('_ceiling_height_', _ceiling_height_, Distance, 'm', ('ceiling_height',)),
+        ('_model_year_', _model_year_, None, None, ())
+    ]
+    columns = [col for col in columns if col[1]]
+    errors = validate_columns(columns, leap_yr)
+    if len(errors) != 0:
+        raise ValueError('\n'.join(errors))
+
     # assign data to the EPW
     epw_obj.location = _location
-    if _dry_bulb_temp_:
-        epw_obj.dry_bulb_temperature.values = check_data(
-            '_dry_bulb_temp_', _dry_bulb_temp_, Temperature, 'C', leap_yr)
-    if _dew_point_temp_:
-        epw_obj.dew_point_temperature.values = check_data(
-            '_dew_point_temp_', _dew_point_temp_, Temperature, 'C', leap_yr)
-    if _wind_speed_:
-        epw_obj.wind_speed.values = check_data(
-            '_wind_speed_', _wind_speed_, Speed, 'm/s', leap_yr)
-    if _wind_direction_:
-        epw_obj.wind_direction.values = check_data(
-            '_wind_direction_', _wind_direction_, Angle, 'degrees', leap_yr)
-    if _direct_normal_rad_:
-        epw_obj.direct_normal_radiation.values = _direct_normal_rad_.values
-    if _diffuse_horiz_rad_:
-        epw_obj.diffuse_horizontal_radiation.values = _diffuse_horiz_rad_.values
-    if _horiz_infrared_rad_:
-        epw_obj.horizontal_infrared_radiation_intensity.values = check_data(
-            '_horiz_infrared_rad_', _horiz_infrared_rad_, EnergyFlux, 'W/m2', leap_yr)
-    if _direct_normal_ill_:
-        epw_obj.direct_normal_illuminance.values = check_data(
-            '_direct_normal_ill_', _direct_normal_ill_, Illuminance, 'lux', leap_yr)
-    if _diffuse_horiz_ill_:
-        epw_obj.diffuse_horizontal_illuminance.values = check_data(
-            '_diffuse_horiz_ill_', _diffuse_horiz_ill_, Illuminance, 'lux', leap_yr)
-    if _total_sky_cover_:
-        epw_obj.total_sky_cover.values = check_data(
-            '_total_sky_cover_', _total_sky_cover_, Fraction, 'tenths', leap_yr)
-        epw_obj.opaque_sky_cover.values = _total_sky_cover_.values
-    if _atmos_pressure_:
-        epw_obj.atmospheric_station_pressure.values = check_data(
-            '_atmos_pressure_', _atmos_pressure_, Pressure, 'Pa', leap_yr)
-    if _visibility_:
-        epw_obj.visibility.values = check_data(
-            '_visibility_', _visibility_, Distance, 'km', leap_yr)
-    if _ceiling_height_:
-        epw_obj.ceiling_height.values = check_data(
-            '_ceiling_height_', _ceiling_height_, Distance, 'm', leap_yr)
+    for name, data_coll, data_type, unit, epw_attrs in columns:
+        for epw_attr in epw_attrs:
+            getattr(epw_obj, epw_attr).values = data_coll.values
     if _model_year_:
         epw_obj.years.values = [int(val) for val in _model_year_.values]
 
@@ -43,7 +43,10 @@ https://simulationresearch.lbl.gov/modelica/
             Modelica model.
         run_: Set to "True" to simulate the IDF of the DES in EnergyPlus after it is written.
             This will ensure that all result files appear in their respective
-            outputs from this component.
+            outputs from this component. While the simulation runs, the
+            component message shows the months of the run period that are
+            done along with the estimated time remaining and this progress is
+            also written to a progress.json in the des_energyplus folder.
 
     Returns:
         report: Reports, errors, warnings, etc.
@@ -69,14 +72,27 @@ https://simulationresearch.lbl.gov/modelica/
 
 ghenv.Component.Name = 'DF Export District Energy System'
 ghenv.Component.NickName = 'ExportDES'
-ghenv.Component.Message = '1.10.5'
+ghenv.Component.Message = '1.10.9'
 ghenv.Component.Category = 'Dragonfly'
 ghenv.Component.SubCategory = '5 :: District Thermal'
 ghenv.Component.AdditionalHelpFromDocStrings = '1'
 
 import os
+import re
 import subprocess
 import json
+import time
+import threading
+
+try:  # import the module for caching the dependency manifest in the Rhino session
+    import scriptcontext as sc
+except ImportError as e:
+    raise ImportError('\nFailed to import scriptcontext:\n\t{}'.format(e))
+
+try:  # import the Grasshopper canvas to repaint it while the simulation runs
+    from Grasshopper import Instances
+except ImportError as e:
+    raise ImportError('\nFailed to import Grasshopper:\n\t{}'.format(e))
 
 try:
     from ladybug.futil import nukedir
@@ -108,6 +124,264 @@ try:
 except ImportError as e:
     raise ImportError('\nFailed to import ladybug_rhino:\n\t{}'.format(e))
 
+
+def package_paths(dist_name, version, script):
+    """Get the paths to an installed package in the ladybug tools Python environment.
+
+    Args:
+        dist_name: Text for the name of the dist-info folder of the package.
+        version: Text for the version of the package.
+        script: Text for the name of the command line script of the package.
+            None if the package has no script.
+
+    Returns:
+        A dictionary with the version and the paths to the dist-info folder and
+        the script of the package. None if the package is not installed.
+    """
+    dist_info = os.path.join(
+        folders.python_package_path, '{}-{}.dist-info'.format(dist_name, version))
+    if not os.path.isdir(dist_info):
+        return None
+    script_path = None
+    if script is not None:
+        ext = '.exe' if os.name == 'nt' else ''
+        script_path = os.path.join(folders.python_scripts_path, script + ext)
+        if not os.path.isfile(script_path):
+            return None
+    return {'version': version, 'dist_info': dist_info, 'script': script_path}
+
+
+def pip_install(requirements, offline=False):
+    """Install several packages with a single call to pip.
+
+    Args:
+        requirements: A list of pip requirements (eg. "ghedesigner==1.5").
+        offline: Boolean to note whether the packages should only be installed
+            from the WHEELHOUSE folder without the use of the package index.
+
+    Returns:
+        The stderr of the pip call.
+    """
+    pip_args = ['install'] + list(requirements)
+    if os.path.isdir(WHEELHOUSE):
+        pip_args.extend(['--find-links', WHEELHOUSE])
+        if offline:
+            pip_args.append('--no-index')
+    pip_str = ' '.join('"{}"'.format(a) if ' ' in a else a for a in pip_args)
+    executor_path = os.path.join(
+        lb_folders.ladybug_tools_folder, 'grasshopper',
+        'ladybug_grasshopper_dotnet', 'Ladybug.Executor.exe')
+    if os.name == 'nt' and os.path.isfile(executor_path) and \
+            'Program Files' in executor_path:
+        pip_cmd = [
+            executor_path, folders.python_exe_path, '-m pip {}'.format(pip_str)
+        ]
+    elif os.name == 'nt':
+        pip_cmd = '"{py_exe}" -m pip {pip_args}'.format(
+            py_exe=folders.python_exe_path, pip_args=pip_str)
+    else:
+        pip_cmd = [folders.python_exe_path, '-m', 'pip'] + pip_args
+    custom_env = os.environ.copy()
+    custom_env['PYTHONHOME'] = ''
+    shell = True if os.name == 'nt' else False
+    process = subprocess.Popen(
+        pip_cmd, stderr=subprocess.PIPE, shell=shell, env=custom_env)
+    return process.communicate()[1]
+
+
+def ensure_packages(packages):
+    """Make sure that packages are installed in the ladybug tools Python environment.
+
+    Each package is only probed the first time that it is requested in the
+    Rhino session and the result is recorded in a manifest that is shared
+    by all components. All missing packages are installed with a single call to
+    pip, which first tries the wheels in the WHEELHOUSE folder if it exists.
+
+    Args:
+        packages: A list of tuples for the packages to check. Each tuple has the
+            pip name, the version, the name of the dist-info folder and the
+            name of the command line script of the package (or None).
+
+    Returns:
+        The manifest dictionary with the pip names of the packages as keys and
+        dictionaries of their version and paths as values.
+    """
+    try:
+        manifest = sc.sticky[MANIFEST_KEY]
+    except KeyError:
+        manifest = sc.sticky[MANIFEST_KEY] = {}
+    missing, probed = [], False
+    for name, version, dist_name, script in packages:
+        if name in manifest and manifest[name]['version'] == version:
+            continue
+        probed = True
+        paths = package_paths(dist_name, version, script)
+        if paths is None:
+            missing.append((name, version, dist_name, script))
+        else:
+            manifest[name] = paths
+
+    # install all missing packages together, trying the wheelhouse first
+    stderr = None
+    modes = (True, False) if os.path.isdir(WHEELHOUSE) else (False,)
+    for offline in modes:
+        if len(missing) == 0:
+            break
+        requirements = ['{}=={}'.format(m[0], m[1]) for m in missing]
+        stderr = pip_install(requirements, offline)
+        still_missing = []
+        for name, version, dist_name, script in missing:
+            paths = package_paths(dist_name, version, script)
+            if paths is None:
+                still_missing.append((name, version, dist_name, script))
+            else:
+                manifest[name] = paths
+        missing = still_missing
+    if probed:
+        save_manifest(manifest)
+    if len(missing) != 0:
+        raise ValueError('Failed to install {}:\n{}'.format(
+            ', '.join('{}=={}'.format(m[0], m[1]) for m in missing), stderr))
+    return manifest
+
+
+def save_manifest(manifest):
+    """Write the manifest of installed dependencies to MANIFEST_FILE."""
+    if os.path.isdir(os.path.dirname(MANIFEST_FILE)):
+        with open(MANIFEST_FILE, 'w') as outf:
+            json.dump(manifest, outf, indent=2)
+
+
+def read_lines(pipe, lines):
+    """Read all of the lines of a pipe into a list until the pipe is closed."""
+    for line in iter(pipe.readline, b''):
+        lines.append(line.decode('utf-8', 'ignore') if isinstance(line, bytes) else line)
+    pipe.close()
+
+
+def format_time(seconds):
+    """Get a short text representation of a number of seconds."""
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours != 0:
+        return '{}h{:02d}m'.format(hours, minutes)
+    return '{}m{:02d}s'.format(minutes, seconds) if minutes != 0 else '{}s'.format(seconds)
+
+
+def run_with_progress(cmds, progress_file, count_progress=None, unit='',
+                      shell=False, env=None):
+    """Run a command while reporting its progress in the component message.
+
+    The stdout and stderr of the command are read on background threads so
+    that the component message can be refreshed and a progress JSON can be
+    written while the command runs. The JSON has the status, the elapsed time,
+    the seconds since the progress last changed and the last line of output
+    such that a hung run can be told apart from a slow one.
+
+    Args:
+        cmds: The command to be run, which will be passed to subprocess.Popen.
+        progress_file: The path to a JSON file where the progress is written.
+        count_progress: An optional function that accepts the lines of stdout
+            read so far and returns a tuple with the number of units done, the
+            total number of units and the number of units that failed. If None,
+            only the elapsed time will be reported. (Default: None).
+        unit: Text for the name of the units that are counted. (Default: '').
+        shell: Boolean for whether the command is executed through the
+            shell. (Default: False).
+        env: An optional dictionary of environment variables. (Default: None).
+
+    Returns:
+        A tuple with the return code, the stdout and the stderr of the command.
+    """
+    process = subprocess.Popen(cmds, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                               shell=shell, env=env)
+    out_lines, err_lines = [], []
+    readers = []
+    for pipe, lines in ((process.stdout, out_lines), (process.stderr, err_lines)):
+        reader = threading.Thread(target=read_lines, args=(pipe, lines))
+        reader.daemon = True
+        reader.start()
+        readers.append(reader)
+
+    version = ghenv.Component.Message
+    start = last_change = time.time()
+    last_state, status = None, 'running'
+    try:
+        while status == 'running':
+            if process.poll() is not None:
+                for reader in readers:
+                    reader.join()
+                status = 'finished' if process.returncode == 0 else 'failed'
+            counts = count_progress(out_lines) if count_progress is not None else None
+            now = time.time()
+            if (counts, len(out_lines)) != last_state:
+                last_state, last_change = (counts, len(out_lines)), now
+            progress = {
+                'status': status, 'elapsed': round(now - start, 1),
+                'since_change': round(now - last_change, 1),
+                'last_output': out_lines[-1].strip() if out_lines else None
+            }
+            message = 'Running {}'.format(format_time(now - start))
+            if counts is not None:
+                done, total, failed = counts
+                eta = (now - start) / done * (total - done) if done != 0 else None
+                progress.update({
+                    'done': done, 'total': total, 'failed': failed,
+                    'eta': round(eta, 1) if eta is not None else None
+                })
+                message = '{}/{} {}'.format(done, total, unit)
+                if failed != 0:
+                    message = '{}, {} failed'.format(message, failed)
+                if eta is not None and status == 'running':
+                    message = '{}, ETA {}'.format(message, format_time(eta))
+            with open(progress_file, 'w') as outf:
+                json.dump(progress, outf, indent=2)
+            if status == 'running':
+                ghenv.Component.Message = message
+                canvas = Instances.ActiveCanvas
+                if canvas is not None:  # paint the canvas without handling other UI events
+                    canvas.Refresh()
+                time.sleep(REFRESH_SECONDS)
+    finally:
+        ghenv.Component.Message = version
+    return process.returncode, ''.join(out_lines), ''.join(err_lines)
+
+
+def count_months(lines, st_month, end_month):
+    """Count the months of an EnergyPlus run period that are done from its stdout.
+
+    The months are counted forward from the start month such that run periods
+    that wrap around the end of the year (eg. October to March) are supported.
+
+    Returns:
+        A tuple with the number of months done, the total number of months
+        and the number of months that failed (always zero).
+    """
+    total = (end_month - st_month) % 12 + 1
+    done = 0
+    for line in reversed(lines):
+        if 'EnergyPlus Completed Successfully' in line:
+            done = total
+            break
+        match = SIM_MONTH.search(line)
+        if match is not None:
+            done = (int(match.group(1)) - st_month) % 12
+            break
+    return done, total, 0
+
+
+# seconds between each refresh of the progress while a command runs
+REFRESH_SECONDS = 1
+# pattern of the EnergyPlus stdout that reports the start of each month
+SIM_MONTH = re.compile(r'Continuing Simulation at (\d{2})/')
+# folder of wheels used to install the dependencies without the package index
+WHEELHOUSE = os.path.join(lb_folders.ladybug_tools_folder, 'resources', 'wheelhouse')
+# file to which the manifest of installed dependencies is written
+MANIFEST_FILE = os.path.join(
+    lb_folders.ladybug_tools_folder, 'resources', 'dragonfly_dependencies.json')
+# sticky key under which the manifest of installed dependencies is cached
+MANIFEST_KEY = 'dragonfly_dependency_manifest'
+# versions of the packages used to write and size the DES
 UO_GMT_VERSION = '.'.join(str(i) for i in df_folders.UO_GMT_VERSION)
 UO_TN_VERSION = '.'.join(str(i) for i in df_folders.UO_TN_VERSION)
 MBL_VERSION = '.'.join(str(i) for i in df_folders.MBL_VERSION)
@@ -117,45 +391,50 @@ if all_required_inputs(ghenv.Component) and _write:
     # set up the custom python environment and get the path to the executor
     custom_env = os.environ.copy()
     custom_env['PYTHONHOME'] = ''
-    ext = '.exe' if os.name == 'nt' else ''
     executor_path = os.path.join(
         lb_folders.ladybug_tools_folder, 'grasshopper',
         'ladybug_grasshopper_dotnet', 'Ladybug.Executor.exe')
 
-    # check to see if the dependencies are already installed
-    uo_gmt = '{}/uo_des{}'.format(folders.python_scripts_path, ext)
-    uo_gmt_pack = '{}/geojson_modelica_translator-{}.dist-info'.format(
-        folders.python_package_path, UO_GMT_VERSION)
-    uo_tn = '{}/thermalnetwork{}'.format(folders.python_scripts_path, ext)
-    uo_tn_pack = '{}/ThermalNetwork-{}.dist-info'.format(
-        folders.python_package_path, UO_TN_VERSION)
-    install_directory = os.path.join(lb_folders.ladybug_tools_folder, 'resources')
-    final_dir = os.path.join(install_directory, 'mbl')
-    version_file = os.path.join(final_dir, 'version.txt')
-    already_installed = False
-    if os.path.isdir(final_dir) and os.path.isfile(version_file):
-        with open(version_file, 'r') as vf:
-            install_version = vf.read()
-        if install_version == MBL_VERSION:
-            already_installed = True
-        else:
-            nukedir(final_dir, True)
-    # if the dependencies are not there, install them
-    if not already_installed or not os.path.isfile(uo_tn) or not os.path.isdir(uo_tn_pack) or \
-            not os.path.isfile(uo_gmt) or not os.path.isdir(uo_gmt_pack):
-        install_cmd = 'dragonfly_energy install all-des'
-        if os.name == 'nt' and os.path.isfile(executor_path) and \
-                'Program Files' in executor_path:
-            pip_cmd = [
-                executor_path, folders.python_exe_path, '-m {}'.format(install_cmd)
-            ]
-        else:
-            pip_cmd = '"{py_exe}" -m {uo_cmd}'.format(
-                py_exe=folders.python_exe_path, uo_cmd=install_cmd)
-        shell = True if os.name == 'nt' else False
-        process = subprocess.Popen(
-            pip_cmd, stderr=subprocess.PIPE, shell=shell, env=custom_env)
-        stderr = process.communicate()
+    # check to see if the python dependencies are installed
+    manifest = ensure_packages([
+        ('geojson-modelica-translator', UO_GMT_VERSION,
+         'geojson_modelica_translator', 'uo_des'),
+        ('thermalnetwork', UO_TN_VERSION, 'ThermalNetwork', 'thermalnetwork')
+    ])
+
+    # check to see if the Modelica Buildings Library (MBL) is installed
+    if manifest.get('mbl', {}).get('version') != MBL_VERSION:
+        install_directory = os.path.join(lb_folders.ladybug_tools_folder, 'resources')
+        final_dir = os.path.join(install_directory, 'mbl')
+        version_file = os.path.join(final_dir, 'version.txt')
+        already_installed = False
+        if os.path.isdir(final_dir) and os.path.isfile(version_file):
+            with open(version_file, 'r') as vf:
+                install_version = vf.read()
+            if install_version == MBL_VERSION:
+                already_installed = True
+            else:
+                nukedir(final_dir, True)
+        # if the MBL is not there, install it
+        if not already_installed:
+            install_cmd = 'dragonfly_energy install mbl'
+            if os.name == 'nt' and os.path.isfile(executor_path) and \
+                    'Program Files' in executor_path:
+                pip_cmd = [
+                    executor_path, folders.python_exe_path, '-m {}'.format(install_cmd)
+                ]
+            elif os.name == 'nt':
+                pip_cmd = '"{py_exe}" -m {uo_cmd}'.format(
+                    py_exe=folders.python_exe_path, uo_cmd=install_cmd)
+            else:
+                pip_cmd = [folders.python_exe_path, '-m'] + install_cmd.split()
+            shell = True if os.name == 'nt' else False
+            process = subprocess.Popen(
+                pip_cmd, stderr=subprocess.PIPE, shell=shell, env=custom_env)
+            stderr = process.communicate()
+        if os.path.isfile(version_file):
+            manifest['mbl'] = {'version': MBL_VERSION, 'path': final_dir}
+            save_manifest(manifest)
 
     # check the various files in the project folder
     check_des_compatibility(_geojson)
@@ -218,8 +497,15 @@ if all_required_inputs(ghenv.Component) and _write:
         shell = False if run_ == 1 else True
     else:
         shell = True
-    process = subprocess.Popen(cmds, shell=shell, env=custom_env)
-    result = process.communicate()  # freeze the canvas while running
+    count_progress = None
+    if run_:  # count the months of the run period that are simulated
+        run_period = _sim_par_.run_period if _sim_par_ is not None else None
+        st_month = run_period.start_date.month if run_period is not None else 1
+        end_month = run_period.end_date.month if run_period is not None else 12
+        count_progress = lambda lines: count_months(lines, st_month, end_month)
+    progress_file = os.path.join(ep_dir, 'progress.json')
+    returncode, stdout, stderr = run_with_progress(
+        cmds, progress_file, count_progress, 'months', shell=shell, env=custom_env)
 
     # get the output files and error log
     if run_:
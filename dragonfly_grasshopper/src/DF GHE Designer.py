@@ -92,7 +92,7 @@ https://ghedesigner.readthedocs.io/en/latest/background.html
 
 ghenv.Component.Name = 'DF GHE Designer'
 ghenv.Component.NickName = 'GHEDesigner'
-ghenv.Component.Message = '1.10.1'
+ghenv.Component.Message = '1.10.2'
 ghenv.Component.Category = 'Dragonfly'
 ghenv.Component.SubCategory = '5 :: District Thermal'
 ghenv.Component.AdditionalHelpFromDocStrings = '0'
@@ -101,6 +101,11 @@ import os
 import subprocess
 import json
 
+try:  # import the module for caching the dependency manifest in the Rhino session
+    import scriptcontext as sc
+except ImportError as e:
+    raise ImportError('\nFailed to import scriptcontext:\n\t{}'.format(e))
+
 try:
     from ladybug_geometry.geometry2d import Point2D
     from ladybug_geometry.geometry3d import Vector3D, Point3D, LineSegment3D
@@ -135,6 +140,141 @@ try:
 except ImportError as e:
     raise ImportError('\nFailed to import ladybug_rhino:\n\t{}'.format(e))
 
+def package_paths(dist_name, version, script):
+    """Get the paths to an installed package in the ladybug tools Python environment.
+
+    Args:
+        dist_name: Text for the name of the dist-info folder of the package.
+        version: Text for the version of the package.
+        script: Text for the name of the command line script of the package.
+            None if the package has no script.
+
+    Returns:
+        A dictionary with the version and the paths to the dist-info folder and
+        the script of the package. None if the package is not installed.
+    """
+    dist_info = os.path.join(
+        folders.python_package_path, '{}-{}.dist-info'.format(dist_name, version))
+    if not os.path.isdir(dist_info):
+        return None
+    script_path = None
+    if script is not None:
+        ext = '.exe' if os.name == 'nt' else ''
+        script_path = os.path.join(folders.python_scripts_path, script + ext)
+        if not os.path.isfile(script_path):
+            return None
+    return {'version': version, 'dist_info': dist_info, 'script': script_path}
+
+
+def pip_install(requirements, offline=False):
+    """Install several packages with a single call to pip.
+
+    Args:
+        requirements: A list of pip requirements (eg. "ghedesigner==1.5").
+        offline: Boolean to note whether the packages should only be installed
+            from the WHEELHOUSE folder without the use of the package index.
+
+    Returns:
+        The stderr of the pip call.
+    """
+    pip_args = ['install'] + list(requirements)
+    if os.path.isdir(WHEELHOUSE):
+        pip_args.extend(['--find-links', WHEELHOUSE])
+        if offline:
+            pip_args.append('--no-index')
+    pip_str = ' '.join('"{}"'.format(a) if ' ' in a else a for a in pip_args)
+    executor_path = os.path.join(
+        lb_folders.ladybug_tools_folder, 'grasshopper',
+        'ladybug_grasshopper_dotnet', 'Ladybug.Executor.exe')
+    if os.name == 'nt' and os.path.isfile(executor_path) and \
+            'Program Files' in executor_path:
+        pip_cmd = [
+            executor_path, folders.python_exe_path, '-m pip {}'.format(pip_str)
+        ]
+    elif os.name == 'nt':
+        pip_cmd = '"{py_exe}" -m pip {pip_args}'.format(
+            py_exe=folders.python_exe_path, pip_args=pip_str)
+    else:
+        pip_cmd = [folders.python_exe_path, '-m', 'pip'] + pip_args
+    custom_env = os.environ.copy()
+    custom_env['PYTHONHOME'] = ''
+    shell = True if os.name == 'nt' else False
+    process = subprocess.Popen(
+        pip_cmd, stderr=subprocess.PIPE, shell=shell, env=custom_env)
+    return process.communicate()[1]
+
+
+def ensure_packages(packages):
+    """Make sure that packages are installed in the ladybug tools Python environment.
+
+    Each package is only probed the first time that it is requested in the
+    Rhino session and the result is recorded in a manifest that is shared
+    by all components. All missing packages are installed with a single call to
+    pip, which first tries the wheels in the WHEELHOUSE folder if it exists.
+
+    Args:
+        packages: A list of tuples for the packages to check. Each tuple has the
+            pip name, the version, the name of the dist-info folder and the
+            name of the command line script of the package (or None).
+
+    Returns:
+        The manifest dictionary with the pip names of the packages as keys and
+        dictionaries of their version and paths as values.
+    """
+    try:
+        manifest = sc.sticky[MANIFEST_KEY]
+    except KeyError:
+        manifest = sc.sticky[MANIFEST_KEY] = {}
+    missing, probed = [], False
+    for name, version, dist_name, script in packages:
+        if name in manifest and manifest[name]['version'] == version:
+            continue
+        probed = True
+        paths = package_paths(dist_name, version, script)
+        if paths is None:
+            missing.append((name, version, dist_name, script))
+        else:
+            manifest[name] = paths
+
+    # install all missing packages together, trying the wheelhouse first
+    stderr = None
+    modes = (True, False) if os.path.isdir(WHEELHOUSE) else (False,)
+    for offline in modes:
+        if len(missing) == 0:
+            break
+        requirements = ['{}=={}'.format(m[0], m[1]) for m in missing]
+        stderr = pip_install(requirements, offline)
+        still_missing = []
+        for name, version, dist_name, script in missing:
+            paths = package_paths(dist_name, version, script)
+            if paths is None:
+                still_missing.append((name, version, dist_name, script))
+            else:
+                manifest[name] = paths
+        missing = still_missing
+    if probed:
+        save_manifest(manifest)
+    if len(missing) != 0:
+        raise ValueError('Failed to install {}:\n{}'.format(
+            ', '.join('{}=={}'.format(m[0], m[1]) for m in missing), stderr))
+    return manifest
+
+
+def save_manifest(manifest):
+    """Write the manifest of installed dependencies to MANIFEST_FILE."""
+    if os.path.isdir(os.path.dirname(MANIFEST_FILE)):
+        with open(MANIFEST_FILE, 'w') as outf:
+            json.dump(manifest, outf, indent=2)
+
+
+# folder of wheels used to install the dependencies without the package index
+WHEELHOUSE = os.path.join(lb_folders.ladybug_tools_folder, 'resources', 'wheelhouse')
+# file to which the manifest of installed dependencies is written
+MANIFEST_FILE = os.path.join(
+    lb_folders.ladybug_tools_folder, 'resources', 'dragonfly_dependencies.json')
+# sticky key under which the manifest of installed dependencies is cached
+MANIFEST_KEY = 'dragonfly_dependency_manifest'
+# version of GHEDesigner used to size the ground heat exchangers
 GHE_DESIGNER_VERSION = '.'.join(str(i) for i in df_folders.GHE_DESIGNER_VERSION)
 
 
@@ -144,29 +284,11 @@ if all_required_inputs(ghenv.Component) and _write:
     custom_env['PYTHONHOME'] = ''
     shell = True if os.name == 'nt' else False
 
-    # set global values
-    ext = '.exe' if os.name == 'nt' else ''
-    executor_path = os.path.join(
-        lb_folders.ladybug_tools_folder, 'grasshopper',
-        'ladybug_grasshopper_dotnet', 'Ladybug.Executor.exe')
-
     # check to see if GHEDesigner is installed
-    ghe_des = '{}/ghedesigner{}'.format(folders.python_scripts_path, ext)
-    ghe_des_pack = '{}/GHEDesigner-{}.dist-info'.format(
-        folders.python_package_path, GHE_DESIGNER_VERSION)
-    if not os.path.isfile(ghe_des) or not os.path.isdir(ghe_des_pack):
-        install_cmd = 'pip install ghedesigner=={}'.format(GHE_DESIGNER_VERSION)
-        if os.name == 'nt' and os.path.isfile(executor_path) and \
-                'Program Files' in executor_path:
-            pip_cmd = [
-                executor_path, folders.python_exe_path, '-m {}'.format(install_cmd)
-            ]
-        else:
-            pip_cmd = '"{py_exe}" -m {uo_cmd}'.format(
-                py_exe=folders.python_exe_path, uo_cmd=install_cmd)
-        process = subprocess.Popen(
-            pip_cmd, stderr=subprocess.PIPE, shell=shell, env=custom_env)
-        stderr = process.communicate()
+    manifest = ensure_packages([
+        ('ghedesigner', GHE_DESIGNER_VERSION, 'GHEDesigner', 'ghedesigner')
+    ])
+    ghe_des = manifest['ghedesigner']['script']
 
     # process the site geometry into Face3D
     site_faces = []
@@ -63,14 +63,14 @@ https://gis.ncdc.noaa.gov/maps/ncei/cdo/hourly
 
 ghenv.Component.Name = 'DF Import NOAA File'
 ghenv.Component.NickName = 'ImportNOAA'
-ghenv.Component.Message = '1.10.0'
+ghenv.Component.Message = '1.10.1'
 ghenv.Component.Category = "Dragonfly"
 ghenv.Component.SubCategory = '6 :: AlternativeWeather'
 ghenv.Component.AdditionalHelpFromDocStrings = '4'
 
 import os
 import csv
-import datetime
+import array
 
 try:
     from ladybug.location import Location
@@ -131,34 +131,123 @@ def extract_location(climate_file, time_zone=None):
     return location, time_zone
 
 
-def build_collection(values, dates, data_type, unit, time_offset, year):
-    """Build a data collection from raw noaa data and process it to the timestep.
+def noaa_timestamp(date_str, offset):
+    """Get the year and minute of the year of a NOAA date shifted by a time zone offset.
 
     Args:
-        values: A list of values to be included in the data collection.
-        dates: A list of datetime strings that align with the values.
+        date_str: Text for the date in the NOAA file (eg. "2003-01-01T01:00:00").
+        offset: Integer for the number of minutes by which the time is shifted.
+    """
+    yr, month, day, hr, minute = int(date_str[:4]), int(date_str[5:7]), \
+        int(date_str[8:10]), int(date_str[11:13]), int(date_str[14:16])
+    doy = MONTH_START_DAYS[month - 1] + day - 1
+    if month > 2 and is_leap_year(yr):
+        doy += 1
+    moy = doy * 1440 + hr * 60 + minute + offset
+    if moy < 0:
+        yr -= 1
+        moy += 527040 if is_leap_year(yr) else 525600
+    else:
+        yr_minutes = 527040 if is_leap_year(yr) else 525600
+        if moy >= yr_minutes:
+            yr += 1
+            moy -= yr_minutes
+    return yr, moy
+
+
+def is_leap_year(year):
+    """Check whether a year is a leap year."""
+    return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+
+
+def parse_noaa_file(noaa_file, offset):
+    """Parse all of the data in a NOAA file in a single pass.
+
+    Each row's timestamp is converted only once and it is shared by all variables.
+
+    Args:
+        noaa_file: File path to the NOAA .csv file.
+        offset: Integer for the number of minutes by which times are shifted.
+
+    Returns:
+        A tuple with four items.
+
+        -   file_years: An array with the year of each row as written in the file.
+
+        -   years: An array with the year of each row after the time zone shift.
+
+        -   moys: An array with the minute of the year of each row after the
+            time zone shift.
+
+        -   values: A dictionary with an array of values in each row for each
+            variable. Missing values are NaN.
+    """
+    file_years, years, moys = array.array('i'), array.array('i'), array.array('i')
+    values = {}
+    nan = float('nan')
+    with open(noaa_file) as csv_file:
+        csv_reader = csv.reader(csv_file, delimiter=',', skipinitialspace=True)
+
+        # find the columns of each variable, including sky cover if it exists
+        header = csv_reader.next()  # get header row
+        columns = []
+        for col_name, col_vars in NOAA_COLUMNS:
+            if col_name in header:
+                columns.append((header.index(col_name), col_vars))
+                for var in col_vars:
+                    values[var[0]] = array.array('d')
+
+        for row in csv_reader:
+            # parse the dates and the years
+            date_row = row[1]
+            file_years.append(int(date_row[:4]))
+            yr, moy = noaa_timestamp(date_row, offset)
+            years.append(yr)
+            moys.append(moy)
+
+            # parse the values, which are separated by commas within each column
+            for col, col_vars in columns:
+                col_info = row[col].split(',')
+                for var, field, missing, convert in col_vars:
+                    val = col_info[field] if field < len(col_info) else ''
+                    if val == missing or val == '':
+                        values[var].append(nan)
+                    else:
+                        values[var].append(convert(val))
+    return file_years, years, moys, values
+
+
+def build_collection(values, years, moys, data_type, unit, year):
+    """Build a data collection from parsed noaa data and process it to the timestep.
+
+    Args:
+        values: An array of values to be included in the data collection. NaN
+            values are excluded from the data collection.
+        years: An array of years that align with the values.
+        moys: An array of minutes of the year that align with the values.
         data_type: Ladybug data type for the data collection.
         unit: Text for the unit of the collection.
-        time_offset: Python timedelta object to correct for the time zone.
         year: Integer for the year of the data.
     """
-    if values == []:
-        return None
-
-    # convert date codes into datetimes and ensure no duplicates
+    # get the values in the year, sharing DateTimes between data collections
     leap_yr = True if year % 4 == 0 else False
-    datetimes = []
-    clean_values = []
-    for i, (dat, val) in enumerate(zip(dates, values)):
-        if dat != dates[i - 1]:
-            yr, month, day, hr, minute = int(dat[:4]), int(dat[5:7]), \
-                int(dat[8:10]), int(dat[11:13]), int(dat[14:16])
-            py_dat = datetime.datetime(yr, month, day, hr, minute) + time_offset
-            if py_dat.year == year:
-                lb_dat = DateTime(py_dat.month, py_dat.day, py_dat.hour,
-                                  py_dat.minute, leap_year=leap_yr)
-                datetimes.append(lb_dat)
-                clean_values.append(val)
+    datetimes, clean_values, last_i = [], [], None
+    for i, val in enumerate(values):
+        if val != val:  # missing value
+            continue
+        is_dup = last_i is not None and \
+            moys[i] == moys[last_i] and years[i] == years[last_i]
+        last_i = i
+        if years[i] == year and not is_dup:
+            try:
+                lb_dat = datetimes_cache[moys[i]]
+            except KeyError:
+                lb_dat = datetimes_cache[moys[i]] = \
+                    DateTime.from_moy(moys[i], leap_yr)
+            datetimes.append(lb_dat)
+            clean_values.append(val)
+    if clean_values == []:
+        return None
 
     # make a discontinuous cata collection
     data_header = Header(data_type, unit, AnalysisPeriod(is_leap_year=leap_yr))
@@ -174,116 +263,52 @@ def build_collection(values, dates, data_type, unit, time_offset, year):
     return data_final
 
 
+# the day of the year on which each month starts in a year that is not a leap year
+MONTH_START_DAYS = (0, 31, 59, 90, 120, 151, 181, 212, 243, 273, 304, 334)
+# the columns of the NOAA file with the variable, field index, missing value text
+# and unit conversion of each value that is parsed from the column
+NOAA_COLUMNS = (
+    ('WND', (('wd', 0, '999', float), ('ws', 3, '9999', lambda v: float(v) / 10))),
+    ('CIG', (('ceil', 0, '99999', float),)),
+    ('VIS', (('vis', 0, '999999', lambda v: float(v) / 1000),)),
+    ('TMP', (('db_t', 0, '+9999', lambda v: float(v) / 10),)),
+    ('DEW', (('dp_t', 0, '+9999', lambda v: float(v) / 10),)),
+    ('SLP', (('slp', 0, '99999', lambda v: float(v) * 10),)),
+    ('GF1', (('sc', 0, None, lambda v: int(v) * (10 / 8) if int(v) != 9 else 10),))
+)
+
+
 if all_required_inputs(ghenv.Component) and _run:
     # check that the file exists.
     assert os.path.isfile(_noaa_file), 'Cannot find file at {}.'.format(_noaa_file)
 
     # extract the location and the time zone
     location, t_zone = extract_location(_noaa_file, time_zone_)
-    t_offset = datetime.timedelta(seconds=t_zone * 3600)
-
-    # empty lists to be filled with data
-    all_years = []
-    all_dates = []
-    header_txt = []
-    db_t = []
-    db_t_dates = []
-    dp_t = []
-    dp_t_dates = []
-    ws = []
-    ws_dates = []
-    wd = []
-    wd_dates = []
-    sc = []
-    sc_dates = []
-    slp = []
-    slp_dates = []
-    vis = []
-    vis_dates = []
-    ceil = []
-    ceil_dates = []
 
     # pull relevant data out of the file
-    with open(_noaa_file) as csv_file:
-        csv_reader = csv.reader(csv_file, delimiter=',', skipinitialspace=True)
-
-        # find the column with total sky cover if it exists
-        header = csv_reader.next()  # get header row
-        sc_col = None
-        for i, colname in enumerate(header):
-            if colname == 'GF1':
-                sc_col = i
-
-        for row in csv_reader:
-            # parse the dates and the years
-            date_row = row[1]
-            all_dates.append(date_row)
-            all_years.append(int(date_row[:4]))
-
-            # parse the wind information
-            wind_info = row[10].split(',')
-            if wind_info[0] != '999':
-                wd.append(float(wind_info[0]))
-                wd_dates.append(date_row)
-            if wind_info[3] != '9999':
-                ws.append(float(wind_info[3]) / 10)
-                ws_dates.append(date_row)
-
-            # parse the ceiling height information
-            ceil_info = row[11].split(',')
-            if ceil_info[0] != '99999':
-                ceil.append(float(ceil_info[0]))
-                ceil_dates.append(date_row)
-
-            # parse the visibility information
-            vis_info = row[12].split(',')
-            if vis_info[0] != '999999':
-                vis.append(float(vis_info[0]) / 1000)
-                vis_dates.append(date_row)
-
-            # parse the dry bulb and dew point information
-            temp_info = row[13].split(',')
-            if temp_info[0] != '+9999':
-                db_t.append(float(temp_info[0]) / 10)
-                db_t_dates.append(date_row)
-            dwpt_info = row[14].split(',')
-            if dwpt_info[0] != '+9999':
-                dp_t.append(float(dwpt_info[0]) / 10)
-                dp_t_dates.append(date_row)
-
-            # parse the pressure information
-            slp_info = row[15].split(',')
-            if slp_info[0] != '99999':
-                slp.append(float(slp_info[0]) * 10)
-                slp_dates.append(date_row)
-
-            # parse the sky cover info if it exists
-            if sc_col is not None and row[sc_col] != '':
-                sc_info = row[sc_col].split(',')
-                sc_oktas = int(sc_info[0])
-                sc_tenths = sc_oktas * (10 / 8) if sc_oktas != 9 else 10
-                sc.append(sc_tenths)
-                sc_dates.append(date_row)
+    file_years, years, moys, values = parse_noaa_file(_noaa_file, int(t_zone * 60))
 
     # get the most predominant year in the file to make sure all data is for one year
-    dom_yr = int(max(set(all_years), key=all_years.count))
+    year_counts = {}
+    for yr in file_years:
+        year_counts[yr] = year_counts.get(yr, 0) + 1
+    dom_yr = max(year_counts, key=year_counts.get)
+    datetimes_cache = {}
     model_year = build_collection(
-        all_years, all_dates, GenericType('Years', 'yr'), 'yr', t_offset, dom_yr)
+        array.array('d', file_years), years, moys, GenericType('Years', 'yr'),
+        'yr', dom_yr)
 
     # build data collections from the imported values
-    dry_bulb_temp = build_collection(
-        db_t, db_t_dates, DryBulbTemperature(), 'C', t_offset, dom_yr)
-    dew_point_temp = build_collection(
-        dp_t, dp_t_dates, DewPointTemperature(), 'C', t_offset, dom_yr)
-    wind_speed = build_collection(
-        ws, ws_dates, WindSpeed(), 'm/s', t_offset, dom_yr)
-    wind_direction = build_collection(
-        wd, wd_dates, WindDirection(), 'degrees', t_offset, dom_yr)
-    ceiling_height = build_collection(
-        ceil, ceil_dates, CeilingHeight(), 'm', t_offset, dom_yr)
-    visibility = build_collection(
-        vis, vis_dates, Visibility(), 'km', t_offset, dom_yr)
-    atmos_pressure = build_collection(
-        slp, slp_dates, AtmosphericStationPressure(), 'Pa', t_offset, dom_yr)
-    total_sky_cover = build_collection(
-        sc, sc_dates, TotalSkyCover(), 'tenths', t_offset, dom_yr)
+    def var_collection(var, data_type, unit):
+        if var not in values:
+            return None
+        return build_collection(values[var], years, moys, data_type, unit, dom_yr)
+
+    dry_bulb_temp = var_collection('db_t', DryBulbTemperature(), 'C')
+    dew_point_temp = var_collection('dp_t', DewPointTemperature(), 'C')
+    wind_speed = var_collection('ws', WindSpeed(), 'm/s')
+    wind_direction = var_collection('wd', WindDirection(), 'degrees')
+    ceiling_height = var_collection('ceil', CeilingHeight(), 'm')
+    visibility = var_collection('vis', Visibility(), 'km')
+    atmos_pressure = var_collection('slp', AtmosphericStationPressure(), 'Pa')
+    total_sky_cover = var_collection('sc', TotalSkyCover(), 'tenths')
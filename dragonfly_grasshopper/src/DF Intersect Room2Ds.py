@@ -20,6 +20,10 @@ _
 Also note that this component does not actually set the walls that are next to one
 another to be adjacent. The "DF Solve Adjacency" component must be used for this
 after runing this component.
+_
+Room2Ds are only intersected with the Room2Ds that they are connected to through
+overlapping bounding rectangles, which makes the component fast for many Room2Ds
+that are spread across separate floor plates or buildings.
 -
 
     Args:
@@ -28,6 +32,7 @@ after runing this component.
         _run: Set to True to run the component.
 
     Returns:
+        report: Reports, errors, warnings, etc.
         int_room2ds: An array of Room2Ds that have been intersected with one another.
             Note that these Room2Ds lack all assigned boundary conditions, glazing
             parameters and shading parameters of the original Room2Ds.
@@ -35,7 +40,7 @@ after runing this component.
 
 ghenv.Component.Name = "DF Intersect Room2Ds"
 ghenv.Component.NickName = 'IntRoom2D'
-ghenv.Component.Message = '1.10.0'
+ghenv.Component.Message = '1.10.3'
 ghenv.Component.Category = "Dragonfly"
 ghenv.Component.SubCategory = '0 :: Create'
 ghenv.Component.AdditionalHelpFromDocStrings = '0'
@@ -54,6 +59,59 @@ except ImportError as e:
 tolerance = current_tolerance()
 
 
+def overlapping_pairs(room2ds):
+    """Get sorted index pairs of Room2Ds with overlapping bounding rectangles.
+
+    The rectangles are swept along the X axis such that only the Room2Ds that
+    overlap one another in X are checked for overlap in Y.
+    """
+    rects = []
+    for room in room2ds:
+        min_pt, max_pt = room.floor_geometry.min, room.floor_geometry.max
+        rects.append((min_pt.x - tolerance, min_pt.y - tolerance,
+                      max_pt.x + tolerance, max_pt.y + tolerance))
+    pairs, active = [], []
+    for i in sorted(range(len(rects)), key=lambda i: rects[i][0]):
+        rect = rects[i]
+        active = [j for j in active if rects[j][2] >= rect[0]]
+        for j in active:
+            if rects[j][1] <= rect[3] and rect[1] <= rects[j][3]:
+                pairs.append((min(i, j), max(i, j)))
+        active.append(i)
+    pairs.sort()
+    return pairs
+
+
+def connected_groups(room_count, pairs):
+    """Get lists of Room2D indices that are connected to one another by pairs."""
+    parents = list(range(room_count))
+
+    def root(i):
+        while parents[i] != i:
+            parents[i] = parents[parents[i]]
+            i = parents[i]
+        return i
+
+    for i, j in pairs:
+        parents[root(j)] = root(i)
+    groups = {}
+    for i in range(room_count):
+        groups.setdefault(root(i), []).append(i)
+    return sorted(groups.values())
+
+
+def intersect_room2ds(room2ds, pairs):
+    """Intersect Room2Ds in groups that are connected by overlapping pairs."""
+    int_rooms = list(room2ds)
+    for group in connected_groups(len(room2ds), pairs):
+        if len(group) > 1:
+            group_rooms = [room2ds[i] for i in group]
+            group_rooms = Room2D.intersect_adjacency(group_rooms, tolerance)
+            for i, room in zip(group, group_rooms):
+                int_rooms[i] = room
+    return int_rooms
+
+
 # add an compile toggle, set _compile to True to run the function
 if all_required_inputs(ghenv.Component) and _run:
     rooms = []
@@ -61,4 +119,7 @@ if all_required_inputs(ghenv.Component) and _run:
         rm = room.duplicate()
         rm.remove_colinear_vertices(tolerance)
         rooms.append(rm)
-    int_room2ds = Room2D.intersect_adjacency(rooms, tolerance)
\ No newline at end of file
+    pairs = overlapping_pairs(rooms)
+    int_room2ds = intersect_room2ds(rooms, pairs)
+    print('Intersected {} of {} Room2D pairs with overlapping bounding '
+          'rectangles.'.format(len(pairs), len(rooms) * (len(rooms) - 1) // 2))
\ No newline at end of file
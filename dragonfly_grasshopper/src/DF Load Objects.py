@@ -24,6 +24,20 @@ Load, ProgramType, or Simulation object.
             a dragonfly Model will be loaded. Note that, if the objects in the JSON
             are not a full model, they must be non-abridged in order to be
             loaded correctly.
+        bldg_ids_: An optional list of Building identifiers or display names to
+            load from a Model DFJSON. If specified, the output Model will only
+            contain these Buildings along with all of the ContextShades of the
+            file. The position of each Building in the file is indexed on the
+            first load and kept for the Rhino session, so that loading other
+            Buildings from the same file only reads the requested Buildings.
+            This is much faster than loading the whole Model when only a few
+            Buildings of a large city Model are needed.
+        no_extract_: Set to True to read the model.json of a POMF file straight
+            from the zip archive without extracting it to disk. This has no
+            effect when bldg_ids_ are specified since these require an
+            extracted file. Otherwise, POMF files are extracted to a temp
+            folder named after the hash of their contents so that loading
+            the same archive again does not extract it again. (Default: False).
         _load: Set to "True to load the objects from the _df_file.
     
     Returns:
@@ -33,7 +47,7 @@ Load, ProgramType, or Simulation object.
 
 ghenv.Component.Name = 'DF Load Objects'
 ghenv.Component.NickName = 'LoadObjects'
-ghenv.Component.Message = '1.10.0'
+ghenv.Component.Message = '1.10.7'
 ghenv.Component.Category = 'Dragonfly'
 ghenv.Component.SubCategory = '2 :: Serialize'
 ghenv.Component.AdditionalHelpFromDocStrings = '2'
@@ -43,6 +57,11 @@ import io
 import zipfile
 import tempfile
 import uuid
+import hashlib
+import shutil
+from collections import OrderedDict
+
+import scriptcontext as sc
 
 try:  # import the core dragonfly dependencies
     import dragonfly.dictutil as df_dict_util
@@ -152,27 +171,283 @@ def version_check(data):
             print msg
 
 
+class JSONStream(object):
+    """Reader for JSON files that decodes one value at a time from a buffered file."""
+
+    def __init__(self, file_obj, chunk_size=1048576):
+        self.file_obj, self.chunk_size = file_obj, chunk_size
+        self.buffer, self.pos, self.eof = u'', 0, False
+        self.mark, self.bytes_read = 0, 0
+        self.decoder = json.JSONDecoder()
+
+    def byte_offset(self):
+        """Get the byte offset of the current position in the UTF-8 file."""
+        self.bytes_read += len(self.buffer[self.mark:self.pos].encode('utf-8'))
+        self.mark = self.pos
+        return self.bytes_read
+
+    def fill(self):
+        """Read more of the file into the buffer, returning False at the end of file."""
+        if self.eof:
+            return False
+        self.byte_offset()
+        self.mark = 0
+        chunk = self.file_obj.read(max(self.chunk_size, len(self.buffer)))
+        self.buffer, self.pos = self.buffer[self.pos:] + chunk, 0
+        self.eof = len(chunk) == 0
+        return not self.eof
+
+    def peek(self):
+        """Get the next character that is not whitespace without consuming it."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in u' \t\r\n\ufeff':
+                self.pos += 1
+            if self.pos < len(self.buffer) or not self.fill():
+                return self.buffer[self.pos:self.pos + 1]
+
+    def expect(self, char):
+        """Consume the next character, checking that it is the expected one."""
+        if self.peek() != char:
+            raise ValueError('Expected "{}" at this point in the JSON.'.format(char))
+        self.pos += 1
+
+    def value(self):
+        """Decode the next JSON value in the file."""
+        self.peek()
+        while True:
+            try:
+                obj, end = self.decoder.raw_decode(self.buffer, self.pos)
+                if end < len(self.buffer) or self.eof:  # numbers may be cut off
+                    self.pos = end
+                    return obj
+            except ValueError:
+                if self.eof:
+                    raise
+            self.fill()
+
+    def items(self, close_char):
+        """Iterate over the positions of the items in an object or array being read."""
+        if self.peek() == close_char:
+            self.pos += 1
+            return
+        while True:
+            yield
+            if self.peek() == u',':
+                self.pos += 1
+            else:
+                self.expect(close_char)
+                return
+
+
+def strip_geometry(obj_dict):
+    """Remove the geometry from an object dictionary, keeping its properties."""
+    for key in GEOMETRY_KEYS:
+        obj_dict.pop(key, None)
+    for sub_key in ('unique_stories', 'room_2ds'):
+        for sub_dict in obj_dict.get(sub_key) or ():
+            strip_geometry(sub_dict)
+    return obj_dict
+
+
+def load_dfjson(df_file):
+    """Load the dictionary of a JSON file, which can also be a file object."""
+    inf = df_file if hasattr(df_file, 'read') else io.open(df_file, encoding='utf-8-sig')
+    with inf:
+        return json.load(inf)
+
+
+def index_dfjson(df_file):
+    """Index the byte ranges of the Buildings and ContextShades in a Model DFJSON.
+
+    Args:
+        df_file: Path to a Model DFJSON file.
+
+    Returns:
+        A tuple with two items.
+
+        -   data: Dictionary of the Model, where the dictionaries of the Buildings
+            and ContextShades lack geometry.
+
+        -   ranges: A dictionary with a list of (start, end) byte ranges for the
+            Buildings and ContextShades in the file.
+    """
+    data, ranges = {}, {}
+    # newline='' keeps the line endings of the file so that byte offsets match it
+    with io.open(df_file, encoding='utf-8', newline='') as inf:
+        stream = JSONStream(inf)
+        stream.expect(u'{')
+        for _ in stream.items(u'}'):
+            key = stream.value()
+            stream.expect(u':')
+            if key in MODEL_OBJ_KEYS and stream.peek() == u'[':
+                stream.expect(u'[')
+                ranges[key], data[key] = [], []
+                for _ in stream.items(u']'):
+                    start = stream.byte_offset()
+                    obj_dict = stream.value()
+                    ranges[key].append((start, stream.byte_offset()))
+                    data[key].append(strip_geometry(obj_dict))
+            else:
+                data[key] = stream.value()
+    assert data.get('type') == 'Model', \
+        'Buildings can only be loaded from a Model DFJSON. Got {}.'.format(data.get('type'))
+    return data, ranges
+
+
+def load_buildings(df_file, bldg_ids):
+    """Load a Model with only certain Buildings from a DFJSON file.
+
+    The index of the file is cached for the Rhino session and it is keyed on
+    the file path, modification time and size so that edited files are
+    always indexed again.
+
+    Args:
+        df_file: Path to a Model DFJSON file.
+        bldg_ids: A list of Building identifiers or display names to be loaded.
+
+    Returns:
+        A tuple with the dictionary of the Model and the Model.
+    """
+    # get the index of the file from the cache or create it
+    df_path = os.path.abspath(df_file)
+    df_stat = os.stat(df_path)
+    file_key = (df_stat.st_mtime, df_stat.st_size)
+    try:
+        cache = sc.sticky[INDEX_KEY]
+    except KeyError:
+        cache = sc.sticky[INDEX_KEY] = OrderedDict()
+    try:
+        index_key, data, ranges = cache.pop(df_path)
+        if index_key != file_key:
+            raise KeyError(df_path)
+    except KeyError:
+        data, ranges = index_dfjson(df_path)
+    cache[df_path] = (file_key, data, ranges)
+    while len(cache) > INDEX_MAX_FILES:
+        cache.popitem(last=False)
+
+    # find the requested Buildings and warn about any that are not in the file
+    bldg_ids = set(bldg_ids)
+    bldg_dicts = data.get('buildings') or []
+    bldg_i = [i for i, bldg in enumerate(bldg_dicts) if bldg['identifier'] in bldg_ids
+              or bldg.get('display_name') in bldg_ids]
+    found = set(bldg_dicts[i]['identifier'] for i in bldg_i) | \
+        set(bldg_dicts[i].get('display_name') for i in bldg_i)
+    missing = [b_id for b_id in bldg_ids if b_id not in found]
+    if len(missing) != 0:
+        msg = 'The following Buildings were not found in the file:\n{}'.format(
+            '\n'.join(sorted(missing)))
+        print(msg)
+        give_warning(ghenv.Component, msg)
+
+    # read the requested Buildings and all ContextShades from their byte ranges
+    model_data = dict(data)
+    with open(df_path, 'rb') as inf:
+        for key in MODEL_OBJ_KEYS:
+            if key not in ranges:
+                continue
+            obj_ranges = ranges[key] if key != 'buildings' else \
+                [ranges[key][i] for i in bldg_i]
+            obj_dicts = []
+            for start, end in obj_ranges:
+                inf.seek(start)
+                obj_dicts.append(json.loads(inf.read(end - start).decode('utf-8')))
+            model_data[key] = obj_dicts
+    return data, Model.from_dict(model_data)
+
+
+def file_hash(file_path):
+    """Get the SHA-256 hash of a file's contents, which is cached for the file's state."""
+    file_path = os.path.abspath(file_path)
+    file_stat = os.stat(file_path)
+    file_key = (file_path, file_stat.st_mtime, file_stat.st_size)
+    try:
+        hashes = sc.sticky[HASH_KEY]
+    except KeyError:
+        hashes = sc.sticky[HASH_KEY] = {}
+    if file_key not in hashes:
+        sha = hashlib.sha256()
+        with open(file_path, 'rb') as inf:
+            for chunk in iter(lambda: inf.read(1048576), b''):
+                sha.update(chunk)
+        hashes[file_key] = sha.hexdigest()
+    return hashes[file_key]
+
+
+def folder_size(folder):
+    """Get the total size of the files in a folder in bytes."""
+    return sum(os.path.getsize(os.path.join(root, f))
+               for root, _, files in os.walk(folder) for f in files)
+
+
+def extract_pomf(pomf_file):
+    """Get the path to the model.json of a POMF file, extracting it if it is not cached.
+
+    Archives are extracted to a temp folder named after the hash of their contents
+    such that the same archive is only extracted once. The least recently used
+    folders are deleted once the extracted files exceed POMF_CACHE_MAX_BYTES.
+    """
+    cache_dir = os.path.join(tempfile.gettempdir(), 'dragonfly_pomf')
+    folder_path = os.path.join(cache_dir, file_hash(pomf_file)[:16])
+    model_file = os.path.join(folder_path, 'model.json')
+    if not os.path.isfile(model_file):
+        # extract to a unique folder and rename it so partial extractions are not used
+        temp_path = '{}_{}'.format(folder_path, str(uuid.uuid4())[:6])
+        unzip_file(pomf_file, temp_path)
+        if os.path.isdir(folder_path):
+            shutil.rmtree(folder_path, ignore_errors=True)
+        os.rename(temp_path, folder_path)
+    os.utime(folder_path, None)  # mark the folder as recently used
+
+    # delete the least recently used folders if the cache is too large
+    cached = [os.path.join(cache_dir, f) for f in os.listdir(cache_dir)]
+    cached = sorted((os.path.getmtime(f), f) for f in cached if os.path.isdir(f))
+    sizes = dict((f, folder_size(f)) for _, f in cached)
+    total_size = sum(sizes.values())
+    for _, old_folder in cached:
+        if total_size <= POMF_CACHE_MAX_BYTES:
+            break
+        if old_folder != folder_path:
+            shutil.rmtree(old_folder, ignore_errors=True)
+            total_size -= sizes[old_folder]
+    return model_file
+
+
+# keys of the Model objects that are indexed and the geometry keys removed from them
+MODEL_OBJ_KEYS = ('buildings', 'context_shades')
+GEOMETRY_KEYS = ('floor_boundary', 'floor_holes', 'window_parameters',
+                 'shading_parameters', 'skylight_parameters', 'roof', 'geometry')
+# sticky key under which DFJSON indices are cached and the number of files cached
+INDEX_KEY = 'dragonfly_dfjson_index'
+INDEX_MAX_FILES = 10
+# sticky key under which POMF hashes are cached and the maximum size of extracted files
+HASH_KEY = 'dragonfly_pomf_hash'
+POMF_CACHE_MAX_BYTES = 5e9
+
+
 if all_required_inputs(ghenv.Component) and _load:
     # first, check whether the file is a Pollination Model Format (.POMF) file
-    if zipfile.is_zipfile(_df_file):
-        folder_name = str(uuid.uuid4())[:6]
-        temp_dir = tempfile.gettempdir()
-        folder_path = os.path.join(temp_dir, folder_name)
-        os.mkdir(folder_path)
-        unzip_file(_df_file, folder_path)
-        _df_file = os.path.join(folder_path, 'model.json')
-
-    # then
-    with io.open(_df_file, encoding='utf-8') as inf:
-        first_char = inf.read(1)
-        second_char = inf.read(1)
-    with io.open(_df_file, encoding='utf-8') as inf:
-        if second_char == '{':
-            inf.read(1)
-        data = json.load(inf)
+    use_ids = len(bldg_ids_) != 0 and bldg_ids_[0] is not None
+    is_pomf = zipfile.is_zipfile(_df_file)
+    if is_pomf and no_extract_ and not use_ids:
+        # read the model.json straight from the archive
+        with zipfile.ZipFile(_df_file) as pomf:
+            data, model = load_dfjson(io.TextIOWrapper(
+                pomf.open('model.json'), encoding='utf-8-sig')), None
+    else:
+        if is_pomf:  # extract the archive or get it from the cache
+            _df_file = extract_pomf(_df_file)
+        # then load the file or only the requested Buildings of a Model
+        if use_ids:
+            data, model = load_buildings(_df_file, bldg_ids_)
+        else:
+            data, model = load_dfjson(_df_file), None
 
     version_check(data)  # try to check the version
-    if 'type' in data:
+    if model is not None:
+        df_objs = model
+        model_units_tolerance_check(df_objs)
+    elif 'type' in data:
         df_objs = df_dict_util.dict_to_object(data, False)  # re-serialize as a core object
         if df_objs is None:  # try to re-serialize it as an energy object
             df_objs = df_energy_dict_to_object(data, False)
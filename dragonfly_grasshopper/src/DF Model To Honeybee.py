@@ -63,6 +63,19 @@ Convert a Dragonfly Model into a series of Honeybee Models.
             the results. If None, all other buildings will be included as context
             shade in each and every Model. Set to 0 to exclude all neighboring
             buildings from the resulting models. Default: None.
+        parallel_: Set to True to translate the Buildings in parallel using
+            several processes of the CPython that is installed with the
+            Ladybug Tools plugins. Each process translates one Building at
+            a time with the other Buildings of the Model as context shade and
+            each Building's Honeybee Models are returned in the order of the
+            input Buildings. The time taken to translate each Building is
+            written to the report. This is recommended for Models with many
+            Buildings and it has no effect when the _obj_per_model_ is
+            District. When a shade_dist_ is used, the processes index the
+            Buildings in a grid of their bounding rectangles such that each
+            Building only checks the distance to Buildings in nearby cells.
+            When False, the Model is translated in this Rhino process, which
+            checks the distance between every pair of Buildings. (Default: False).
         _run: Set to "True" to have the Dragonfly Model translated to a series
             of Honeybee Models.
 
@@ -76,11 +89,23 @@ Convert a Dragonfly Model into a series of Honeybee Models.
 
 ghenv.Component.Name = 'DF Model To Honeybee'
 ghenv.Component.NickName = 'ToHoneybee'
-ghenv.Component.Message = '1.10.0'
+ghenv.Component.Message = '1.10.5'
 ghenv.Component.Category = 'Dragonfly'
 ghenv.Component.SubCategory = '2 :: Serialize'
 ghenv.Component.AdditionalHelpFromDocStrings = '3'
 
+import os
+import shutil
+import subprocess
+import json
+import tempfile
+import uuid
+
+try:  # import the core honeybee dependencies
+    from honeybee.model import Model as HBModel
+    from honeybee.config import folders
+except ImportError as e:
+    raise ImportError('\nFailed to import honeybee:\n\t{}'.format(e))
 
 try:  # import the core dragonfly dependencies
     from dragonfly.model import Model
@@ -90,11 +115,153 @@ except ImportError as e:
 try:
     from ladybug_rhino.togeometry import to_vector2d
     from ladybug_rhino.config import current_tolerance
-    from ladybug_rhino.grasshopper import all_required_inputs
+    from ladybug_rhino.grasshopper import all_required_inputs, \
+        recommended_processor_count
 except ImportError as e:
     raise ImportError('\nFailed to import ladybug_rhino:\n\t{}'.format(e))
 
 
+# script that translates each Building of a DFJSON in a pool of processes
+TRANSLATE_SCRIPT = '''
+import json, math, os, sys, time
+from multiprocessing import Pool
+from honeybee.shade import Shade
+from dragonfly.model import Model
+from dragonfly.building import Building
+
+class GridIndex(object):
+    """Uniform grid of rectangles in plan for finding the rectangles near a rectangle."""
+
+    def __init__(self, rectangles, cell_size):
+        self.rectangles, self.cell_size, self.cells = rectangles, cell_size, {}
+        for i, rect in enumerate(rectangles):
+            for cell in self.cell_range(rect):
+                self.cells.setdefault(cell, []).append(i)
+
+    def cell_range(self, rect):
+        x_st, y_st = [int(math.floor(v / self.cell_size)) for v in rect[:2]]
+        x_end, y_end = [int(math.floor(v / self.cell_size)) for v in rect[2:]]
+        return [(x, y) for x in range(x_st, x_end + 1) for y in range(y_st, y_end + 1)]
+
+    def near(self, rect, distance):
+        """Get the sorted indices of rectangles in the cells near a rectangle."""
+        search = (rect[0] - distance, rect[1] - distance,
+                  rect[2] + distance, rect[3] + distance)
+        found = set()
+        for cell in self.cell_range(search):
+            found.update(self.cells.get(cell, ()))
+        return sorted(found)
+
+def load_model(model_file, folder, settings):
+    global MODEL, BLDG_SHADES, BLDG_PTS, CON_SHADES, CON_PTS, INDEX, FOLDER, SETTINGS
+    MODEL, FOLDER, SETTINGS = Model.from_dfjson(model_file), folder, settings
+    # use the same shades as Model.to_honeybee so that they have the same names
+    dist = settings['shade_distance']
+    BLDG_SHADES, BLDG_PTS, CON_SHADES, CON_PTS = Building._honeybee_shades(
+        MODEL.buildings, MODEL.context_shades, dist, True, settings['tolerance'])
+    # index the buildings in a grid so shade_distance only checks nearby buildings
+    INDEX = None
+    if dist is not None and dist > 0:
+        rects = [(p[0].x, p[0].y, p[2].x, p[2].y) for p in BLDG_PTS]
+        sizes = [max(r[2] - r[0], r[3] - r[1]) for r in rects]
+        INDEX = GridIndex(rects, max(dist, sum(sizes) / len(sizes)))
+
+def nearby_buildings(index):
+    """Get the indices of the other Buildings in the order Model.to_honeybee uses."""
+    dist = SETTINGS['shade_distance']
+    if dist is None:
+        near_i = range(len(MODEL.buildings))
+    elif dist == 0:
+        return []
+    else:
+        b_min, b_max = BLDG_PTS[index][0], BLDG_PTS[index][2]
+        near_i = [i for i in INDEX.near((b_min.x, b_min.y, b_max.x, b_max.y), dist)
+                  if Building._bound_rect_in_dist(BLDG_PTS[index], BLDG_PTS[i], dist)]
+    return [i for i in near_i if i > index] + [i for i in near_i if i < index]
+
+def add_context(hb_model, index):
+    for i in nearby_buildings(index):
+        for shd in BLDG_SHADES[i]:
+            hb_model.add_shade(shd)
+    dist = SETTINGS['shade_distance']
+    for c_shades, c_pts in zip(CON_SHADES, CON_PTS):
+        if dist is None or Building._bound_rect_in_dist(BLDG_PTS[index], c_pts, dist):
+            for shd in c_shades:
+                if isinstance(shd, Shade):
+                    hb_model.add_shade(shd)
+                else:
+                    hb_model.add_shade_mesh(shd)
+
+def translate(index):
+    start = time.time()
+    bldg_model = Model(
+        MODEL.identifier, [MODEL.buildings[index]], units=MODEL.units,
+        tolerance=MODEL.tolerance, angle_tolerance=MODEL.angle_tolerance)
+    settings = dict(SETTINGS, shade_distance=0)  # context is added afterwards
+    hb_files = []
+    for i, hb_model in enumerate(bldg_model.to_honeybee(cap=True, **settings)):
+        add_context(hb_model, index)
+        name = '{}_{}'.format(index, i)
+        hb_files.append(hb_model.to_hbjson(name, FOLDER))
+    return index, hb_files, time.time() - start
+
+if __name__ == '__main__':
+    model_file, folder = sys.argv[1], sys.argv[2]
+    bldg_count, cpu_count = int(sys.argv[3]), int(sys.argv[4])
+    settings = json.loads(sys.argv[5])
+    pool = Pool(cpu_count, load_model, (model_file, folder, settings))
+    for result in pool.imap(translate, range(bldg_count)):
+        sys.stdout.write(json.dumps(result) + '\\n')
+        sys.stdout.flush()
+    pool.close()
+    pool.join()
+'''
+
+
+def parallel_to_honeybee(model, settings):
+    """Translate a Dragonfly Model to Honeybee Models in a pool of CPython processes.
+
+    The Honeybee Models of each Building are loaded as soon as they are written
+    by the processes, though they are always returned in the order of the
+    Buildings in the Model.
+    """
+    # write the model and the translation script to a temp folder
+    folder = os.path.join(
+        tempfile.gettempdir(), 'df_to_hb_{}'.format(str(uuid.uuid4())[:8]))
+    os.mkdir(folder)
+    script_file = os.path.join(folder, 'translate_buildings.py')
+    with open(script_file, 'w') as f:
+        f.write(TRANSLATE_SCRIPT)
+    model_file = model.to_dfjson('model', folder)
+    cpu_count = min(recommended_processor_count(), len(model.buildings))
+
+    # execute the translation and load the Honeybee Models as they are written
+    cmds = [folders.python_exe_path, script_file, model_file, folder,
+            str(len(model.buildings)), str(cpu_count), json.dumps(settings)]
+    custom_env = os.environ.copy()
+    custom_env['PYTHONHOME'] = ''
+    err_file = os.path.join(folder, 'stderr.log')  # a file cannot fill up and block
+    hb_models = []
+    try:
+        with open(err_file, 'w') as err:
+            process = subprocess.Popen(
+                cmds, stdout=subprocess.PIPE, stderr=err, env=custom_env)
+            for line in iter(process.stdout.readline, b''):
+                index, hb_files, run_time = json.loads(line)
+                hb_models.extend(HBModel.from_hbjson(hb_f) for hb_f in hb_files)
+                print('Building "{}" translated in {:.2f} seconds.'.format(
+                    model.buildings[index].display_name, run_time))
+            process.wait()
+        if process.returncode != 0:
+            with open(err_file) as err:
+                stderr = err.read()
+            raise ValueError(
+                'Parallel translation to Honeybee failed:\n{}'.format(stderr))
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+    return hb_models
+
+
 if all_required_inputs(ghenv.Component) and _run:
     # set default inputs if not specified
     use_multiplier_ = use_multiplier_ if use_multiplier_ is not None else True
@@ -107,13 +274,26 @@ if all_required_inputs(ghenv.Component) and _run:
         'Expected Dragonfly Model object. Got {}.'.format(type(_model))
 
     # create the model objects
-    hb_models = _model.to_honeybee(
-        object_per_model=_obj_per_model_,
-        shade_distance=shade_dist_,
-        use_multiplier=use_multiplier_,
-        exclude_plenums=no_plenum_,
-        cap=True,
-        solve_ceiling_adjacencies=ceil_adjacency_,
-        merge_method=merge_method_,
-        tolerance=current_tolerance()
-    )
+    if parallel_ and _obj_per_model_.title() != 'District' and \
+            len(_model.buildings) > 1:
+        settings = {
+            'object_per_model': _obj_per_model_,
+            'shade_distance': shade_dist_,
+            'use_multiplier': use_multiplier_,
+            'exclude_plenums': no_plenum_,
+            'solve_ceiling_adjacencies': ceil_adjacency_,
+            'merge_method': merge_method_,
+            'tolerance': current_tolerance()
+        }
+        hb_models = parallel_to_honeybee(_model, settings)
+    else:
+        hb_models = _model.to_honeybee(
+            object_per_model=_obj_per_model_,
+            shade_distance=shade_dist_,
+            use_multiplier=use_multiplier_,
+            exclude_plenums=no_plenum_,
+            cap=True,
+            solve_ceiling_adjacencies=ceil_adjacency_,
+            merge_method=merge_method_,
+            tolerance=current_tolerance()
+        )
@@ -0,0 +1,345 @@
+# Dragonfly: A Plugin for Environmental Analysis (GPL)
+# This file is part of Dragonfly.
+#
+# Copyright (c) 2026, Ladybug Tools.
+# You should have received a copy of the GNU Affero General Public License
+# along with Dragonfly; If not, see <http://www.gnu.org/licenses/>.
+#
+# @license AGPL-3.0-or-later <https://spdx.org/licenses/AGPL-3.0-or-later>
+
+"""
+Convert a folder of .csv files obtained from the National Oceanic and Atmospheric
+Administration (NOAA) database into .epw files with one .epw for each station
+and year of data.
+_
+The files are grouped by the station ID within them and the stations are
+converted in parallel using several processes of the CPython that is installed
+with the Ladybug Tools plugins. All of the files of a station are read in a
+single pass and their data is split into years after the time zone shift such
+that the hours at the edges of each file are assigned to the correct year.
+Each observation is assigned to the nearest hour and any gaps of up to 6 hours
+without data are interpolated from the neighboring hours while longer gaps take
+the value of the nearest hour with data.
+_
+A summary index .csv with the station, year and coverage of each .epw is also
+written into the _folder_. The database can be accessed here:
+https://gis.ncdc.noaa.gov/maps/ncei/cdo/hourly
+-
+
+    Args:
+        _noaa_folder: The path to a folder of .csv files obtained from the NOAA
+            database. Each file should contain the data of a single station
+            but several files may contain data for the same station.
+        time_zone_: Optional time zone to be used for all of the stations. If
+            blank, a default time zone will be estimated from the longitude
+            of each station.
+        min_coverage_: A number between 0 and 100 for the minimum percentage of
+            hours in a year that must have dry bulb temperature data in order
+            for an .epw file to be written for the year. Years below this
+            coverage are still listed in the summary index. (Default: 50).
+        _folder_: A directory into which the .epw files and the summary index
+            will be written. If None, the default EPW folder is used.
+        _cpu_count_: An integer to set the number of CPUs used to convert the
+            stations. If unspecified, it will automatically default to one
+            less than the number of CPUs currently available on the machine
+            or the number of stations, whichever is smaller.
+        _run: Set to True to run the component and write the .epw files.
+
+    Returns:
+        report: Reports, errors, warnings, etc.
+        epw_files: A list of file paths to the .epw files that were written,
+            sorted by station and year.
+        index_file: File path to a .csv with one row for each station and year
+            in the NOAA files. Each row contains the station ID, city, year,
+            the percentage of hours in the year with dry bulb temperature
+            data and the path to the .epw file (if one was written).
+"""
+
+ghenv.Component.Name = 'DF NOAA Folder To EPW'
+ghenv.Component.NickName = 'NOAAToEPW'
+ghenv.Component.Message = '1.10.1'
+ghenv.Component.Category = "Dragonfly"
+ghenv.Component.SubCategory = '6 :: AlternativeWeather'
+ghenv.Component.AdditionalHelpFromDocStrings = '4'
+
+import os
+import shutil
+import subprocess
+import json
+import tempfile
+import uuid
+
+try:
+    from ladybug.config import folders as lb_folders
+except ImportError as e:
+    raise ImportError('\nFailed to import ladybug:\n\t{}'.format(e))
+
+try:
+    from honeybee.config import folders
+except ImportError as e:
+    raise ImportError('\nFailed to import honeybee:\n\t{}'.format(e))
+
+try:
+    from ladybug_rhino.grasshopper import all_required_inputs, \
+        recommended_processor_count
+except ImportError as e:
+    raise ImportError('\nFailed to import ladybug_rhino:\n\t{}'.format(e))
+
+
+# script that converts the NOAA files of each station in a pool of processes
+CONVERT_SCRIPT = '''
+import array, csv, json, os, sys, time
+from multiprocessing import Pool
+from ladybug.location import Location
+from ladybug.epw import EPW
+from ladybug.psychrometrics import rel_humid_from_db_dpt
+
+MONTH_START_DAYS = (0, 31, 59, 90, 120, 151, 181, 212, 243, 273, 304, 334)
+NOAA_COLUMNS = (
+    ('WND', (('wd', 0, '999', float), ('ws', 3, '9999', lambda v: float(v) / 10))),
+    ('CIG', (('ceil', 0, '99999', float),)),
+    ('VIS', (('vis', 0, '999999', lambda v: float(v) / 1000),)),
+    ('TMP', (('db_t', 0, '+9999', lambda v: float(v) / 10),)),
+    ('DEW', (('dp_t', 0, '+9999', lambda v: float(v) / 10),)),
+    ('SLP', (('slp', 0, '99999', lambda v: float(v) * 10),)),
+    ('GF1', (('sc', 0, '99', lambda v: min(int(round(int(v) * 1.25)), 10)),))
+)
+EPW_FIELDS = (
+    ('db_t', 'dry_bulb_temperature'), ('dp_t', 'dew_point_temperature'),
+    ('ws', 'wind_speed'), ('wd', 'wind_direction'), ('ceil', 'ceiling_height'),
+    ('vis', 'visibility'), ('slp', 'atmospheric_station_pressure'),
+    ('sc', 'total_sky_cover'), ('sc', 'opaque_sky_cover')
+)
+CIRCULAR_FIELDS = ('wd',)
+MAX_GAP = 6
+
+def is_leap_year(year):
+    return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+
+def noaa_timestamp(date_str, offset):
+    yr, month, day, hr, minute = int(date_str[:4]), int(date_str[5:7]), \\
+        int(date_str[8:10]), int(date_str[11:13]), int(date_str[14:16])
+    doy = MONTH_START_DAYS[month - 1] + day - 1
+    if month > 2 and is_leap_year(yr):
+        doy += 1
+    moy = doy * 1440 + hr * 60 + minute + offset
+    if moy < 0:
+        yr -= 1
+        moy += 527040 if is_leap_year(yr) else 525600
+    else:
+        yr_minutes = 527040 if is_leap_year(yr) else 525600
+        if moy >= yr_minutes:
+            yr += 1
+            moy -= yr_minutes
+    return yr, moy
+
+def station_location(noaa_file, time_zone):
+    with open(noaa_file) as station_file:
+        station_file.readline()
+        dat_line = station_file.readline().strip().split(',')
+    station_id = dat_line[0].replace('"', '')
+    longitude = float(dat_line[4].replace('"', ''))
+    if time_zone is None:
+        time_zone = int((longitude / 180) * 12)
+    return Location(
+        city=dat_line[6].replace('"', ''), latitude=float(dat_line[3].replace('"', '')),
+        longitude=longitude, time_zone=time_zone,
+        elevation=float(dat_line[5].replace('"', '')),
+        station_id=station_id, source='NCDC')
+
+def parse_station(noaa_files, offset):
+    """Parse the files of a station into hourly values for each year in one pass."""
+    nan, years = float('nan'), {}
+    for noaa_file in noaa_files:
+        with open(noaa_file) as csv_file:
+            csv_reader = csv.reader(csv_file, delimiter=',', skipinitialspace=True)
+            header = next(csv_reader)
+            columns = [(header.index(col_name), col_vars)
+                       for col_name, col_vars in NOAA_COLUMNS if col_name in header]
+            for row in csv_reader:
+                yr, moy = noaa_timestamp(row[1], offset)
+                hoy, dist = divmod(moy + 30, 60)
+                dist = abs(dist - 30)
+                if hoy == (8784 if is_leap_year(yr) else 8760):
+                    yr, hoy = yr + 1, 0
+                try:
+                    yr_data = years[yr]
+                except KeyError:
+                    yr_data = years[yr] = {}
+                for col, col_vars in columns:
+                    col_info = row[col].split(',')
+                    for var, field, missing, convert in col_vars:
+                        val = col_info[field] if field < len(col_info) else ''
+                        if val == missing or val == '':
+                            continue
+                        try:
+                            values, dists = yr_data[var]
+                        except KeyError:
+                            hrs = 8784 if is_leap_year(yr) else 8760
+                            values, dists = yr_data[var] = \\
+                                (array.array('d', [nan]) * hrs, array.array('i', [60]) * hrs)
+                        if dist < dists[hoy]:  # keep the observation nearest the hour
+                            values[hoy], dists[hoy] = convert(val), dist
+    return years
+
+def fill_holes(values, circular=False):
+    """Fill NaN values from the neighboring hours and return the count of original values.
+
+    Gaps up to MAX_GAP hours are linearly interpolated (along the shortest arc for
+    circular values in degrees) and longer gaps take the nearest original value.
+    """
+    known = [i for i, v in enumerate(values) if v == v]
+    if len(known) == 0:
+        return 0
+    for i in range(known[0]):
+        values[i] = values[known[0]]
+    for i in range(known[-1] + 1, len(values)):
+        values[i] = values[known[-1]]
+    for st, end in zip(known[:-1], known[1:]):
+        if end - st > MAX_GAP:
+            for i in range(st + 1, end):
+                values[i] = values[st] if i - st <= end - i else values[end]
+            continue
+        diff = values[end] - values[st]
+        if circular:
+            diff = (diff + 180) % 360 - 180
+        step = diff / (end - st)
+        for i in range(st + 1, end):
+            val = values[st] + step * (i - st)
+            values[i] = val % 360 if circular else val
+    return len(known)
+
+def convert_station(station):
+    """Write an EPW for each year of a station with enough coverage."""
+    start = time.time()
+    noaa_files = STATIONS[station]
+    location = station_location(noaa_files[0], SETTINGS['time_zone'])
+    years = parse_station(noaa_files, int(location.time_zone * 60))
+    results = []
+    for year in sorted(years):
+        yr_data, leap_yr = years[year], is_leap_year(year)
+        hrs = 8784 if leap_yr else 8760
+        coverage = fill_holes(yr_data['db_t'][0]) / hrs * 100 \\
+            if 'db_t' in yr_data else 0
+        if coverage < SETTINGS['min_coverage'] or coverage == 0:
+            results.append((year, coverage, None))
+            continue
+        epw_obj = EPW.from_missing_values(is_leap_year=leap_yr)
+        epw_obj.location = location
+        epw_obj.years.values = [year] * hrs
+        for var, attr in EPW_FIELDS:
+            if var in yr_data and \\
+                    fill_holes(yr_data[var][0], var in CIRCULAR_FIELDS) != 0:
+                values = yr_data[var][0].tolist()
+                if var == 'sc':
+                    values = [int(round(v)) for v in values]
+                getattr(epw_obj, attr).values = values
+        if 'dp_t' in yr_data:
+            epw_obj.relative_humidity.values = [
+                rel_humid_from_db_dpt(db, dp) for db, dp in
+                zip(yr_data['db_t'][0], yr_data['dp_t'][0])]
+        epw_file = os.path.join(
+            SETTINGS['folder'], '{}_{}.epw'.format(location.station_id, year))
+        epw_obj.save(epw_file)
+        results.append((year, coverage, epw_file))
+    return location.station_id, location.city, results, time.time() - start
+
+def init_worker(stations, settings):
+    global STATIONS, SETTINGS
+    STATIONS, SETTINGS = stations, settings
+
+if __name__ == '__main__':
+    noaa_folder, cpu_count = sys.argv[1], int(sys.argv[2])
+    settings = json.loads(sys.argv[3])
+    # group the files by the station ID on the first row of data
+    stations = {}
+    for f_name in sorted(os.listdir(noaa_folder)):
+        if f_name.lower().endswith('.csv'):
+            noaa_file = os.path.join(noaa_folder, f_name)
+            with open(noaa_file) as station_file:
+                station_file.readline()
+                station_id = station_file.readline().split(',')[0].replace('"', '')
+            if station_id:
+                stations.setdefault(station_id, []).append(noaa_file)
+    pool = Pool(min(cpu_count, max(len(stations), 1)), init_worker, (stations, settings))
+    for result in pool.imap_unordered(convert_station, sorted(stations)):
+        sys.stdout.write(json.dumps(result) + '\\n')
+        sys.stdout.flush()
+    pool.close()
+    pool.join()
+'''
+
+
+def convert_noaa_folder(noaa_folder, settings, cpu_count):
+    """Convert a folder of NOAA files to EPWs in a pool of CPython processes.
+
+    Returns:
+        A list of (station_id, city, year, coverage, epw_file) for each station year.
+    """
+    # write the conversion script to a temp folder
+    folder = os.path.join(
+        tempfile.gettempdir(), 'noaa_to_epw_{}'.format(str(uuid.uuid4())[:8]))
+    os.mkdir(folder)
+    script_file = os.path.join(folder, 'convert_stations.py')
+    with open(script_file, 'w') as f:
+        f.write(CONVERT_SCRIPT)
+
+    # execute the conversion and report each station as it is finished
+    cmds = [folders.python_exe_path, script_file, noaa_folder,
+            str(cpu_count), json.dumps(settings)]
+    custom_env = os.environ.copy()
+    custom_env['PYTHONHOME'] = ''
+    err_file = os.path.join(folder, 'stderr.log')
+    station_years = []
+    try:
+        with open(err_file, 'w') as err:
+            process = subprocess.Popen(
+                cmds, stdout=subprocess.PIPE, stderr=err, env=custom_env)
+            for line in iter(process.stdout.readline, b''):
+                station_id, city, results, run_time = json.loads(line)
+                for year, coverage, epw_file in results:
+                    station_years.append((station_id, city, year, coverage, epw_file))
+                print('Station "{}" ({}) converted {} years in {:.2f} seconds.'.format(
+                    station_id, city, len(results), run_time))
+            process.wait()
+        if process.returncode != 0:
+            with open(err_file) as err:
+                raise ValueError('Conversion of NOAA files failed:\n{}'.format(err.read()))
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+    station_years.sort(key=lambda r: (r[0], r[2]))
+    return station_years
+
+
+if all_required_inputs(ghenv.Component) and _run:
+    # check the inputs and set defaults
+    assert os.path.isdir(_noaa_folder), \
+        'Cannot find folder at {}.'.format(_noaa_folder)
+    if time_zone_ is not None:
+        assert -12 <= time_zone_ <= 14, ' time_zone_ must be between -12 and '\
+            ' 14. Got {}.'.format(time_zone_)
+    min_coverage_ = 50 if min_coverage_ is None else min_coverage_
+    _folder_ = lb_folders.default_epw_folder if _folder_ is None else _folder_
+    if not os.path.isdir(_folder_):
+        os.makedirs(_folder_)
+    cpu_count = _cpu_count_ if _cpu_count_ is not None \
+        else recommended_processor_count()
+
+    # convert all of the stations
+    settings = {
+        'time_zone': time_zone_,
+        'min_coverage': min_coverage_,
+        'folder': _folder_
+    }
+    station_years = convert_noaa_folder(_noaa_folder, settings, cpu_count)
+
+    # write the summary index of the station years
+    index_file = os.path.join(_folder_, 'noaa_epw_index.csv')
+    with open(index_file, 'w') as idx_f:
+        idx_f.write('station_id,city,year,coverage,epw_file\n')
+        for station_id, city, year, coverage, epw_file in station_years:
+            idx_f.write('{},"{}",{},{:.1f},{}\n'.format(
+                station_id, city, year, coverage, epw_file or ''))
+    epw_files = [r[4] for r in station_years if r[4] is not None]
+    print('{} .epw files were written for {} station years.'.format(
+        len(epw_files), len(station_years)))
@@ -14,6 +14,19 @@ Parse the typical energy use results for a District Energy System (DES).
         _sql: The path of an SQL result file that has been generated from an
             EnergyPlus simulation with the "DF Export District Energy System"
             component.
+        worker_: Set to True to send requests for CPython to a persistent worker
+            process, which stays running for the Rhino session with the result
+            parsing libraries already imported. This avoids the start-up time of
+            a new CPython process on each run of the component, which happens on
+            Mac or for SQL files larger than 100 MB. If the worker fails or does
+            not respond within 10 minutes, it is stopped and a new process is
+            used like usual. (Default: False).
+        cache_size_: A number for the maximum number of data values in millions
+            that are kept in memory by the DES result readers, which all share
+            one cache of the results parsed from the SQL files. The least
+            recently used results are removed from the cache once it holds more
+            values than this. Set to 0 to turn off the cache such that the SQL
+            is always parsed. (Default: 5).
 
     Returns:
         cooling: DataCollections for the cooling energy use in kWh.
@@ -27,14 +40,21 @@ Parse the typical energy use results for a District Energy System (DES).
 
 ghenv.Component.Name = 'DF Read DES Energy Result'
 ghenv.Component.NickName = 'DESEnergyResult'
-ghenv.Component.Message = '1.10.2'
+ghenv.Component.Message = '1.10.8'
 ghenv.Component.Category = 'Dragonfly'
 ghenv.Component.SubCategory = '5 :: District Thermal'
 ghenv.Component.AdditionalHelpFromDocStrings = '5'
 
 import os
 import subprocess
+import threading
 import json
+import array
+import tempfile
+import uuid
+from collections import OrderedDict
+
+import scriptcontext as sc
 
 try:
     from ladybug.sql import SQLiteResult
@@ -66,6 +86,225 @@ def serialize_data(data_dicts):
         return [DailyCollection.from_dict(data) for data in data_dicts]
 
 
+# script that writes SQL results as a JSON header followed by packed doubles
+EXPORT_SCRIPT = '''
+import array, json, sys
+from ladybug.sql import SQLiteResult
+sql_obj, header, values = SQLiteResult(sys.argv[1]), [], array.array('d')
+for out_name in sys.argv[3:]:
+    data_dicts = []
+    for data in sql_obj.data_collections_by_output_name(json.loads(out_name)):
+        data_dict = data.to_dict()
+        data_dict['values'] = len(data)
+        values.extend(data.values)
+        data_dicts.append(data_dict)
+    header.append(data_dicts)
+with open(sys.argv[2], 'wb') as f:
+    head = json.dumps(header).encode('utf-8')
+    f.write(('%d\\n' % len(head)).encode('ascii') + head)
+    values.tofile(f)
+'''
+
+
+# sticky key of the persistent CPython worker and the script that it runs
+WORKER_KEY = 'dragonfly_cpython_worker'
+WORKER_SCRIPT = '''
+import io, json, os, runpy, sys, traceback
+import honeybee_energy.cli, dragonfly_energy.cli
+# move the request and response pipes off of the standard file descriptors such
+# that commands and their sub-processes can neither read requests nor write responses
+requests, responses = os.fdopen(os.dup(0), 'r'), os.fdopen(os.dup(1), 'wb')
+os.dup2(os.open(os.devnull, os.O_RDONLY), 0)
+os.dup2(2, 1)
+sys.stdin = open(os.devnull)
+for line in requests:
+    argv, code, out, err = json.loads(line), 0, io.BytesIO(), io.BytesIO()
+    sys.argv = argv[1:] if argv[0] == '-m' else argv
+    sys.stdout = io.TextIOWrapper(out, encoding='utf-8')
+    sys.stderr = io.TextIOWrapper(err, encoding='utf-8')
+    try:
+        if argv[0] == '-m':
+            runpy.run_module(argv[1], run_name='__main__', alter_sys=True)
+        else:
+            runpy.run_path(argv[0], run_name='__main__')
+    except SystemExit as e:
+        code = 0 if e.code is None else e.code if isinstance(e.code, int) else 1
+    except Exception:
+        code = 1
+        traceback.print_exc()
+    sys.stdout.flush()
+    sys.stderr.flush()
+    data, err_data = out.getvalue(), err.getvalue()
+    sys.stdout, sys.stderr = sys.__stdout__, sys.__stderr__
+    head = '%d %d %d\\n' % (code, len(data), len(err_data))
+    responses.write(head.encode('ascii') + data + err_data)
+    responses.flush()
+'''
+WORKER_TIMEOUT = 600  # seconds to wait for a response from the worker
+
+
+def worker_process():
+    """Get the CPython worker of this Rhino session, starting it if it is not running."""
+    worker = sc.sticky.get(WORKER_KEY)
+    if worker is None or worker.poll() is not None:
+        custom_env = os.environ.copy()
+        custom_env['PYTHONHOME'] = ''
+        worker = subprocess.Popen(
+            [folders.python_exe_path, '-c', WORKER_SCRIPT], env=custom_env,
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        sc.sticky[WORKER_KEY] = worker
+    return worker
+
+
+def read_response(worker):
+    """Read the stdout and stderr of a command from the worker.
+
+    The response is read on a separate thread such that an exception is raised
+    if the worker does not respond within WORKER_TIMEOUT seconds.
+    """
+    response = []
+
+    def read():
+        try:
+            code, out_len, err_len = worker.stdout.readline().split()
+            response.append(
+                (worker.stdout.read(int(out_len)), worker.stdout.read(int(err_len))))
+        except Exception:
+            pass  # the worker has died or was killed
+
+    reader = threading.Thread(target=read)
+    reader.daemon = True
+    reader.start()
+    reader.join(WORKER_TIMEOUT)
+    if len(response) == 0:
+        raise IOError('The CPython worker did not respond.')
+    return response[0]
+
+
+def run_cli(cmds):
+    """Run a CPython command and return its stdout and stderr.
+
+    If worker_ is True, the command is sent to the persistent worker, which
+    already has the honeybee_energy and dragonfly_energy libraries imported.
+    Should the worker fail or hang, it is killed and the command is run in
+    a new process.
+    """
+    if worker_:
+        try:
+            worker = worker_process()
+            worker.stdin.write(json.dumps(cmds[1:]) + '\n')
+            worker.stdin.flush()
+            return read_response(worker)
+        except Exception:  # the worker has died or hung; use a new process
+            worker = sc.sticky.pop(WORKER_KEY, None)
+            if worker is not None and worker.poll() is None:
+                worker.kill()
+    use_shell = True if os.name == 'nt' else False
+    custom_env = os.environ.copy()
+    custom_env['PYTHONHOME'] = ''
+    process = subprocess.Popen(
+        cmds, stdout=subprocess.PIPE, stderr=subprocess.PIPE, shell=use_shell,
+        env=custom_env)
+    return process.communicate()
+
+
+def deserialize_data(data_file):
+    """Reserialize lists of data collections from a file written by EXPORT_SCRIPT.
+
+    The file starts with a JSON header of collection dictionaries, which have the
+    count of their values in place of the values themselves. All of the values
+    follow the header as a single block of packed doubles.
+    """
+    with open(data_file, 'rb') as f:
+        header = json.loads(f.read(int(f.readline())))
+        values = array.array('d')
+        values.fromfile(f, sum(d['values'] for data_dicts in header for d in data_dicts))
+    st_i = 0
+    for data_dicts in header:
+        for data in data_dicts:
+            end_i = st_i + data['values']
+            data['values'] = values[st_i:end_i]
+            st_i = end_i
+    return [serialize_data(data_dicts) for data_dicts in header]
+
+
+def load_outputs(sql_path, output_names):
+    """Load a list of data collections for each output name in an SQL file."""
+    if os.name == 'nt' and os.path.getsize(sql_path) < 1e8:
+        # small file on windows; use IronPython like usual
+        # create the SQL result parsing object
+        sql_obj = SQLiteResult(sql_path)
+        results = []
+        for out_name in output_names:
+            results.append(sql_obj.data_collections_by_output_name(out_name))
+        return results
+    else:  # we are on Mac; sqlite3 module doesn't work in Mac IronPython
+        # Execute a ladybug script to obtain the results via CPython
+        temp_dir = tempfile.gettempdir()
+        script_file = os.path.join(temp_dir, 'dragonfly_des_export.py')
+        with open(script_file, 'w') as f:
+            f.write(EXPORT_SCRIPT)
+        data_file = os.path.join(temp_dir, 'des_{}.bin'.format(str(uuid.uuid4())[:8]))
+        cmds = [folders.python_exe_path, script_file, sql_path, data_file]
+        for outp in output_names:
+            out_str = json.dumps(outp) if isinstance(outp, tuple) else '["{}"]'.format(outp)
+            cmds.append(out_str)
+        stdout, stderr = run_cli(cmds)
+        if not os.path.isfile(data_file):
+            raise ValueError('Failed to load the results of the SQL file with '
+                             'CPython:\n{}\n{}'.format(stdout, stderr).rstrip())
+        try:
+            return deserialize_data(data_file)
+        finally:
+            if os.path.isfile(data_file):
+                os.remove(data_file)
+
+
+def get_outputs(output_names):
+    """Get data collections for output names using the cache shared by DES readers.
+
+    Results are keyed on the SQL path, modification time, size and output name
+    so a re-run simulation is always re-parsed. The least recently used results
+    are evicted once the cache holds more than cache_size_ million data values.
+    """
+    # check the SQL file and get the key for its current state
+    assert os.path.isfile(_sql), 'No sql file found at: {}.'.format(_sql)
+    sql_path = os.path.abspath(_sql)
+    sql_stat = os.stat(sql_path)
+    sql_key = (sql_path, sql_stat.st_mtime, sql_stat.st_size)
+    if cache_size_ <= 0:  # parse the results without caching them
+        return load_outputs(sql_path, output_names)
+    try:
+        cache = sc.sticky[CACHE_KEY]
+    except KeyError:
+        cache = sc.sticky[CACHE_KEY] = OrderedDict()
+
+    # remove stale results from the same file and load any missing outputs
+    for key in list(cache.keys()):
+        if key[0] == sql_path and key[:3] != sql_key:
+            del cache[key]
+    keys = [sql_key + (out_name,) for out_name in output_names]
+    missing = [out for out, key in zip(output_names, keys) if key not in cache]
+    if len(missing) != 0:
+        for out_name, data in zip(missing, load_outputs(sql_path, missing)):
+            cache[sql_key + (out_name,)] = data
+
+    # mark the requested results as recently used and evict the oldest ones
+    results = []
+    for key in keys:
+        data = cache.pop(key)
+        cache[key] = data
+        results.append([dat.duplicate() for dat in data])
+    total_values = sum(len(dat) for data in cache.values() for dat in data)
+    while total_values > cache_size_ * 1e6 and len(cache) > len(keys):
+        old_data = cache.popitem(last=False)[1]
+        total_values -= sum(len(dat) for dat in old_data)
+    return results
+
+
+# sticky key under which SQL results are cached for all of the DES readers
+CACHE_KEY = 'dragonfly_des_sql_results'
+
 # List of all the output strings that will be requested
 cooling_outputs = (
     'Heat Pump Electricity Energy',
@@ -88,39 +327,11 @@ all_output = [cooling_outputs, heating_outputs, pump_electric_outputs, heat_reje
 
 
 if all_required_inputs(ghenv.Component):
-    # check the size of the SQL file to see if we should use the CLI
-    assert os.path.isfile(_sql), 'No sql file found at: {}.'.format(_sql)
-    if os.name == 'nt' and os.path.getsize(_sql) < 1e8:
-        # small file on windows; use IronPython like usual
-        # create the SQL result parsing object
-        sql_obj = SQLiteResult(_sql)
-
-        # get all of the results relevant for energy use
-        cooling = sql_obj.data_collections_by_output_name(cooling_outputs)
-        heating = sql_obj.data_collections_by_output_name(heating_outputs)
-        pumps = sql_obj.data_collections_by_output_name(pump_electric_outputs)
-        heat_rejection = sql_obj.data_collections_by_output_name(heat_rejection_outputs)
+    # set the default size of the cache
+    cache_size_ = 5 if cache_size_ is None else cache_size_
 
-    else:  # we are on Mac; sqlite3 module doesn't work in Mac IronPython
-        # Execute the honybee CLI to obtain the results via CPython
-        cmds = [folders.python_exe_path, '-m', 'honeybee_energy', 'result',
-                'data-by-outputs', _sql]
-        for outp in all_output:
-            out_str = json.dumps(outp) if isinstance(outp, tuple) else '["{}"]'.format(outp)
-            cmds.append(out_str)
-        use_shell = True if os.name == 'nt' else False
-        custom_env = os.environ.copy()
-        custom_env['PYTHONHOME'] = ''
-        process = subprocess.Popen(
-            cmds, stdout=subprocess.PIPE, shell=use_shell, env=custom_env)
-        stdout = process.communicate()
-        data_coll_dicts = json.loads(stdout[0])
-
-        # get all of the results relevant for energy use
-        cooling = serialize_data(data_coll_dicts[0])
-        heating = serialize_data(data_coll_dicts[1])
-        pumps = serialize_data(data_coll_dicts[2])
-        heat_rejection = serialize_data(data_coll_dicts[3])
+    # get all of the results relevant for energy use
+    cooling, heating, pumps, heat_rejection = get_outputs(all_output)
 
     # spearate supplemental heating into its correct list
     supplement_heat = []
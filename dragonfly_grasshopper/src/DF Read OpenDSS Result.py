@@ -9,12 +9,27 @@
 
 """
 Parse any CSV file output from an OpenDSS simulation.
+_
+All of the input CSVs are read in parallel into a compact columnar store that
+is cached for the Rhino session such that data collections can be quickly
+generated for any of the elements in the results.
 
 -
     Args:
         _dss_csv: The file path of any CSV result file that has been generated from
             an OpenDSS simulation. This can be either a Building CSV with voltage
             information or transformers/connectors with loading information.
+            This can also be a folder of results (eg. the "results" folder
+            of an OpenDSS simulation), in which case the CSV files in its
+            Features, Lines and Transformers sub-folders will be read. If
+            the folder has none of these sub-folders, the CSV files directly
+            inside of it will be read.
+        elements_: An optional list of the names of elements in the results (eg.
+            Building identifiers, "Line.XXX" or "Transformer.XXX") for which
+            data collections will be output. This is useful for large networks
+            with thousands of elements where only a few need to be inspected.
+            Changing this input does not re-read the CSV files. If None, data
+            collections for all elements will be output. (Default: None).
 
     Returns:
         factors: A list of data collections containing the dimensionless fractional values
@@ -30,23 +45,212 @@ Parse any CSV file output from an OpenDSS simulation.
 
 ghenv.Component.Name = 'DF Read OpenDSS Result'
 ghenv.Component.NickName = 'OpenDSSResult'
-ghenv.Component.Message = '1.10.0'
+ghenv.Component.Message = '1.10.2'
 ghenv.Component.Category = 'Dragonfly'
 ghenv.Component.SubCategory = '4 :: Electric Grid'
 ghenv.Component.AdditionalHelpFromDocStrings = '4'
 
+import os
+import datetime
+from array import array
+
+try:  # import the module for caching results in the Rhino session
+    import scriptcontext as sc
+except ImportError as e:
+    raise ImportError('\nFailed to import scriptcontext:\n\t{}'.format(e))
+
+try:
+    from ladybug.datacollection import HourlyContinuousCollection
+    from ladybug.header import Header
+    from ladybug.analysisperiod import AnalysisPeriod
+    from ladybug.datatype.fraction import Fraction
+except ImportError as e:
+    raise ImportError('\nFailed to import ladybug:\n\t{}'.format(e))
+
 try:
     from dragonfly_energy.opendss.result import OpenDSSResult
 except ImportError as e:
     raise ImportError('\nFailed to import dragonfly_energy:\n\t{}'.format(e))
 
 try:
-    from ladybug_rhino.grasshopper import all_required_inputs
+    from ladybug_rhino.grasshopper import all_required_inputs, \
+        recommended_processor_count, run_function_in_parallel
 except ImportError as e:
     raise ImportError('\nFailed to import ladybug_rhino:\n\t{}'.format(e))
 
 
+def result_files(paths):
+    """Get a list of CSV result files from a list of files and folders."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            res_dir = os.path.join(path, 'results')
+            if os.path.isdir(res_dir):
+                path = res_dir
+            folders = [os.path.join(path, f) for f in RESULT_FOLDERS
+                       if os.path.isdir(os.path.join(path, f))]
+            for folder in folders or [path]:
+                files.extend(os.path.join(folder, f) for f in sorted(os.listdir(folder))
+                             if f.endswith('.csv'))
+        else:
+            assert os.path.isfile(path), 'No file was found at {}'.format(path)
+            assert path.endswith('.csv'), '{} is not a CSV file.'.format(path)
+            files.append(path)
+    return files
+
+
+def parse_result(result_file):
+    """Parse an OpenDSS CSV result file into arrays of factors and conditions.
+
+    Returns:
+        A tuple with four values.
+
+        -   name -- The name of the element, taken from the file name.
+
+        -   period -- A tuple for the (month, day, month, day, timestep) of
+            the analysis period of the results.
+
+        -   factors -- An array of floats for the loading factors.
+
+        -   conditions -- An array of integers for the conditions, which
+            are -1 for under voltage, 1 for over voltage or overloaded and
+            0 for normal.
+    """
+    with open(result_file, 'r') as inf:
+        inf.readline()  # remove the header from the CSV
+        rows = [line.rstrip().split(',') for line in inf]
+    dts = [datetime.datetime.strptime(rows[i][0], '%Y/%m/%d %H:%M:%S')
+           for i in (0, 1, -2)]
+    timestep = int(3600 / (dts[1] - dts[0]).total_seconds())
+    period = (dts[0].month, dts[0].day, dts[-1].month, dts[-1].day, timestep,
+              dts[0].year % 4 == 0)
+
+    factors = array('d', (float(row[1]) for row in rows))
+    if len(rows[0]) == 4:  # building voltage results
+        conditions = array('b', (
+            1 if row[2] != 'False' else -1 if row[3] == 'True' else 0
+            for row in rows))
+    else:  # transformer or connector load
+        conditions = array('b', (0 if row[2] == 'False' else 1 for row in rows))
+    name = os.path.basename(result_file)[:-4]
+    return name, period, factors, conditions
+
+
+def load_results(files):
+    """Load CSV result files into a columnar store, which is cached for the session.
+
+    Returns:
+        A dictionary with the following keys.
+
+        -   names -- A list of the names of the elements in the results.
+
+        -   index -- A dictionary with the names of the elements as keys and
+            their indices in the names list as values.
+
+        -   periods -- A list of period tuples for each element.
+
+        -   offsets -- A list of the start of each element in the arrays, which
+            has one more item than the number of elements.
+
+        -   factors -- An array of the loading factors of all elements.
+
+        -   conditions -- An array of the conditions of all elements.
+    """
+    key = tuple((f, os.path.getmtime(f)) for f in files)
+    cached = sc.sticky.get(CACHE_KEY)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    parsed = [None] * len(files)
+
+    def parse_each(count):
+        parsed[count] = parse_result(files[count])
+
+    run_function_in_parallel(parse_each, len(files), recommended_processor_count())
+
+    store = {'names': [], 'periods': [], 'offsets': [0],
+             'factors': array('d'), 'conditions': array('b')}
+    for name, period, factors, conditions in parsed:
+        store['names'].append(name)
+        store['periods'].append(period)
+        store['factors'].extend(factors)
+        store['conditions'].extend(conditions)
+        store['offsets'].append(len(store['factors']))
+    store['index'] = dict((n, i) for i, n in enumerate(store['names']))
+    sc.sticky[CACHE_KEY] = (key, store)
+    return store
+
+
+def element_collections(store, i, periods):
+    """Get the factor and condition data collections of an element in a store.
+
+    Args:
+        store: A columnar store of results from the load_results function.
+        i: The index of the element in the store.
+        periods: A dictionary of AnalysisPeriods that have already been
+            created, which will be used to avoid re-creating them.
+
+    Returns:
+        A tuple with the data collection of factors and that of conditions.
+    """
+    p_key = store['periods'][i]
+    try:
+        a_period = periods[p_key]
+    except KeyError:
+        st_m, st_d, end_m, end_d, timestep, leap_yr = p_key
+        a_period = periods[p_key] = AnalysisPeriod(
+            st_m, st_d, 0, end_m, end_d, 23, timestep=timestep, is_leap_year=leap_yr)
+
+    # figure out the type of object to write into the metadata
+    obj_name = store['names'][i]
+    if obj_name.startswith('Line.'):
+        obj_name = obj_name.replace('Line.', '')
+        obj_type = 'Electrical Connector Loading'
+        cond_type = OpenDSSResult.IS_OVERLOADED
+    elif obj_name.startswith('Transformer.'):
+        obj_name = obj_name.replace('Transformer.', '')
+        obj_type = 'Transformer Loading'
+        cond_type = OpenDSSResult.IS_OVERLOADED
+    else:
+        obj_type = 'Building Voltage'
+        cond_type = OpenDSSResult.VOLTAGE_CONDITION
+    metadata = {'type': obj_type, 'name': obj_name}
+
+    # create the data collections from the slices of the arrays
+    st, end = store['offsets'][i], store['offsets'][i + 1]
+    header = Header(Fraction('Loading Factor'), 'fraction', a_period, metadata)
+    factor = HourlyContinuousCollection(header, store['factors'][st:end].tolist())
+    header = Header(cond_type, cond_type.units[0], a_period, metadata)
+    condition = HourlyContinuousCollection(
+        header, store['conditions'][st:end].tolist())
+    return factor, condition
+
+
+# sub-folders of the OpenDSS results folder that contain the CSV results
+RESULT_FOLDERS = ('Features', 'Lines', 'Transformers')
+# sticky key under which the columnar store of the last results is cached
+CACHE_KEY = 'dragonfly_opendss_results'
+
+
 if all_required_inputs(ghenv.Component):
-    result_obj = OpenDSSResult(_dss_csv)
-    factors = result_obj.factor_data
-    condition = result_obj.condition_data
+    # load all of the results into the columnar store
+    store = load_results(result_files(_dss_csv))
+
+    # get the indices of the requested elements
+    if len(elements_) == 0 or elements_[0] is None:
+        indices = range(len(store['names']))
+    else:
+        indices = []
+        for name in elements_:
+            try:
+                indices.append(store['index'][name])
+            except KeyError:
+                raise ValueError('No element named "{}" was found in the '
+                                 'OpenDSS results.'.format(name))
+
+    # create the data collections of the requested elements
+    factors, condition, periods = [], [], {}
+    for i in indices:
+        factor, cond = element_collections(store, i, periods)
+        factors.append(factor)
+        condition.append(cond)
@@ -28,6 +28,9 @@ run correctly through OpenDSS.
             automatically resized to meet demand over the course of
             the simulation. (Default: False).
         _run: Set to "True" to run the geojson and scenario through OpenDSS.
+            While the simulation runs, the component message shows the elapsed
+            time and an opendss_progress.json with the last output of OpenDSS
+            is written to the scenario run folder.
 
     Returns:
         report: Reports, errors, warnings, etc.
@@ -47,7 +50,7 @@ run correctly through OpenDSS.
 
 ghenv.Component.Name = 'DF Run OpenDSS'
 ghenv.Component.NickName = 'RunOpenDSS'
-ghenv.Component.Message = '1.10.0'
+ghenv.Component.Message = '1.10.3'
 ghenv.Component.Category = 'Dragonfly'
 ghenv.Component.SubCategory = '4 :: Electric Grid'
 ghenv.Component.AdditionalHelpFromDocStrings = '1'
@@ -55,6 +58,18 @@ ghenv.Component.AdditionalHelpFromDocStrings = '1'
 import os
 import subprocess
 import json
+import time
+import threading
+
+try:  # import the module for caching the dependency manifest in the Rhino session
+    import scriptcontext as sc
+except ImportError as e:
+    raise ImportError('\nFailed to import scriptcontext:\n\t{}'.format(e))
+
+try:  # import the Grasshopper canvas to repaint it while the simulation runs
+    from Grasshopper import Instances
+except ImportError as e:
+    raise ImportError('\nFailed to import Grasshopper:\n\t{}'.format(e))
 
 try:
     from ladybug.futil import nukedir
@@ -78,6 +93,239 @@ try:
 except ImportError as e:
     raise ImportError('\nFailed to import ladybug_rhino:\n\t{}'.format(e))
 
+
+def package_paths(dist_name, version, script):
+    """Get the paths to an installed package in the ladybug tools Python environment.
+
+    Args:
+        dist_name: Text for the name of the dist-info folder of the package.
+        version: Text for the version of the package.
+        script: Text for the name of the command line script of the package.
+            None if the package has no script.
+
+    Returns:
+        A dictionary with the version and the paths to the dist-info folder and
+        the script of the package. None if the package is not installed.
+    """
+    dist_info = os.path.join(
+        folders.python_package_path, '{}-{}.dist-info'.format(dist_name, version))
+    if not os.path.isdir(dist_info):
+        return None
+    script_path = None
+    if script is not None:
+        ext = '.exe' if os.name == 'nt' else ''
+        script_path = os.path.join(folders.python_scripts_path, script + ext)
+        if not os.path.isfile(script_path):
+            return None
+    return {'version': version, 'dist_info': dist_info, 'script': script_path}
+
+
+def pip_install(requirements, offline=False):
+    """Install several packages with a single call to pip.
+
+    Args:
+        requirements: A list of pip requirements (eg. "ghedesigner==1.5").
+        offline: Boolean to note whether the packages should only be installed
+            from the WHEELHOUSE folder without the use of the package index.
+
+    Returns:
+        The stderr of the pip call.
+    """
+    pip_args = ['install'] + list(requirements)
+    if os.path.isdir(WHEELHOUSE):
+        pip_args.extend(['--find-links', WHEELHOUSE])
+        if offline:
+            pip_args.append('--no-index')
+    pip_str = ' '.join('"{}"'.format(a) if ' ' in a else a for a in pip_args)
+    executor_path = os.path.join(
+        lb_folders.ladybug_tools_folder, 'grasshopper',
+        'ladybug_grasshopper_dotnet', 'Ladybug.Executor.exe')
+    if os.name == 'nt' and os.path.isfile(executor_path) and \
+            'Program Files' in executor_path:
+        pip_cmd = [
+            executor_path, folders.python_exe_path, '-m pip {}'.format(pip_str)
+        ]
+    elif os.name == 'nt':
+        pip_cmd = '"{py_exe}" -m pip {pip_args}'.format(
+            py_exe=folders.python_exe_path, pip_args=pip_str)
+    else:
+        pip_cmd = [folders.python_exe_path, '-m', 'pip'] + pip_args
+    custom_env = os.environ.copy()
+    custom_env['PYTHONHOME'] = ''
+    shell = True if os.name == 'nt' else False
+    process = subprocess.Popen(
+        pip_cmd, stderr=subprocess.PIPE, shell=shell, env=custom_env)
+    return process.communicate()[1]
+
+
+def ensure_packages(packages):
+    """Make sure that packages are installed in the ladybug tools Python environment.
+
+    Each package is only probed the first time that it is requested in the
+    Rhino session and the result is recorded in a manifest that is shared
+    by all components. All missing packages are installed with a single call to
+    pip, which first tries the wheels in the WHEELHOUSE folder if it exists.
+
+    Args:
+        packages: A list of tuples for the packages to check. Each tuple has the
+            pip name, the version, the name of the dist-info folder and the
+            name of the command line script of the package (or None).
+
+    Returns:
+        The manifest dictionary with the pip names of the packages as keys and
+        dictionaries of their version and paths as values.
+    """
+    try:
+        manifest = sc.sticky[MANIFEST_KEY]
+    except KeyError:
+        manifest = sc.sticky[MANIFEST_KEY] = {}
+    missing, probed = [], False
+    for name, version, dist_name, script in packages:
+        if name in manifest and manifest[name]['version'] == version:
+            continue
+        probed = True
+        paths = package_paths(dist_name, version, script)
+        if paths is None:
+            missing.append((name, version, dist_name, script))
+        else:
+            manifest[name] = paths
+
+    # install all missing packages together, trying the wheelhouse first
+    stderr = None
+    modes = (True, False) if os.path.isdir(WHEELHOUSE) else (False,)
+    for offline in modes:
+        if len(missing) == 0:
+            break
+        requirements = ['{}=={}'.format(m[0], m[1]) for m in missing]
+        stderr = pip_install(requirements, offline)
+        still_missing = []
+        for name, version, dist_name, script in missing:
+            paths = package_paths(dist_name, version, script)
+            if paths is None:
+                still_missing.append((name, version, dist_name, script))
+            else:
+                manifest[name] = paths
+        missing = still_missing
+    if probed:
+        save_manifest(manifest)
+    if len(missing) != 0:
+        raise ValueError('Failed to install {}:\n{}'.format(
+            ', '.join('{}=={}'.format(m[0], m[1]) for m in missing), stderr))
+    return manifest
+
+
+def save_manifest(manifest):
+    """Write the manifest of installed dependencies to MANIFEST_FILE."""
+    if os.path.isdir(os.path.dirname(MANIFEST_FILE)):
+        with open(MANIFEST_FILE, 'w') as outf:
+            json.dump(manifest, outf, indent=2)
+
+
+def read_lines(pipe, lines):
+    """Read all of the lines of a pipe into a list until the pipe is closed."""
+    for line in iter(pipe.readline, b''):
+        lines.append(line.decode('utf-8', 'ignore') if isinstance(line, bytes) else line)
+    pipe.close()
+
+
+def format_time(seconds):
+    """Get a short text representation of a number of seconds."""
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours != 0:
+        return '{}h{:02d}m'.format(hours, minutes)
+    return '{}m{:02d}s'.format(minutes, seconds) if minutes != 0 else '{}s'.format(seconds)
+
+
+def run_with_progress(cmds, progress_file, count_progress=None, unit='',
+                      shell=False, env=None):
+    """Run a command while reporting its progress in the component message.
+
+    The stdout and stderr of the command are read on background threads so
+    that the component message can be refreshed and a progress JSON can be
+    written while the command runs. The JSON has the status, the elapsed time,
+    the seconds since the progress last changed and the last line of output
+    such that a hung run can be told apart from a slow one.
+
+    Args:
+        cmds: The command to be run, which will be passed to subprocess.Popen.
+        progress_file: The path to a JSON file where the progress is written.
+        count_progress: An optional function that accepts the lines of stdout
+            read so far and returns a tuple with the number of units done, the
+            total number of units and the number of units that failed. If None,
+            only the elapsed time will be reported. (Default: None).
+        unit: Text for the name of the units that are counted. (Default: '').
+        shell: Boolean for whether the command is executed through the
+            shell. (Default: False).
+        env: An optional dictionary of environment variables. (Default: None).
+
+    Returns:
+        A tuple with the return code, the stdout and the stderr of the command.
+    """
+    process = subprocess.Popen(cmds, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                               shell=shell, env=env)
+    out_lines, err_lines = [], []
+    readers = []
+    for pipe, lines in ((process.stdout, out_lines), (process.stderr, err_lines)):
+        reader = threading.Thread(target=read_lines, args=(pipe, lines))
+        reader.daemon = True
+        reader.start()
+        readers.append(reader)
+
+    version = ghenv.Component.Message
+    start = last_change = time.time()
+    last_state, status = None, 'running'
+    try:
+        while status == 'running':
+            if process.poll() is not None:
+                for reader in readers:
+                    reader.join()
+                status = 'finished' if process.returncode == 0 else 'failed'
+            counts = count_progress(out_lines) if count_progress is not None else None
+            now = time.time()
+            if (counts, len(out_lines)) != last_state:
+                last_state, last_change = (counts, len(out_lines)), now
+            progress = {
+                'status': status, 'elapsed': round(now - start, 1),
+                'since_change': round(now - last_change, 1),
+                'last_output': out_lines[-1].strip() if out_lines else None
+            }
+            message = 'Running {}'.format(format_time(now - start))
+            if counts is not None:
+                done, total, failed = counts
+                eta = (now - start) / done * (total - done) if done != 0 else None
+                progress.update({
+                    'done': done, 'total': total, 'failed': failed,
+                    'eta': round(eta, 1) if eta is not None else None
+                })
+                message = '{}/{} {}'.format(done, total, unit)
+                if failed != 0:
+                    message = '{}, {} failed'.format(message, failed)
+                if eta is not None and status == 'running':
+                    message = '{}, ETA {}'.format(message, format_time(eta))
+            with open(progress_file, 'w') as outf:
+                json.dump(progress, outf, indent=2)
+            if status == 'running':
+                ghenv.Component.Message = message
+                canvas = Instances.ActiveCanvas
+                if canvas is not None:  # paint the canvas without handling other UI events
+                    canvas.Refresh()
+                time.sleep(REFRESH_SECONDS)
+    finally:
+        ghenv.Component.Message = version
+    return process.returncode, ''.join(out_lines), ''.join(err_lines)
+
+
+# seconds between each refresh of the progress while a command runs
+REFRESH_SECONDS = 1
+# folder of wheels used to install the dependencies without the package index
+WHEELHOUSE = os.path.join(lb_folders.ladybug_tools_folder, 'resources', 'wheelhouse')
+# file to which the manifest of installed dependencies is written
+MANIFEST_FILE = os.path.join(
+    lb_folders.ladybug_tools_folder, 'resources', 'dragonfly_dependencies.json')
+# sticky key under which the manifest of installed dependencies is cached
+MANIFEST_KEY = 'dragonfly_dependency_manifest'
+# versions of the packages used to run OpenDSS
 UO_DITTO_VERSION = '0.5.1'
 DITTO_VERSION = '0.2.3'
 TRAITLETS_VERSION = '5.9.0'
@@ -87,62 +335,15 @@ if all_required_inputs(ghenv.Component) and _run:
     # set up the custom python environment
     custom_env = os.environ.copy()
     custom_env['PYTHONHOME'] = ''
-    ext = '.exe' if os.name == 'nt' else ''
-    shell = True if os.name == 'nt' else False
-    executor_path = os.path.join(
-        lb_folders.ladybug_tools_folder, 'grasshopper',
-        'ladybug_grasshopper_dotnet', 'Ladybug.Executor.exe')
 
-    # check to see if the urbanopt-ditto-reader is installed
-    uo_ditto = '{}/ditto_reader_cli{}'.format(folders.python_scripts_path, ext)
-    uo_ditto_pack = '{}/urbanopt_ditto_reader-{}.dist-info'.format(
-        folders.python_package_path, UO_DITTO_VERSION)
-    if not os.path.isfile(uo_ditto) or not os.path.isdir(uo_ditto_pack):
-        if os.name == 'nt' and os.path.isfile(executor_path) and \
-                'Program Files' in executor_path:
-            pip_cmd = [
-                executor_path, folders.python_exe_path,
-                '-m pip install urbanopt-ditto-reader=={}'.format(UO_DITTO_VERSION)
-            ]
-        else:
-            pip_cmd = '"{py_exe}" -m pip install urbanopt-ditto-reader=={uo_ver}'.format(
-                py_exe=folders.python_exe_path, uo_ver=UO_DITTO_VERSION)
-        process = subprocess.Popen(
-            pip_cmd, stderr=subprocess.PIPE, shell=shell, env=custom_env)
-        stderr = process.communicate()
-
-    # make sure that a compatible version of ditto is installed
-    ditto_pack = '{}/ditto.py-{}.dist-info'.format(folders.python_package_path, DITTO_VERSION)
-    if not os.path.isdir(uo_ditto_pack):
-        if os.name == 'nt' and os.path.isfile(executor_path) and \
-                'Program Files' in executor_path:
-            pip_cmd = [
-                executor_path, folders.python_exe_path,
-                '-m pip install ditto.py=={}'.format(DITTO_VERSION)
-            ]
-        else:
-            pip_cmd = '"{py_exe}" -m pip install ditto.py=={d_ver}'.format(
-                py_exe=folders.python_exe_path, d_ver=DITTO_VERSION)
-        process = subprocess.Popen(
-            pip_cmd, stderr=subprocess.PIPE, shell=shell, env=custom_env)
-        stderr = process.communicate()
-
-    # install the old version of traitlets because Ditto didn't specify versions
-    traitlets_pack = '{}/traitlets-{}.dist-info'.format(
-        folders.python_package_path, TRAITLETS_VERSION)
-    if not os.path.isdir(traitlets_pack):
-        if os.name == 'nt' and os.path.isfile(executor_path) and \
-                'Program Files' in executor_path:
-            pip_cmd = [
-                executor_path, folders.python_exe_path,
-                '-m pip install traitlets=={}'.format(TRAITLETS_VERSION)
-            ]
-        else:
-            pip_cmd = '"{py_exe}" -m pip install traitlets=={tr_ver}'.format(
-                py_exe=folders.python_exe_path, tr_ver=TRAITLETS_VERSION)
-        process = subprocess.Popen(
-        pip_cmd, stderr=subprocess.PIPE, shell=shell, env=custom_env)
-        stderr = process.communicate()
+    # make sure that the urbanopt-ditto-reader and its dependencies are installed
+    manifest = ensure_packages([
+        ('urbanopt-ditto-reader', UO_DITTO_VERSION, 'urbanopt_ditto_reader',
+         'ditto_reader_cli'),
+        ('ditto.py', DITTO_VERSION, 'ditto.py', None),
+        ('traitlets', TRAITLETS_VERSION, 'traitlets', None)
+    ])
+    uo_ditto = manifest['urbanopt-ditto-reader']['script']
 
     # generate the default scenario report
     def_report = os.path.join(os.path.dirname(_geojson), 'run',
@@ -199,9 +400,9 @@ if all_required_inputs(ghenv.Component) and _run:
 
     # execute the command to run everything through OpenDSS
     shell = False if os.name == 'nt' else True
-    process = subprocess.Popen(
-        command, stderr=subprocess.PIPE, shell=shell, env=custom_env)
-    stderr = process.communicate()
+    progress_file = os.path.join(run_folder, 'opendss_progress.json')
+    returncode, stdout, stderr = run_with_progress(
+        command, progress_file, shell=shell, env=custom_env)
 
     # gather together all of the result files
     bldg_folder = os.path.join(result_folder, 'results', 'Features')
@@ -216,5 +417,5 @@ if all_required_inputs(ghenv.Component) and _run:
             'GeoJSON has an Electrical Network object in it\nor, if the GeoJSON has '\
             'a Road Network object in it, the "Run RNM" component\ncan be used to ' \
             'generate an Electrical Network that can be simulated in OpenDSS.\n{}'.format(
-                stderr[1])
+                stderr)
         raise ValueError(msg)
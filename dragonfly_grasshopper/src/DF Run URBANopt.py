@@ -49,13 +49,36 @@ https://docs.urbanopt.net/installation/installation.html
             running while the simulation is running. If set to None, it
             should automatically default to one less than the number of CPUs
             currently available on the machine (or 1 if the machine has only
-            one processor). (Default: None).
+            one processor). Buildings are queued from the longest to the shortest
+            estimated runtime so that large Buildings do not start last and
+            leave the other CPUs idle. Runtimes are estimated from the zones,
+            surfaces and floor area of each Building along with the timestep
+            and they are refined with the runtimes recorded in a runtimes.json
+            next to the geoJSON each time that the simulation is run. (Default: None).
+        incremental_: Set to True to only simulate the Buildings that have changed
+            since the last time this component was run with the same geoJSON
+            folder. Each Building is fingerprinted using its Honeybee Model JSON,
+            its geoJSON feature, the simulation parameters, the measures and the
+            EPW. The results of Buildings that simulated successfully are
+            kept in an "incremental" sub-folder of the geoJSON folder and
+            unchanged Buildings get these results linked back into the run
+            folder instead of being simulated again. Files are hard-linked
+            where possible so that the results are not copied on disk and
+            they are left as they are when the run folder already holds
+            them. (Default: False).
         _run: Set to "True" to run the geojson through URBANopt.
             This will ensure that all result files appear in their respective
             outputs from this component. This input can also be the integer "2",
             which will only run the setup of the URBANopt project folder
             (including the creation of the scenario file) but will not execute
-            the simulations.
+            the simulations. While the simulation runs, the component message
+            shows the number of Buildings done, the number that failed and the
+            estimated time remaining. This progress is also written to a
+            sim_progress.json next to the geoJSON. After the simulation, the
+            eplusout.err of each Building is read in parallel and a table with
+            the status, warning count, severe error count, fatal errors and
+            runtime of each Building is written to a simulation_errors.csv
+            and a simulation_errors.json next to the scenario.
 
     Returns:
         report: Reports, errors, warnings, etc.
@@ -77,12 +100,31 @@ https://docs.urbanopt.net/installation/installation.html
 
 ghenv.Component.Name = 'DF Run URBANopt'
 ghenv.Component.NickName = 'RunURBANopt'
-ghenv.Component.Message = '1.10.1'
+ghenv.Component.Message = '1.10.7'
 ghenv.Component.Category = 'Dragonfly'
 ghenv.Component.SubCategory = '3 :: Energy'
 ghenv.Component.AdditionalHelpFromDocStrings = '1'
 
+import os
+import json
 import subprocess
+import shutil
+import hashlib
+import uuid
+import datetime
+import time
+import threading
+from collections import OrderedDict
+
+try:  # import the module for caching files in the Rhino session
+    import scriptcontext as sc
+except ImportError as e:
+    raise ImportError('\nFailed to import scriptcontext:\n\t{}'.format(e))
+
+try:  # import the Grasshopper canvas to repaint it while the simulation runs
+    from Grasshopper import Instances
+except ImportError as e:
+    raise ImportError('\nFailed to import Grasshopper:\n\t{}'.format(e))
 
 try:
     from honeybee.config import folders
@@ -103,12 +145,466 @@ except ImportError as e:
 
 try:
     from ladybug_rhino.grasshopper import all_required_inputs, \
-        recommended_processor_count, give_warning
+        recommended_processor_count, give_warning, run_function_in_parallel
 except ImportError as e:
     raise ImportError('\nFailed to import ladybug_rhino:\n\t{}'.format(e))
 
-import os
-import json
+
+def file_hash(file_path):
+    """Get the SHA-256 hash of a file's contents, which is cached for the file's state."""
+    file_path = os.path.abspath(file_path)
+    file_stat = os.stat(file_path)
+    file_key = (file_path, file_stat.st_mtime, file_stat.st_size)
+    try:
+        hashes = sc.sticky[HASH_KEY]
+    except KeyError:
+        hashes = sc.sticky[HASH_KEY] = {}
+    if file_key not in hashes:
+        sha = hashlib.sha256()
+        with open(file_path, 'rb') as inf:
+            for chunk in iter(lambda: inf.read(1048576), b''):
+                sha.update(chunk)
+        hashes[file_key] = sha.hexdigest()
+    return hashes[file_key]
+
+
+def feature_fingerprints(geo_dict, directory, epw_file):
+    """Get a fingerprint for each Building feature of an URBANopt geoJSON.
+
+    The fingerprint of each Building is a hash of its Honeybee Model JSON and
+    geoJSON feature along with the inputs shared by all Buildings (the simulation
+    parameters, the base OSW with all measures and the EPW).
+
+    Args:
+        geo_dict: A dictionary of the URBANopt geoJSON.
+        directory: The URBANopt project folder, which has the simulation
+            parameter JSON and the mappers folder.
+        epw_file: The path to the EPW used in the simulation.
+
+    Returns:
+        An OrderedDict with the identifiers of the Buildings as keys and their
+        fingerprints as values. The order matches that of the geoJSON.
+    """
+    shared = hashlib.sha256()
+    for rel_path in SHARED_FILES:
+        file_path = os.path.join(directory, rel_path)
+        if os.path.isfile(file_path):
+            shared.update(file_hash(file_path).encode('utf-8'))
+    shared.update(file_hash(epw_file).encode('utf-8'))
+    project = json.dumps(geo_dict.get('project', {}), sort_keys=True)
+    shared.update(project.encode('utf-8'))
+
+    fingerprints = OrderedDict()
+    for feature in geo_dict['features']:
+        props = feature.get('properties', {})
+        if props.get('type') != 'Building' or 'id' not in props:
+            continue
+        bldg_hash = shared.copy()
+        bldg_hash.update(json.dumps(feature, sort_keys=True).encode('utf-8'))
+        hb_file = props.get('detailed_model_filename')
+        if hb_file and os.path.isfile(hb_file):
+            bldg_hash.update(file_hash(hb_file).encode('utf-8'))
+        fingerprints[props['id']] = bldg_hash.hexdigest()
+    return fingerprints
+
+
+def write_scenario(scenario, bldg_ids):
+    """Write a version of an URBANopt scenario CSV with certain Buildings in order.
+
+    URBANopt queues the simulations in the order of the scenario rows so this
+    can be used both to exclude Buildings and to set the order of simulation.
+
+    Args:
+        scenario: The path to the scenario CSV, which will be overwritten.
+        bldg_ids: A list of the identifiers of the Buildings to keep in the
+            order that they should be simulated.
+
+    Returns:
+        The original contents of the scenario CSV so that it can be restored.
+    """
+    with open(scenario, 'r') as inf:
+        original = inf.read()
+    lines = original.splitlines()
+    rows_by_id = dict((r.split(',')[0], r) for r in lines[1:])
+    rows = [lines[0]] + [rows_by_id[b] for b in bldg_ids if b in rows_by_id]
+    with open(scenario, 'w') as outf:
+        outf.write('\n'.join(rows) + '\n')
+    return original
+
+
+def model_work(hb_file):
+    """Get the relative amount of simulation work for a Honeybee Model JSON.
+
+    The work is a weighted sum of the number of surfaces, the number of zones
+    and the floor area of the Model, which are the main drivers of EnergyPlus
+    runtime. The result is cached for the contents of the file.
+    """
+    key = file_hash(hb_file)
+    try:
+        works = sc.sticky[WORK_KEY]
+    except KeyError:
+        works = sc.sticky[WORK_KEY] = {}
+    if key not in works:
+        with open(hb_file, 'r') as inf:
+            model_dict = json.load(inf)
+        rooms = model_dict.get('rooms', [])
+        surfaces, floor_area = 0, 0
+        for room in rooms:
+            for face in room['faces']:
+                surfaces += 1 + len(face.get('apertures', [])) + \
+                    len(face.get('doors', []))
+                if face['face_type'] == 'Floor':
+                    floor_area += polygon_area(face['geometry']['boundary'])
+        surfaces += len(model_dict.get('orphaned_shades', []))
+        works[key] = surfaces + ZONE_WORK * len(rooms) + AREA_WORK * floor_area
+    return works[key]
+
+
+def polygon_area(boundary):
+    """Get the area of a planar 3D polygon from its list of vertices."""
+    nx, ny, nz = 0, 0, 0
+    for i, (x1, y1, z1) in enumerate(boundary):
+        x2, y2, z2 = boundary[(i + 1) % len(boundary)]
+        nx += (y1 - y2) * (z1 + z2)
+        ny += (z1 - z2) * (x1 + x2)
+        nz += (x1 - x2) * (y1 + y2)
+    return (nx ** 2 + ny ** 2 + nz ** 2) ** 0.5 / 2
+
+
+def estimate_runtimes(geo_dict, timestep, runtimes):
+    """Estimate the simulation time of each Building feature in an URBANopt geoJSON.
+
+    Buildings that have a recorded runtime use their own measured seconds per
+    unit of work while other Buildings use the average of all recorded runtimes.
+
+    Args:
+        geo_dict: A dictionary of the URBANopt geoJSON.
+        timestep: The number of timesteps per hour of the simulation.
+        runtimes: A dictionary of recorded runtimes from previous simulations
+            with the Building identifiers as keys. Each value is a dictionary
+            with the "work" and the "seconds" of the simulation.
+
+    Returns:
+        A tuple with two dictionaries that have the Building identifiers as keys.
+
+        -   works -- The work of each Building used to record runtimes.
+
+        -   estimates -- The estimated seconds to simulate each Building.
+    """
+    works = OrderedDict()
+    for feature in geo_dict['features']:
+        props = feature.get('properties', {})
+        if props.get('type') != 'Building' or 'id' not in props:
+            continue
+        hb_file = props.get('detailed_model_filename')
+        works[props['id']] = model_work(hb_file) * timestep \
+            if hb_file and os.path.isfile(hb_file) else 0
+    recorded = [r for r in runtimes.values() if r['work'] > 0]
+    rate = sum(r['seconds'] for r in recorded) / sum(r['work'] for r in recorded) \
+        if len(recorded) != 0 else 1
+    estimates = {}
+    for bldg_id, work in works.items():
+        record = runtimes.get(bldg_id)
+        b_rate = record['seconds'] / record['work'] \
+            if record is not None and record['work'] > 0 else rate
+        estimates[bldg_id] = work * b_rate
+    return works, estimates
+
+
+def simulation_runtime(bldg_dir):
+    """Get the seconds that the OpenStudio workflow of a Building took to run.
+
+    None will be returned if the workflow did not record its start and end.
+    """
+    try:
+        with open(os.path.join(bldg_dir, 'out.osw'), 'r') as inf:
+            osw_dict = json.load(inf)
+        start = datetime.datetime.strptime(osw_dict['started_at'], OSW_TIME)
+        end = datetime.datetime.strptime(osw_dict['completed_at'], OSW_TIME)
+    except Exception:
+        return None
+    return (end - start).total_seconds()
+
+
+def read_lines(pipe, lines):
+    """Read all of the lines of a pipe into a list until the pipe is closed."""
+    for line in iter(pipe.readline, b''):
+        lines.append(line.decode('utf-8', 'ignore') if isinstance(line, bytes) else line)
+    pipe.close()
+
+
+def format_time(seconds):
+    """Get a short text representation of a number of seconds."""
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours != 0:
+        return '{}h{:02d}m'.format(hours, minutes)
+    return '{}m{:02d}s'.format(minutes, seconds) if minutes != 0 else '{}s'.format(seconds)
+
+
+def run_with_progress(cmds, progress_file, count_progress=None, unit='',
+                      shell=False, env=None):
+    """Run a command while reporting its progress in the component message.
+
+    The stdout and stderr of the command are read on background threads so
+    that the component message can be refreshed and a progress JSON can be
+    written while the command runs. The JSON has the status, the elapsed time,
+    the seconds since the progress last changed and the last line of output
+    such that a hung run can be told apart from a slow one.
+
+    Args:
+        cmds: The command to be run, which will be passed to subprocess.Popen.
+        progress_file: The path to a JSON file where the progress is written.
+        count_progress: An optional function that accepts the lines of stdout
+            read so far and returns a tuple with the number of units done, the
+            total number of units and the number of units that failed. If None,
+            only the elapsed time will be reported. (Default: None).
+        unit: Text for the name of the units that are counted. (Default: '').
+        shell: Boolean for whether the command is executed through the
+            shell. (Default: False).
+        env: An optional dictionary of environment variables. (Default: None).
+
+    Returns:
+        A tuple with the return code, the stdout and the stderr of the command.
+    """
+    process = subprocess.Popen(cmds, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                               shell=shell, env=env)
+    out_lines, err_lines = [], []
+    readers = []
+    for pipe, lines in ((process.stdout, out_lines), (process.stderr, err_lines)):
+        reader = threading.Thread(target=read_lines, args=(pipe, lines))
+        reader.daemon = True
+        reader.start()
+        readers.append(reader)
+
+    version = ghenv.Component.Message
+    start = last_change = time.time()
+    last_state, status = None, 'running'
+    try:
+        while status == 'running':
+            if process.poll() is not None:
+                for reader in readers:
+                    reader.join()
+                status = 'finished' if process.returncode == 0 else 'failed'
+            counts = count_progress(out_lines) if count_progress is not None else None
+            now = time.time()
+            if (counts, len(out_lines)) != last_state:
+                last_state, last_change = (counts, len(out_lines)), now
+            progress = {
+                'status': status, 'elapsed': round(now - start, 1),
+                'since_change': round(now - last_change, 1),
+                'last_output': out_lines[-1].strip() if out_lines else None
+            }
+            message = 'Running {}'.format(format_time(now - start))
+            if counts is not None:
+                done, total, failed = counts
+                eta = (now - start) / done * (total - done) if done != 0 else None
+                progress.update({
+                    'done': done, 'total': total, 'failed': failed,
+                    'eta': round(eta, 1) if eta is not None else None
+                })
+                message = '{}/{} {}'.format(done, total, unit)
+                if failed != 0:
+                    message = '{}, {} failed'.format(message, failed)
+                if eta is not None and status == 'running':
+                    message = '{}, ETA {}'.format(message, format_time(eta))
+            with open(progress_file, 'w') as outf:
+                json.dump(progress, outf, indent=2)
+            if status == 'running':
+                ghenv.Component.Message = message
+                canvas = Instances.ActiveCanvas
+                if canvas is not None:  # paint the canvas without handling other UI events
+                    canvas.Refresh()
+                time.sleep(REFRESH_SECONDS)
+    finally:
+        ghenv.Component.Message = version
+    return process.returncode, ''.join(out_lines), ''.join(err_lines)
+
+
+def count_finished(sim_dir, bldg_ids, start_time):
+    """Count the Buildings with OpenStudio workflows that ended after a start time.
+
+    Returns:
+        A tuple with the number of Buildings done, the total number of Buildings
+        and the number of Buildings that failed.
+    """
+    done, failed = 0, 0
+    for bldg_id in bldg_ids:
+        bldg_dir = os.path.join(sim_dir, bldg_id)
+        for job_file in ('finished.job', 'failed.job'):
+            job_path = os.path.join(bldg_dir, job_file)
+            if os.path.isfile(job_path) and os.path.getmtime(job_path) >= start_time:
+                done += 1
+                failed += job_file == 'failed.job'
+                break
+    return done, len(bldg_ids), failed
+
+
+def triage_building(sim_dir, bldg_id):
+    """Summarize the EnergyPlus errors and the runtime of a simulated Building.
+
+    Returns:
+        A tuple with two values.
+
+        -   row -- An OrderedDict for the row of the Building in the error table.
+
+        -   err_obj -- The Err object of the Building, which is None if the
+            Building has no eplusout.err.
+    """
+    bldg_dir = os.path.join(sim_dir, bldg_id)
+    err_file = os.path.join(bldg_dir, 'eplusout.err')
+    err_obj = Err(err_file) if os.path.isfile(err_file) else None
+    if os.path.isfile(os.path.join(bldg_dir, 'failed.job')):
+        status = 'failed'
+    elif os.path.isfile(os.path.join(bldg_dir, 'eplusout.sql')):
+        status = 'finished'
+    else:
+        status = 'not run'
+    row = OrderedDict([
+        ('building', bldg_id),
+        ('status', status),
+        ('warnings', len(err_obj.warnings) if err_obj is not None else 0),
+        ('severe', len(err_obj.severe_errors) if err_obj is not None else 0),
+        ('fatal', ' | '.join(' '.join(e.split()) for e in err_obj.fatal_errors)
+         if err_obj is not None else ''),
+        ('runtime', simulation_runtime(bldg_dir))
+    ])
+    return row, err_obj
+
+
+def write_error_table(rows, directory):
+    """Write a table of the errors of all Buildings to CSV and JSON files.
+
+    Returns:
+        A tuple with the paths to the CSV and the JSON files.
+    """
+    csv_file = os.path.join(directory, 'simulation_errors.csv')
+    with open(csv_file, 'w') as outf:
+        outf.write('{}\n'.format(','.join(rows[0].keys())))
+        for row in rows:
+            values = ['' if v is None else str(v) for v in row.values()]
+            # quote the fatal errors since they can contain commas
+            values[-2] = '"{}"'.format(values[-2].replace('"', '""'))
+            outf.write('{}\n'.format(','.join(values)))
+    json_file = os.path.join(directory, 'simulation_errors.json')
+    with open(json_file, 'w') as outf:
+        json.dump(rows, outf, indent=2)
+    return csv_file, json_file
+
+
+def link_tree(src_dir, dst_dir):
+    """Hard-link all of the files of a folder into a new folder.
+
+    Files are copied when they cannot be hard-linked, such as when the folders
+    are on different drives or when the Python does not support hard links.
+    """
+    for root, dirs, files in os.walk(src_dir):
+        dst_root = os.path.join(dst_dir, os.path.relpath(root, src_dir))
+        os.makedirs(dst_root)
+        for f_name in files:
+            src_file = os.path.join(root, f_name)
+            dst_file = os.path.join(dst_root, f_name)
+            try:
+                os.link(src_file, dst_file)
+            except (AttributeError, OSError):
+                shutil.copy2(src_file, dst_file)
+
+
+def result_fingerprint(bldg_dir):
+    """Get the fingerprint of the results in a Building folder or None if it has none."""
+    fp_file = os.path.join(bldg_dir, FINGERPRINT_FILE)
+    if not os.path.isfile(fp_file):
+        return None
+    with open(fp_file, 'r') as inf:
+        return inf.read().strip()
+
+
+def store_results(cache_dir, sim_dir, fingerprints, manifest):
+    """Link the results of successfully simulated Buildings into the cache.
+
+    Args:
+        cache_dir: The folder in which the results of each Building are kept.
+        sim_dir: The folder in which URBANopt simulated the Buildings.
+        fingerprints: A dictionary of the fingerprints of the Buildings that
+            were simulated.
+        manifest: The dictionary of fingerprints for the cached results, which
+            will be updated with the Buildings that were stored.
+    """
+    for bldg_id, fingerprint in fingerprints.items():
+        manifest.pop(bldg_id, None)
+        bldg_dir = os.path.join(sim_dir, bldg_id)
+        if not os.path.isfile(os.path.join(bldg_dir, 'eplusout.sql')) or \
+                os.path.isfile(os.path.join(bldg_dir, 'failed.job')):
+            continue
+        fp_file = os.path.join(bldg_dir, FINGERPRINT_FILE)
+        if os.path.isfile(fp_file):  # never write through a link to the cache
+            os.remove(fp_file)
+        with open(fp_file, 'w') as outf:
+            outf.write(fingerprint)
+        # link to a unique folder and rename it so partial folders are not used
+        folder_path = os.path.join(cache_dir, bldg_id)
+        temp_path = '{}_{}'.format(folder_path, str(uuid.uuid4())[:6])
+        link_tree(bldg_dir, temp_path)
+        if os.path.isdir(folder_path):
+            shutil.rmtree(folder_path, ignore_errors=True)
+        os.rename(temp_path, folder_path)
+        manifest[bldg_id] = fingerprint
+
+
+def restore_results(cache_dir, sim_dir, manifest, bldg_ids):
+    """Link the cached results of Buildings into the URBANopt run folder.
+
+    Buildings with run folders that already hold their cached results are skipped.
+    """
+    for bldg_id in bldg_ids:
+        bldg_dir = os.path.join(sim_dir, bldg_id)
+        if result_fingerprint(bldg_dir) == manifest[bldg_id]:
+            continue
+        if os.path.isdir(bldg_dir):
+            shutil.rmtree(bldg_dir, ignore_errors=True)
+        link_tree(os.path.join(cache_dir, bldg_id), bldg_dir)
+
+
+def result_files(sim_dir, bldg_ids):
+    """Get the simulation result files of Buildings in the URBANopt run folder.
+
+    Returns:
+        A list of file paths for each of the RESULT_FILES in the order they
+        appear in that tuple. Files that do not exist are excluded.
+    """
+    results = [[] for _ in RESULT_FILES]
+    for bldg_id in bldg_ids:
+        for r_list, r_file in zip(results, RESULT_FILES):
+            file_path = os.path.join(sim_dir, bldg_id, r_file)
+            if os.path.isfile(file_path):
+                r_list.append(file_path)
+    return results
+
+
+# seconds between each refresh of the progress while a command runs
+REFRESH_SECONDS = 1
+# files of the URBANopt folder that affect the simulation of all Buildings
+SHARED_FILES = (
+    'simulation_parameter.json', os.path.join('mappers', 'honeybee_workflow.osw')
+)
+# result files of each Building in the order of the component outputs
+RESULT_FILES = (
+    'in.osm', 'in.idf', 'eplusout.sql', 'epluszsz.csv', 'eplusout.rdd',
+    'eplustbl.htm', 'eplusout.err'
+)
+# weights of each zone and square meter of floor relative to each surface
+ZONE_WORK = 20
+AREA_WORK = 0.01
+# format of the start and end times recorded in the out.osw
+OSW_TIME = '%Y%m%dT%H%M%SZ'
+# name of the sub-folder of the geoJSON folder in which results are cached
+INCREMENTAL_FOLDER = 'incremental'
+# file in each Building folder with the fingerprint of its results
+FINGERPRINT_FILE = 'fingerprint.txt'
+# sticky key under which the hashes of the input files are cached
+HASH_KEY = 'dragonfly_urbanopt_hash'
+# sticky key under which the work of each Honeybee Model JSON is cached
+WORK_KEY = 'dragonfly_urbanopt_work'
 
 
 if all_required_inputs(ghenv.Component) and _run:
@@ -154,43 +650,119 @@ if all_required_inputs(ghenv.Component) and _run:
     _cpus_ = _cpus_ if _cpus_ is not None else recommended_processor_count()
     scenario = prepare_urbanopt_folder(_geojson, _cpus_)
 
-    # execute the simulation with URBANopt CLI
+    # figure out which Buildings must be simulated if the run is incremental
+    sim_dir = os.path.join(directory, 'run', 'honeybee_scenario')
     if _run == 1:
-        # execute all translation and simulation with a command
-        log_file = os.path.join(directory, 'sim.log')
-        cmds = [
-            folders.python_exe_path, '-m', 'dragonfly_energy', 'simulate', 'urbanopt',
-            _geojson, scenario, '--log-file', log_file
-        ]
-        custom_env = os.environ.copy()
-        custom_env['PYTHONHOME'] = ''
-        process = subprocess.Popen(cmds, env=custom_env)
-        process.communicate()
+        with open(_geojson, 'r') as inf:
+            geo_dict = json.load(inf)
+    if _run == 1 and incremental_:
+        cache_dir = os.path.join(directory, INCREMENTAL_FOLDER)
+        manifest_file = os.path.join(cache_dir, 'fingerprints.json')
+        manifest = {}
+        if os.path.isfile(manifest_file):
+            with open(manifest_file, 'r') as inf:
+                manifest = json.load(inf)
+        fingerprints = feature_fingerprints(geo_dict, directory, _epw_file)
+        clean = [b for b, fp in fingerprints.items() if manifest.get(b) == fp
+                 and os.path.isdir(os.path.join(cache_dir, b))]
+        clean_set = set(clean)
+        dirty = OrderedDict(
+            (b, fp) for b, fp in fingerprints.items() if b not in clean_set)
+
+    # execute the simulation with URBANopt CLI
+    if _run == 1 and (not incremental_ or len(dirty) != 0):
+        # order the Buildings from the longest to the shortest estimated runtime
+        runtime_file = os.path.join(directory, 'runtimes.json')
+        runtimes = {}
+        if os.path.isfile(runtime_file):
+            with open(runtime_file, 'r') as inf:
+                runtimes = json.load(inf)
+        works, estimates = estimate_runtimes(geo_dict, _sim_par_.timestep, runtimes)
+        to_run = dirty.keys() if incremental_ else works.keys()
+        to_run = sorted(to_run, key=lambda b: estimates[b], reverse=True)
+        if incremental_:  # the files of old results may be linked to the cache
+            for bldg_id in to_run:
+                shutil.rmtree(os.path.join(sim_dir, bldg_id), ignore_errors=True)
+        full_scenario = write_scenario(scenario, to_run)
+        try:
+            # execute all translation and simulation with a command
+            log_file = os.path.join(directory, 'sim.log')
+            cmds = [
+                folders.python_exe_path, '-m', 'dragonfly_energy', 'simulate',
+                'urbanopt', _geojson, scenario, '--log-file', log_file
+            ]
+            custom_env = os.environ.copy()
+            custom_env['PYTHONHOME'] = ''
+            start_time = time.time()
+            run_with_progress(
+                cmds, os.path.join(directory, 'sim_progress.json'),
+                lambda lines: count_finished(sim_dir, to_run, start_time),
+                'Buildings', env=custom_env)
+        finally:
+            with open(scenario, 'w') as outf:
+                outf.write(full_scenario)
+
+        # record the runtime of each Building to refine the next estimates
+        for bldg_id in to_run:
+            seconds = simulation_runtime(os.path.join(sim_dir, bldg_id))
+            if seconds is not None and works[bldg_id] > 0:
+                runtimes[bldg_id] = {'work': works[bldg_id], 'seconds': seconds}
+        with open(runtime_file, 'w') as outf:
+            json.dump(runtimes, outf, indent=2)
 
         # get the result files from the log file
-        with open(log_file, 'r') as fp:
-            log_dict = json.load(fp)
-        osm = log_dict['osm']
-        idf = log_dict['idf']
-        sql = log_dict['sql']
-        zsz = log_dict['zsz']
-        rdd = log_dict['rdd']
-        html = log_dict['html']
-        err = log_dict['err']
+        if not incremental_:
+            with open(log_file, 'r') as fp:
+                log_dict = json.load(fp)
+            osm = log_dict['osm']
+            idf = log_dict['idf']
+            sql = log_dict['sql']
+            zsz = log_dict['zsz']
+            rdd = log_dict['rdd']
+            html = log_dict['html']
+            err = log_dict['err']
+
+    # put the cached results back in the run folder and get all result files
+    if _run == 1 and incremental_:
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+        store_results(cache_dir, sim_dir, dirty, manifest)
+        for bldg_id in list(manifest.keys()):  # remove Buildings no longer in the Model
+            if bldg_id not in fingerprints:
+                shutil.rmtree(os.path.join(cache_dir, bldg_id), ignore_errors=True)
+                del manifest[bldg_id]
+        with open(manifest_file, 'w') as outf:
+            json.dump(manifest, outf, indent=2)
+        restore_results(cache_dir, sim_dir, manifest, clean)
+        osm, idf, sql, zsz, rdd, html, err = result_files(sim_dir, fingerprints.keys())
+        print('Simulated {} of {} Buildings. The others were unchanged and their '
+              'results were taken from the previous run.'.format(
+                  len(dirty), len(fingerprints)))
+
+    if _run == 1:
+        # summarize the errors of all Buildings in parallel and write them to a table
+        bldg_ids = [f['properties']['id'] for f in geo_dict['features']
+                    if f.get('properties', {}).get('type') == 'Building'
+                    and 'id' in f['properties']]
+        triage = [None] * len(bldg_ids)
+
+        def triage_err(count):
+            triage[count] = triage_building(sim_dir, bldg_ids[count])
+
+        if len(bldg_ids) != 0:
+            run_function_in_parallel(triage_err, len(bldg_ids), _cpus_)
+            write_error_table([t[0] for t in triage], directory)
 
         if len(sql) == 0:
             msg = 'All of the OpenStudio workflows failed to execute.\n' \
-                'Check the run.log files in the sub-folders of this directory:\n{}'.format(
-                    os.path.join(os.path.dirname(_geojson), 'run', 'honeybee_scenario'))
+                'Check the run.log files in the sub-folders of this directory:' \
+                '\n{}'.format(sim_dir)
             print(msg)
             raise Exception(msg)
-        for err_file in err:
-            fail_file = err_file.replace('eplusout.err', 'failed.job')
-            if os.path.isfile(fail_file):
-                err_obj = Err(err_file)
+        for row, err_obj in triage:
+            if row['status'] == 'failed' and err_obj is not None:
                 print(err_obj.file_contents)
                 for error in err_obj.fatal_errors:
-                    bldg = os.path.split(os.path.split(err_file)[0])[-1]
                     msg = 'The EnergyPlus simulation failed for Building ' \
-                        '"{}":\n{}'.format(bldg, error)
+                        '"{}":\n{}'.format(row['building'], error)
                     give_warning(ghenv.Component, msg)
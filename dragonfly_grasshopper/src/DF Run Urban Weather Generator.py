@@ -16,44 +16,81 @@ schema documentation (https://www.ladybug.tools/uwg-schema/index.html).
 _
 For a full list of publications on the Urban Weather Generator, see the MIT Urban
 Microclimate Group (http://urbanmicroclimate.scripts.mit.edu/publications.php).
+_
+Several Models, EPWs or simulation parameters can be connected to run a sweep of
+UWG simulations (eg. for a study of tree coverage or albedo). Inputs with a single
+item are used for all of the runs. Each run writes its own UWG JSON and the runs
+are simulated in parallel across a bounded pool of processes.
+_
+The urban EPW of each simulation is cached in a uwg_cache folder of the ladybug
+default_epw_folder under a hash of the UWG JSON and the contents of the rural
+EPW. Simulations with an unchanged Model, EPW and parameters return the cached
+urban EPW without running the UWG again.
 -
 
     Args:
         _model: A Dragonfly Model to be used to morph the EPW for the urban area.
+            This can also be a list of Model variants to run a sweep of UWG
+            simulations.
         _epw_file: Full path to an .epw file. This is the rural or airport file that
             will be morphed to reflect the climate conditions within an urban canyon.
+            This can also be a list of .epw files to run a sweep of UWG simulations.
         _sim_par_: A dragonfly UWG SimulationParameter object that describes all
-            of the setting for the simulation. If None, some default simulation
-            parameters will be used.
+            of the setting for the simulation. This can also be a list of
+            SimulationParameters to run a sweep of UWG simulations. If None,
+            some default simulation parameters will be used.
         _folder_: File path for the directory into which the the uwg JSON and morphed
             urban EPW will be written. If None, it will be written into the
             ladybug default_epw_folder within a subfolder bearing the name
-            of the dragonfly Model.
+            of the dragonfly Model. For a sweep, the index of each run is
+            appended to the names of its files.
+        _cpu_count_: An integer to set the number of UWG simulations that are run
+            at once in a sweep. If unspecified, it will automatically default
+            to one less than the number of CPUs currently available on the
+            machine or the number of runs, whichever is smaller.
+        cache_size_: A number for the maximum size of the cache of urban EPWs in
+            megabytes. The least recently used results are deleted from the
+            cache once it is larger than this size. Set to 0 to turn off the
+            cache such that the UWG is always run. (Default: 1000).
         _write: Set to "True" to generate a UWG JSON from the connected _model and
             parameters. This JSON can be edited and simulated by the UWG directly.
         run_: Set to "True" to simulate the uwg_json with the Urban Weather Generator
             (UWG) and morph the input EPW to account for urban heat island. This
             can also be the integer "2", which will run the UWG silently (without
-            any batch windows).
+            any batch windows). Sweeps of several runs are always run silently
+            and the wall time of each run is written to the report.
 
     Returns:
         report: Reports, errors, warnings, etc.
         uwg_json: Path to a fully-simulatable JSON file following the UWG schema.
             This contains all of the relevant Dragonfly Model properties and
-            input parameters.
+            input parameters. For a sweep, this is a list with one JSON for
+            each run.
         urban_epw: Path to the morphed EPW file output from the UWG, which represents
-            urban heat island conditions within the street canyon.
+            urban heat island conditions within the street canyon. For a sweep,
+            this is a list of EPWs in the order of the runs, with None for
+            any run that failed.
 """
 
 ghenv.Component.Name = 'DF Run Urban Weather Generator'
 ghenv.Component.NickName = 'RunUWG'
-ghenv.Component.Message = '1.10.0'
+ghenv.Component.Message = '1.10.1'
 ghenv.Component.Category = 'Dragonfly'
 ghenv.Component.SubCategory = '6 :: AlternativeWeather'
 ghenv.Component.AdditionalHelpFromDocStrings = '1'
 
 import os
 import json
+import subprocess
+import time
+import shutil
+import hashlib
+import uuid
+
+try:  # import the module for caching files in the Rhino session
+    import scriptcontext as sc
+except ImportError as e:
+    raise ImportError('\nFailed to import scriptcontext:\n\t{}'.format(e))
 
 try:  # import the core ladybug dependencies
     from ladybug.config import folders as lb_folders
@@ -61,6 +98,11 @@ try:  # import the core ladybug dependencies
 except ImportError as e:
     raise ImportError('\nFailed to import ladybug:\n\t{}'.format(e))
 
+try:  # import the core honeybee dependencies
+    from honeybee.config import folders
+except ImportError as e:
+    raise ImportError('\nFailed to import honeybee:\n\t{}'.format(e))
+
 try:  # import the dragonfly uwg dependencies
     from dragonfly_uwg.simulation.parameter import UWGSimulationParameter
     from dragonfly_uwg.run import run_uwg
@@ -68,29 +110,211 @@ except ImportError as e:
     raise ImportError('\nFailed to import dragonfly_uwg:\n\t{}'.format(e))
 
 try:
-    from ladybug_rhino.grasshopper import all_required_inputs
+    from ladybug_rhino.grasshopper import all_required_inputs, give_warning, \
+        recommended_processor_count
 except ImportError as e:
     raise ImportError('\nFailed to import ladybug_rhino:\n\t{}'.format(e))
 
 
+def write_uwg_json(model, epw_file, sim_par, folder, name):
+    """Write a Model to a UWG JSON and return the path to the JSON and its dictionary."""
+    if folder is None:
+        folder = os.path.join(lb_folders.default_epw_folder, model.identifier)
+    preparedir(folder, remove_content=False)
+    uwg_dict = model.to.uwg(model, epw_file, sim_par)
+    uwg_json = os.path.join(folder, '{}_uwg.json'.format(name))
+    with open(uwg_json, 'w') as fp:
+        json.dump(uwg_dict, fp, indent=4)
+    return uwg_json, uwg_dict
+
+
+def file_hash(file_path):
+    """Get the SHA-256 hash of a file's contents, which is cached for the file's state."""
+    file_path = os.path.abspath(file_path)
+    file_stat = os.stat(file_path)
+    file_key = (file_path, file_stat.st_mtime, file_stat.st_size)
+    try:
+        hashes = sc.sticky[HASH_KEY]
+    except KeyError:
+        hashes = sc.sticky[HASH_KEY] = {}
+    if file_key not in hashes:
+        sha = hashlib.sha256()
+        with open(file_path, 'rb') as inf:
+            for chunk in iter(lambda: inf.read(1048576), b''):
+                sha.update(chunk)
+        hashes[file_key] = sha.hexdigest()
+    return hashes[file_key]
+
+
+def uwg_result_key(uwg_dict, epw_file):
+    """Get a key for the result of a UWG simulation from its inputs.
+
+    The key is a hash of the UWG dictionary and the contents of the rural EPW
+    such that it does not change when the files are moved or renamed.
+    """
+    sha = hashlib.sha256(json.dumps(uwg_dict, sort_keys=True).encode('utf-8'))
+    sha.update(file_hash(epw_file).encode('utf-8'))
+    return sha.hexdigest()[:16]
+
+
+def load_cached_result(key, urban_epw):
+    """Copy a cached urban EPW to a file path and return whether it was in the cache."""
+    cached_epw = os.path.join(CACHE_DIR, key, 'urban.epw')
+    if not os.path.isfile(cached_epw):
+        return False
+    os.utime(os.path.dirname(cached_epw), None)  # mark the result as recently used
+    shutil.copy(cached_epw, urban_epw)
+    return True
+
+
+def cache_result(key, urban_epw, max_bytes):
+    """Add an urban EPW to the cache and delete the least recently used results.
+
+    Args:
+        key: Text for the key of the UWG simulation that produced the urban EPW.
+        urban_epw: The path to the urban EPW output from the UWG.
+        max_bytes: The maximum size of all results in the cache in bytes.
+    """
+    # copy to a unique folder and rename it so partial copies are not used
+    folder_path = os.path.join(CACHE_DIR, key)
+    temp_path = '{}_{}'.format(folder_path, str(uuid.uuid4())[:6])
+    os.makedirs(temp_path)
+    shutil.copy(urban_epw, os.path.join(temp_path, 'urban.epw'))
+    if os.path.isdir(folder_path):
+        shutil.rmtree(folder_path, ignore_errors=True)
+    os.rename(temp_path, folder_path)
+
+    # delete the least recently used results if the cache is too large
+    cached = [os.path.join(CACHE_DIR, f) for f in os.listdir(CACHE_DIR)]
+    cached = sorted((os.path.getmtime(f), f) for f in cached if os.path.isdir(f))
+    sizes = dict((f, sum(os.path.getsize(os.path.join(f, r)) for r in os.listdir(f)))
+                 for _, f in cached)
+    total_size = sum(sizes.values())
+    for _, old_folder in cached:
+        if total_size <= max_bytes:
+            break
+        if old_folder != folder_path:
+            shutil.rmtree(old_folder, ignore_errors=True)
+            total_size -= sizes[old_folder]
+
+
+def run_uwg_sweep(runs, cpu_count):
+    """Simulate several UWG JSONs in a bounded pool of processes.
+
+    Args:
+        runs: A list of tuples with the uwg_json, rural epw_file and urban EPW
+            name for each run. Runs that are None are not simulated.
+        cpu_count: The maximum number of UWG simulations that are run at once.
+
+    Returns:
+        A list with the path to the urban EPW of each run in the order of the
+        runs. Runs that failed have None.
+    """
+    custom_env = os.environ.copy()
+    custom_env['PYTHONHOME'] = ''
+    urban_epws = [None] * len(runs)
+    pending = [i for i, run in enumerate(runs) if run is not None]
+    running = {}
+    while len(pending) != 0 or len(running) != 0:
+        # start runs until the pool is full
+        while len(pending) != 0 and len(running) < cpu_count:
+            i = pending.pop(0)
+            uwg_json, epw_file, epw_name = runs[i]
+            folder = os.path.dirname(uwg_json)
+            log_file = open(uwg_json.replace('_uwg.json', '_uwg.log'), 'w')
+            cmds = [folders.python_exe_path, '-m', 'uwg', 'simulate', 'model',
+                    uwg_json, epw_file, '--new-epw-dir', folder,
+                    '--new-epw-name', epw_name]
+            process = subprocess.Popen(
+                cmds, stdout=log_file, stderr=subprocess.STDOUT, cwd=folder,
+                shell=os.name == 'nt', env=custom_env)
+            running[i] = (process, log_file, time.time())
+        # collect the runs that have finished
+        for i, (process, log_file, start) in list(running.items()):
+            if process.poll() is None:
+                continue
+            log_file.close()
+            del running[i]
+            epw = os.path.join(os.path.dirname(runs[i][0]), runs[i][2])
+            if process.returncode == 0 and os.path.isfile(epw):
+                urban_epws[i] = epw
+                print('UWG run {} finished in {:.1f} seconds.'.format(
+                    i, time.time() - start))
+            else:
+                give_warning(ghenv.Component, 'UWG run {} failed. See the log '
+                             'at: {}'.format(i, log_file.name))
+        time.sleep(0.2)
+    return urban_epws
+
+
+# folder in which the urban EPWs are cached
+CACHE_DIR = os.path.join(lb_folders.default_epw_folder, 'uwg_cache')
+# sticky key under which the hashes of the rural EPWs are cached
+HASH_KEY = 'dragonfly_epw_hash'
+
+
 if all_required_inputs(ghenv.Component) and _write:
-    # create the UWGSimulationParameter or use the input
-    if _sim_par_ is not None:
-        assert isinstance(_sim_par_, UWGSimulationParameter), \
-        'Expected UWG Simulation Parameters. Got {}.'.format(type(_sim_par_))
+    # create the UWGSimulationParameters or use the input
+    if len(_sim_par_) != 0:
+        for sim_par in _sim_par_:
+            assert isinstance(sim_par, UWGSimulationParameter), \
+                'Expected UWG Simulation Parameters. Got {}.'.format(type(sim_par))
+        sim_pars = _sim_par_
     else:
-        _sim_par_ = UWGSimulationParameter()
-
-    if run_ is not None and run_ > 0:  # write and simulate the UWG JSON
-        silent = True if run_ > 1 else False
-        uwg_json, urban_epw = run_uwg(_model, _epw_file, _sim_par_, _folder_, silent)
-    else:  # only write the UWG JSON but don't run it
-        # get the directory into which the urban epw will be written
-        if _folder_ is None:
-            _folder_ = os.path.join(lb_folders.default_epw_folder, _model.identifier)
-        preparedir(_folder_, remove_content=False)
-        # write the model to a UWG dictionary
-        uwg_dict = _model.to.uwg(_model, _epw_file, _sim_par_)
-        uwg_json = os.path.join(_folder_, '{}_uwg.json'.format(_model.identifier))
-        with open(uwg_json, 'w') as fp:
-            json.dump(uwg_dict, fp, indent=4)
+        sim_pars = [UWGSimulationParameter()]
+
+    # check that the inputs can be matched to one another for a sweep
+    run_count = max(len(_model), len(_epw_file), len(sim_pars))
+    for name, vals in (('_model', _model), ('_epw_file', _epw_file),
+                       ('_sim_par_', sim_pars)):
+        assert len(vals) in (1, run_count), 'The number of {} inputs ({}) must be 1 ' \
+            'or match the number of runs ({}).'.format(name, len(vals), run_count)
+    models = [_model[0]] * run_count if len(_model) == 1 else _model
+    epw_files = [_epw_file[0]] * run_count if len(_epw_file) == 1 else _epw_file
+    sim_pars = [sim_pars[0]] * run_count if len(sim_pars) == 1 else sim_pars
+
+    cache_size_ = 1000 if cache_size_ is None else cache_size_
+    use_cache = cache_size_ > 0 and run_ is not None and run_ > 0
+    if use_cache and not os.path.isdir(CACHE_DIR):
+        os.makedirs(CACHE_DIR)
+
+    if run_count == 1:  # run a single UWG simulation
+        model, epw_file, sim_par = models[0], epw_files[0], sim_pars[0]
+        uwg_json, uwg_dict = write_uwg_json(
+            model, epw_file, sim_par, _folder_, model.identifier)
+        if run_ is not None and run_ > 0:  # simulate the UWG JSON
+            key = uwg_result_key(uwg_dict, epw_file) if use_cache else None
+            urban_epw = os.path.join(
+                os.path.dirname(uwg_json), '{}.epw'.format(model.identifier))
+            if use_cache and load_cached_result(key, urban_epw):
+                print('The urban EPW was loaded from the cache.')
+            else:
+                silent = True if run_ > 1 else False
+                uwg_json, urban_epw = \
+                    run_uwg(model, epw_file, sim_par, _folder_, silent)
+                if use_cache and urban_epw is not None:
+                    cache_result(key, urban_epw, cache_size_ * 1e6)
+    else:  # write a UWG JSON for each run of the sweep
+        uwg_json, runs, keys, cached_epws = [], [], [], {}
+        for i, (model, epw_file, sim_par) in enumerate(zip(models, epw_files, sim_pars)):
+            name = '{}_{}'.format(model.identifier, i)
+            run_json, uwg_dict = write_uwg_json(model, epw_file, sim_par, _folder_, name)
+            uwg_json.append(run_json)
+            run = (run_json, os.path.abspath(epw_file), '{}.epw'.format(name))
+            key = uwg_result_key(uwg_dict, epw_file) if use_cache else None
+            run_epw = os.path.join(os.path.dirname(run_json), run[2])
+            if use_cache and load_cached_result(key, run_epw):
+                cached_epws[i] = run_epw
+                print('UWG run {} was loaded from the cache.'.format(i))
+                run = None
+            runs.append(run)
+            keys.append(key)
+        if run_ is not None and run_ > 0:  # simulate the runs in parallel
+            cpu_count = _cpu_count_ if _cpu_count_ is not None \
+                else recommended_processor_count()
+            urban_epw = run_uwg_sweep(runs, max(1, min(cpu_count, run_count)))
+            for i, run_epw in enumerate(urban_epw):
+                if i in cached_epws:
+                    urban_epw[i] = cached_epws[i]
+                elif use_cache and run_epw is not None:
+                    cache_result(keys[i], run_epw, cache_size_ * 1e6)
@@ -9,6 +9,9 @@
 
 """
 Solve adjacencies between the Room2Ds of Dragonfly objects.
+_
+Only the pairs of Room2Ds with overlapping bounding rectangles are checked for
+adjacency, which makes the component fast for stories with hundreds of Room2Ds.
 -
 
     Args:
@@ -36,6 +39,13 @@ Solve adjacencies between the Room2Ds of Dragonfly objects.
             discovered as adjacent. The "DF Intersect Room2Ds" component
             can be used to ensure adjacent rooms have matching segments
             without changing any boundary conditions. (Default: False).
+        incremental_: Set to True to cache the solved Room2Ds of each Story for the
+            Rhino session and reuse them the next time that the Story is solved
+            with the same inputs. The cache is keyed on all properties of the
+            Story's Room2Ds and the inputs of this component such that only
+            Stories that have changed upstream are solved again. This makes
+            re-solving large Models much faster when only a few Stories have
+            been edited. (Default: False).
         _run: Set to True to run the component and solve adjacencies.
 
     Returns:
@@ -46,11 +56,17 @@ Solve adjacencies between the Room2Ds of Dragonfly objects.
 
 ghenv.Component.Name = "DF Solve Adjacency"
 ghenv.Component.NickName = 'SolveAdj2D'
-ghenv.Component.Message = '1.10.0'
+ghenv.Component.Message = '1.10.5'
 ghenv.Component.Category = "Dragonfly"
 ghenv.Component.SubCategory = '0 :: Create'
 ghenv.Component.AdditionalHelpFromDocStrings = "4"
 
+import json
+import hashlib
+from collections import OrderedDict
+
+import scriptcontext as sc
+
 try:  # import the core honeybee dependencies
     from honeybee.boundarycondition import boundary_conditions
 except ImportError as e:
@@ -72,19 +88,82 @@ except ImportError as e:
 tolerance = current_tolerance()
 
 
+def overlapping_pairs(room2ds):
+    """Get sorted index pairs of Room2Ds with overlapping bounding rectangles.
+
+    The rectangles are swept along the X axis such that only the Room2Ds that
+    overlap one another in X are checked for overlap in Y.
+    """
+    rects = []
+    for room in room2ds:
+        min_pt, max_pt = room.floor_geometry.min, room.floor_geometry.max
+        rects.append((min_pt.x - tolerance, min_pt.y - tolerance,
+                      max_pt.x + tolerance, max_pt.y + tolerance))
+    pairs, active = [], []
+    for i in sorted(range(len(rects)), key=lambda i: rects[i][0]):
+        rect = rects[i]
+        active = [j for j in active if rects[j][2] >= rect[0]]
+        for j in active:
+            if rects[j][1] <= rect[3] and rect[1] <= rects[j][3]:
+                pairs.append((min(i, j), max(i, j)))
+        active.append(i)
+    pairs.sort()
+    return pairs
+
+
+def connected_groups(room_count, pairs):
+    """Get lists of Room2D indices that are connected to one another by pairs."""
+    parents = list(range(room_count))
+
+    def root(i):
+        while parents[i] != i:
+            parents[i] = parents[parents[i]]
+            i = parents[i]
+        return i
+
+    for i, j in pairs:
+        parents[root(j)] = root(i)
+    groups = {}
+    for i in range(room_count):
+        groups.setdefault(root(i), []).append(i)
+    return sorted(groups.values())
+
+
+def intersect_room2ds(room2ds, pairs):
+    """Intersect Room2Ds in groups that are connected by overlapping pairs."""
+    int_rooms = list(room2ds)
+    for group in connected_groups(len(room2ds), pairs):
+        if len(group) > 1:
+            group_rooms = [room2ds[i] for i in group]
+            group_rooms = Room2D.intersect_adjacency(group_rooms, tolerance)
+            for i, room in zip(group, group_rooms):
+                int_rooms[i] = room
+    return int_rooms
+
+
 def room2d_solve_adj(adj_room2ds):
     """Solve adjacency across a list of Room2Ds."""
+    # remove colinear vertices and find the pairs of Room2Ds that may be adjacent
+    if not no_overwrite_:
+        adj_room2ds = [room.remove_colinear_vertices(tolerance) for room in adj_room2ds]
+    pairs = overlapping_pairs(adj_room2ds)
+    room_count = len(adj_room2ds)
+    pair_counts[0] += room_count * (room_count - 1) // 2
+    pair_counts[1] += len(pairs)
+
     # solve adjacnecy
+    adj_info = []
     if no_overwrite_:  # only find adjacencies and re-assign them
-        adj_info = Room2D.find_adjacency(adj_room2ds, tolerance)
+        for i, j in pairs:
+            pair_rooms = [adj_room2ds[i], adj_room2ds[j]]
+            adj_info.extend(Room2D.find_adjacency(pair_rooms, tolerance))
         for wp in adj_info:
             wp[0][0].set_adjacency(wp[1][0], wp[0][1], wp[1][1])
-    else:  # remove colinear vertices, intersect and solve
-        clean_rooms = []
-        for room in adj_room2ds:
-            clean_rooms.append(room.remove_colinear_vertices(tolerance))
-        adj_room2ds = Room2D.intersect_adjacency(clean_rooms, tolerance)
-        adj_info = Room2D.solve_adjacency(adj_room2ds, tolerance)
+    else:  # intersect and solve
+        adj_room2ds = intersect_room2ds(adj_room2ds, pairs)
+        for i, j in pairs:
+            pair_rooms = [adj_room2ds[i], adj_room2ds[j]]
+            adj_info.extend(Room2D.solve_adjacency(pair_rooms, tolerance))
 
     # set adiabatic boundary conditions if requested
     if adiabatic_:
@@ -103,16 +182,68 @@ def room2d_solve_adj(adj_room2ds):
     return adj_room2ds
 
 
+def room2d_key(room2ds, roof=None):
+    """Get a key for the solved adjacency of Room2Ds from their properties and inputs."""
+    settings = (tolerance, bool(adiabatic_), bool(air_boundary_), bool(no_overwrite_))
+    rooms_dict = [room.to_dict() for room in room2ds]
+    if roof is not None:
+        rooms_dict.append(roof.to_dict())
+    rooms_str = json.dumps(rooms_dict, sort_keys=True)
+    return hashlib.md5((rooms_str + str(settings)).encode('utf-8')).hexdigest()
+
+
+def cached_solve_adj(room2ds, roof=None):
+    """Solve adjacency across Room2Ds, reusing the cached result if they are unchanged.
+
+    The cached Room2Ds have no parent and the returned Room2Ds get the parent
+    of the input Room2D in the same position. The least recently used results
+    are evicted once the cache holds more than CACHE_MAX_STORIES solved lists
+    of Room2Ds.
+    """
+    story_counts[1] += 1
+    if not incremental_:
+        story_counts[0] += 1
+        return room2d_solve_adj(room2ds)
+    try:
+        cache = sc.sticky[CACHE_KEY]
+    except KeyError:
+        cache = sc.sticky[CACHE_KEY] = OrderedDict()
+
+    # get the cached result or solve the Room2Ds and add them to the cache
+    key = room2d_key(room2ds, roof)
+    try:
+        solved_rooms = cache.pop(key)
+    except KeyError:
+        story_counts[0] += 1
+        solved_rooms = [room.duplicate() for room in room2d_solve_adj(room2ds)]
+        for room in solved_rooms:
+            room._parent = None
+    cache[key] = solved_rooms
+    while len(cache) > CACHE_MAX_STORIES:
+        cache.popitem(last=False)
+    new_rooms = [room.duplicate() for room in solved_rooms]
+    for room, orig_room in zip(new_rooms, room2ds):
+        room._parent = orig_room._parent
+    return new_rooms
+
+
 def solve_story(story_obj):
     """Solve adjacency across a story object."""
-    story_obj._room_2ds = room2d_solve_adj(story_obj.room_2ds)
+    story_obj.room_2ds = cached_solve_adj(story_obj.room_2ds, story_obj.roof)
+
+
+# sticky key under which solved Room2Ds are cached for the Rhino session
+CACHE_KEY = 'dragonfly_solved_room2ds'
+CACHE_MAX_STORIES = 1000  # maximum number of solved Stories held in the cache
 
 
 if all_required_inputs(ghenv.Component) and _run:
+    pair_counts = [0, 0]  # all Room2D pairs and those with overlapping bounds
+    story_counts = [0, 0]  # solved Stories and all Stories
     # if all objects are Room2Ds, then solve adjacency across them
     if all(isinstance(obj, Room2D) for obj in _df_objs):
         df_objs = [r.duplicate() for r in _df_objs]
-        df_objs = room2d_solve_adj(df_objs)
+        df_objs = cached_solve_adj(df_objs)
     else:  # solve adjacency across each story
         df_objs = []
         for obj in _df_objs:
@@ -131,3 +262,10 @@ if all_required_inputs(ghenv.Component) and _run:
                     for story in bldg.unique_stories:
                         solve_story(story)
                 df_objs.append(new_model)
+
+    # report how many Room2D pairs were checked
+    print('Checked {} of {} Room2D pairs with overlapping bounding rectangles '
+          'for adjacency.'.format(pair_counts[1], pair_counts[0]))
+    if incremental_:
+        print('Solved {} of {} Stories. The others were unchanged and taken from '
+              'the cache.'.format(story_counts[0], story_counts[1]))
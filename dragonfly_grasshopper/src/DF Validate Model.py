@@ -47,7 +47,7 @@ to ensure that the model can be simulated correctly in these engines.
 
 ghenv.Component.Name = 'DF Validate Model'
 ghenv.Component.NickName = 'DFValidateModel'
-ghenv.Component.Message = '1.10.0'
+ghenv.Component.Message = '1.10.3'
 ghenv.Component.Category = 'Dragonfly'
 ghenv.Component.SubCategory = '2 :: Serialize'
 ghenv.Component.AdditionalHelpFromDocStrings = '0'
@@ -10,6 +10,11 @@
 """
 Preview any Dragonfly geometry object within the Rhino scene, including all stories
 represented by multipliers
+_
+The Rhino geometry of each Room2D is cached for the Rhino session such that
+only the rooms that have been edited are re-generated when the component
+is re-run. Stories with multipliers are copies of the geometry of the first
+story moved upward.
 -
 
     Args:
@@ -23,11 +28,23 @@ represented by multipliers
 
 ghenv.Component.Name = 'DF Visualize All'
 ghenv.Component.NickName = 'VizAll'
-ghenv.Component.Message = '1.10.0'
+ghenv.Component.Message = '1.10.3'
 ghenv.Component.Category = 'Dragonfly'
 ghenv.Component.SubCategory = '1 :: Visualize'
 ghenv.Component.AdditionalHelpFromDocStrings = '1'
 
+from collections import OrderedDict
+
+try:  # import the module for caching geometry in the Rhino session
+    import scriptcontext as sc
+except ImportError as e:
+    raise ImportError('\nFailed to import scriptcontext:\n\t{}'.format(e))
+
+try:  # import the Rhino dependencies
+    from Rhino.Geometry import Transform
+except ImportError as e:
+    raise ImportError('\nFailed to import Rhino:\n\t{}'.format(e))
+
 try:  # import the ladybug_geometry dependencies
     from ladybug_geometry.geometry3d import Face3D
 except ImportError as e:
@@ -50,16 +67,108 @@ except ImportError as e:
     raise ImportError('\nFailed to import ladybug_rhino:\n\t{}'.format(e))
 
 
-def room_2d_geometry(room_2ds):
-    """Get Rhino geometry from a list of Room2Ds."""
-    room_geo = []
+def cached_geometry(cache, key, create):
+    """Get geometry from a cache, creating it with a function if it is missing."""
+    try:
+        geo = cache.pop(key)  # remove it so that it is re-added as recently used
+    except KeyError:
+        geo = create()
+    cache[key] = geo
+    return geo
+
+
+def moved_geometry(geo, distance):
+    """Get a copy of Rhino geometry that is moved upward by a distance."""
+    new_geo = geo.Duplicate()
+    new_geo.Transform(Transform.Translation(0, 0, distance))
+    return new_geo
+
+
+def roof_key(room, roof_keys):
+    """Get a key for the roofs that can shape the solid of a Room2D.
+
+    Args:
+        room: A Room2D for which the key will be returned.
+        roof_keys: A dictionary of the keys that have been computed for each
+            Story, which is filled as the Stories are evaluated.
+
+    Returns:
+        None if no roof can shape the Room2D, in which case its solid is an
+        extrusion of its floor. Otherwise, a tuple with the geometry of the roofs
+        of all Stories in the Building, which includes the roofs of other Stories
+        that the Room2D may extend into.
+    """
+    if not room.has_parent:
+        return None
+    story = room.parent
+    if story.multiplier != 1 or not (room.is_top_exposed or room._has_room_above):
+        return None
+    try:
+        return roof_keys[id(story)]
+    except KeyError:
+        stories = story.parent.unique_stories if story.has_parent else (story,)
+        key = tuple((st.identifier == story.identifier, st.roof.geometry)
+                    for st in stories
+                    if st.roof is not None) or None
+        roof_keys[id(story)] = key
+        return key
+
+
+def room_2d_solid(room, roof):
+    """Get a Rhino solid from a Room2D and the key of the roofs that can shape it."""
+    if roof is not None:
+        hb_rm, adj_info = room.to_honeybee()
+        return from_polyface3d(hb_rm.geometry)
+    return from_face3d_to_solid(room.floor_geometry, room.floor_to_ceiling_height)
+
+
+def room_2d_geometry(room_2ds, cache, distance=0):
+    """Get Rhino geometry from a list of Room2Ds.
+
+    Args:
+        room_2ds: A list of Room2Ds for which geometry will be returned.
+        cache: An OrderedDict of previously-generated Rhino geometry, which
+            is keyed by the geometry of the Room2Ds and the roofs that can
+            shape them. Geometry that is not found in the cache will be
+            created and added to it.
+        distance: A number for the distance that the geometry is moved upward
+            from the Room2Ds, which is used for stories with multipliers.
+    """
+    room_geo, roof_keys = [], {}
     for room in room_2ds:
-        if room.has_parent and room.parent.roof is not None:
-            hb_rm, adj_info = room.to_honeybee()
-            room_geo.append(from_polyface3d(hb_rm.geometry))
-        else:
-            room_geo.append(
-                from_face3d_to_solid(room.floor_geometry, room.floor_to_ceiling_height))
+        roof = roof_key(room, roof_keys)
+        key = (room.floor_geometry, room.floor_to_ceiling_height, roof)
+        geo = cached_geometry(cache, key, lambda: room_2d_solid(room, roof))
+        if distance != 0:
+            geo = cached_geometry(
+                cache, key + (distance,), lambda: moved_geometry(geo, distance))
+        room_geo.append(geo)
+    return room_geo
+
+
+def single_story(story):
+    """Get a copy of a Story with a multiplier of 1 that still belongs to its Building.
+
+    The roofs shape this copy in the same way that they shape each of the floors
+    that the multiplier of the original Story represents.
+    """
+    new_story = story.duplicate()
+    new_story.multiplier = 1
+    new_story._parent = story._parent
+    return new_story
+
+
+def building_geometry(building, cache):
+    """Get Rhino geometry from a Building, including stories with multipliers."""
+    room_geo = []
+    for story in building.unique_stories:
+        multiplier = story.multiplier
+        if multiplier != 1:
+            story = single_story(story)
+        room_geo.extend(room_2d_geometry(story.room_2ds, cache))
+        for i in range(multiplier - 1):
+            distance = story.floor_to_floor_height * (i + 1)
+            room_geo.extend(room_2d_geometry(story.room_2ds, cache, distance))
     return room_geo
 
 
@@ -81,25 +190,37 @@ def context_shade_geometry(context_shades):
     return shds
 
 
+# sticky key under which the Rhino geometry of Room2Ds is cached
+CACHE_KEY = 'dragonfly_room_2d_solids'
+# maximum number of Rhino geometries that are kept in the cache
+CACHE_MAX_GEOMETRY = 50000
+
+
 if all_required_inputs(ghenv.Component):
     # lists of rhino geometry to be filled with content
     geo = []
+    try:
+        cache = sc.sticky[CACHE_KEY]
+    except KeyError:
+        cache = sc.sticky[CACHE_KEY] = OrderedDict()
 
     # loop through all objects and add them
     for df_obj in _df_objs:
         if isinstance(df_obj, Model):
-            rooms = []
             for bldg in df_obj.buildings:
-                rooms.extend(bldg.all_room_2ds())
-            geo.extend(room_2d_geometry(rooms))
+                geo.extend(building_geometry(bldg, cache))
             geo.extend(room_3d_geometry(df_obj.room_3ds))
             geo.extend(context_shade_geometry(df_obj.context_shades))
         elif isinstance(df_obj, Building):
-            geo.extend(room_2d_geometry(df_obj.all_room_2ds()))
+            geo.extend(building_geometry(df_obj, cache))
             geo.extend(room_3d_geometry(df_obj.room_3ds))
         elif isinstance(df_obj, Story):
-            geo.extend(room_2d_geometry(df_obj.room_2ds))
+            geo.extend(room_2d_geometry(df_obj.room_2ds, cache))
         elif isinstance(df_obj, Room2D):
-            geo.extend(room_2d_geometry([df_obj]))
+            geo.extend(room_2d_geometry([df_obj], cache))
         elif isinstance(df_obj, ContextShade):
             geo.extend(context_shade_geometry([df_obj]))
+
+    # evict the least recently used geometry from the cache
+    while len(cache) > CACHE_MAX_GEOMETRY:
+        cache.popitem(last=False)
@@ -12,12 +12,29 @@ Quickly preview any Dragonfly geometry object within the Rhino scene.
 _
 Any stories represented by multipliers will not be included in the output, allowing
 for a faster preview of large lists of objects but without the ability to check the
-multipliers of objects.
+multipliers of objects. The Rhino geometry of each Room2D is also cached for
+the Rhino session such that only the rooms that have been edited are
+re-generated when the component is re-run.
 -
 
     Args:
         _df_objs: A Dragonfly Model, Building, Story, Room2D, or ContextShade to
             be previewed in the Rhino scene.
+        lod_dist_: An optional list of two numbers for distances from the focus_
+            in Rhino model units, which will be used to preview the Buildings
+            of the input Models with levels of detail. This is useful for
+            previewing whole-city Models with many Buildings. Buildings within
+            the first distance will be previewed with all of their Room2Ds.
+            Buildings beyond the second distance will be previewed as a single
+            extruded footprint. Buildings between the two distances will be
+            previewed as an extruded footprint for each Story. Only one number
+            can be input to skip the Story level of detail. If None, all Buildings
+            will be previewed with all of their Room2Ds. (Default: None).
+        focus_: An optional point from which the distance to each Building is
+            evaluated when using the lod_dist_. If None, the camera location
+            of the active Rhino viewport will be used, in which case the
+            component must be re-run to update the levels of detail after
+            the camera moves. (Default: None).
 
     Returns:
         geo: The Rhino version of the Dragonfly geometry object, which will be
@@ -26,11 +43,19 @@ multipliers of objects.
 
 ghenv.Component.Name = 'DF Visualize Quick'
 ghenv.Component.NickName = 'VizQuick'
-ghenv.Component.Message = '1.10.0'
+ghenv.Component.Message = '1.10.4'
 ghenv.Component.Category = 'Dragonfly'
 ghenv.Component.SubCategory = '1 :: Visualize'
 ghenv.Component.AdditionalHelpFromDocStrings = '1'
 
+import math
+from collections import OrderedDict
+
+try:  # import the module for caching geometry in the Rhino session
+    import scriptcontext as sc
+except ImportError as e:
+    raise ImportError('\nFailed to import scriptcontext:\n\t{}'.format(e))
+
 try:  # import the ladybug_geometry dependencies
     from ladybug_geometry.geometry3d import Face3D
 except ImportError as e:
@@ -46,26 +71,162 @@ except ImportError as e:
     raise ImportError('\nFailed to import dragonfly:\n\t{}'.format(e))
 
 try:  # import the ladybug_rhino dependencies
-    from ladybug_rhino.fromgeometry import from_face3d, from_face3d_to_solid , \
+    from ladybug_rhino.fromgeometry import from_face3d, from_face3d_to_solid, \
         from_polyface3d, from_mesh3d
+    from ladybug_rhino.togeometry import to_point3d
+    from ladybug_rhino.viewport import viewport_by_name
+    from ladybug_rhino.config import current_tolerance
     from ladybug_rhino.grasshopper import all_required_inputs
 except ImportError as e:
     raise ImportError('\nFailed to import ladybug_rhino:\n\t{}'.format(e))
 
 
-def room_2d_geometry(room_2ds):
-    """Get Rhino geometry from a list of Room2Ds."""
-    room_geo = []
+def cached_geometry(cache, key, create):
+    """Get geometry from a cache, creating it with a function if it is missing."""
+    try:
+        geo = cache.pop(key)  # remove it so that it is re-added as recently used
+    except KeyError:
+        geo = create()
+    cache[key] = geo
+    return geo
+
+
+def roof_key(room, roof_keys):
+    """Get a key for the roofs that can shape the solid of a Room2D.
+
+    Args:
+        room: A Room2D for which the key will be returned.
+        roof_keys: A dictionary of the keys that have been computed for each
+            Story, which is filled as the Stories are evaluated.
+
+    Returns:
+        None if no roof can shape the Room2D, in which case its solid is an
+        extrusion of its floor. Otherwise, a tuple with the geometry of the roofs
+        of all Stories in the Building, which includes the roofs of other Stories
+        that the Room2D may extend into.
+    """
+    if not room.has_parent:
+        return None
+    story = room.parent
+    if story.multiplier != 1 or not (room.is_top_exposed or room._has_room_above):
+        return None
+    try:
+        return roof_keys[id(story)]
+    except KeyError:
+        stories = story.parent.unique_stories if story.has_parent else (story,)
+        key = tuple((st is story, st.roof.geometry) for st in stories
+                    if st.roof is not None) or None
+        roof_keys[id(story)] = key
+        return key
+
+
+def room_2d_solid(room, roof):
+    """Get a Rhino solid from a Room2D and the key of the roofs that can shape it."""
+    if roof is not None:
+        hb_rm, adj_info = room.to_honeybee()
+        return from_polyface3d(hb_rm.geometry)
+    return from_face3d_to_solid(room.floor_geometry, room.floor_to_ceiling_height)
+
+
+def room_2d_geometry(room_2ds, cache):
+    """Get Rhino geometry from a list of Room2Ds.
+
+    Args:
+        room_2ds: A list of Room2Ds for which geometry will be returned.
+        cache: An OrderedDict of previously-generated Rhino geometry, which
+            is keyed by the geometry of the Room2Ds and the roofs that can
+            shape them. Geometry that is not found in the cache will be
+            created and added to it.
+    """
+    room_geo, roof_keys = [], {}
     for room in room_2ds:
-        if room.has_parent and room.parent.roof is not None:
-            hb_rm, adj_info = room.to_honeybee()
-            room_geo.append(from_polyface3d(hb_rm.geometry))
-        else:
-            room_geo.append(
-                from_face3d_to_solid(room.floor_geometry, room.floor_to_ceiling_height))
+        roof = roof_key(room, roof_keys)
+        key = (room.floor_geometry, room.floor_to_ceiling_height, roof)
+        room_geo.append(cached_geometry(cache, key, lambda: room_2d_solid(room, roof)))
     return room_geo
 
 
+def unique_height(building):
+    """Get the height of the top of the unique Stories of a Building.
+
+    Unlike the Building height, this excludes the Stories represented by
+    multipliers, which are not included in the preview.
+    """
+    return max(story.floor_height + story.floor_to_floor_height
+               for story in building.unique_stories)
+
+
+def building_index(buildings):
+    """Get an index of the bounding boxes of Buildings for levels of detail.
+
+    Args:
+        buildings: A list of Buildings to be indexed. Buildings without Room2Ds
+            are excluded from the index.
+
+    Returns:
+        A dictionary with the ids of the Buildings as keys and dictionaries
+        as values. Each dictionary has the building, the min and max tuples
+        of its bounding box, and placeholders for its story slabs and mass,
+        which are generated when the Building is first previewed with them.
+    """
+    index = {}
+    for bldg in buildings:
+        if not bldg.has_room_2ds:
+            continue
+        b_min, b_max = bldg.min, bldg.max
+        z_min = min(story.floor_height for story in bldg.unique_stories)
+        index[id(bldg)] = {
+            'building': bldg, 'slabs': None, 'mass': None,
+            'min': (b_min.x, b_min.y, z_min),
+            'max': (b_max.x, b_max.y, unique_height(bldg))
+        }
+    return index
+
+
+def story_slabs(building, tolerance):
+    """Get Rhino geometry for a Building as an extruded footprint for each Story."""
+    slabs = []
+    for story in building.unique_stories:
+        for face in story.footprint(tolerance):
+            slabs.append(from_face3d_to_solid(face, story.floor_to_floor_height))
+    return slabs
+
+
+def building_mass(building, tolerance):
+    """Get Rhino geometry for a Building as a single extruded footprint."""
+    height = unique_height(building)
+    return [from_face3d_to_solid(face, height - face.min.z)
+            for face in building.footprint(tolerance)]
+
+
+def lod_geometry(entry, focus, lod_dist, cache, tolerance):
+    """Get Rhino geometry for an indexed Building at a level of detail.
+
+    Args:
+        entry: A dictionary for the Building from the building_index.
+        focus: A tuple for the point from which the distance is evaluated.
+        lod_dist: A tuple with the two distances that set the levels of detail.
+        cache: An OrderedDict of previously-generated Rhino geometry for Room2Ds.
+        tolerance: The tolerance for computing footprints.
+    """
+    # compute the distance between the focus and the bounding box
+    b_min, b_max = entry['min'], entry['max']
+    dist = math.sqrt(sum(max(mn - f, 0, f - mx) ** 2
+                         for f, mn, mx in zip(focus, b_min, b_max)))
+
+    # get the geometry at the level of detail
+    bldg = entry['building']
+    if dist <= lod_dist[0]:
+        return room_2d_geometry(bldg.unique_room_2ds, cache)
+    elif dist <= lod_dist[1]:
+        if entry['slabs'] is None:
+            entry['slabs'] = story_slabs(bldg, tolerance)
+        return entry['slabs']
+    if entry['mass'] is None:
+        entry['mass'] = building_mass(bldg, tolerance)
+    return entry['mass']
+
+
 def room_3d_geometry(room_3ds):
     """Get Rhino geometry from a list of 3D Rooms."""
     room_geo = []
@@ -84,22 +245,69 @@ def context_shade_geometry(context_shades):
     return shds
 
 
+# sticky key under which the Rhino geometry of Room2Ds is cached
+CACHE_KEY = 'dragonfly_room_2d_solids'
+# maximum number of Rhino geometries that are kept in the cache
+CACHE_MAX_GEOMETRY = 50000
+# sticky key under which the building index for levels of detail is cached
+INDEX_KEY = 'dragonfly_lod_index'
+
+
 if all_required_inputs(ghenv.Component):
     # lists of rhino geometry to be filled with content
     geo = []
+    try:
+        cache = sc.sticky[CACHE_KEY]
+    except KeyError:
+        cache = sc.sticky[CACHE_KEY] = OrderedDict()
+
+    # get the index of Buildings if levels of detail are requested
+    index = None
+    if len(lod_dist_) != 0:
+        lod_dist = (min(lod_dist_), max(lod_dist_))
+        focus = to_point3d(focus_) if focus_ is not None else \
+            to_point3d(viewport_by_name().CameraLocation)
+        focus = (focus.x, focus.y, focus.z)
+        tolerance = current_tolerance()
+        buildings = []
+        for df_obj in _df_objs:
+            if isinstance(df_obj, Model):
+                buildings.extend(df_obj.buildings)
+            elif isinstance(df_obj, Building):
+                buildings.append(df_obj)
+        index_key = '{}_{}'.format(INDEX_KEY, ghenv.Component.InstanceGuid)
+        cached = sc.sticky.get(index_key)
+        if cached is None or len(cached[0]) != len(buildings) or \
+                not all(a is b for a, b in zip(cached[0], buildings)):
+            cached = sc.sticky[index_key] = (buildings, building_index(buildings))
+        index = cached[1]
 
     # loop through all objects and add them
     for df_obj in _df_objs:
         if isinstance(df_obj, Model):
-            geo.extend(room_2d_geometry(df_obj.room_2ds))
+            if index is None:
+                geo.extend(room_2d_geometry(df_obj.room_2ds, cache))
+            else:
+                for bldg in df_obj.buildings:
+                    if bldg.has_room_2ds:
+                        geo.extend(lod_geometry(
+                            index[id(bldg)], focus, lod_dist, cache, tolerance))
             geo.extend(room_3d_geometry(df_obj.room_3ds))
             geo.extend(context_shade_geometry(df_obj.context_shades))
         elif isinstance(df_obj, Building):
-            geo.extend(room_2d_geometry(df_obj.unique_room_2ds))
+            if index is None or not df_obj.has_room_2ds:
+                geo.extend(room_2d_geometry(df_obj.unique_room_2ds, cache))
+            else:
+                geo.extend(lod_geometry(
+                    index[id(df_obj)], focus, lod_dist, cache, tolerance))
             geo.extend(room_3d_geometry(df_obj.room_3ds))
         elif isinstance(df_obj, Story):
-            geo.extend(room_2d_geometry(df_obj.room_2ds))
+            geo.extend(room_2d_geometry(df_obj.room_2ds, cache))
         elif isinstance(df_obj, Room2D):
-            geo.extend(room_2d_geometry([df_obj]))
+            geo.extend(room_2d_geometry([df_obj], cache))
         elif isinstance(df_obj, ContextShade):
             geo.extend(context_shade_geometry([df_obj]))
+
+    # evict the least recently used geometry from the cache
+    while len(cache) > CACHE_MAX_GEOMETRY:
+        cache.popitem(last=False)
@@ -10,6 +10,11 @@
 """
 Quickly preview any Dragonfly geometry object as a wire frame within the Rhino
 scene, including all stories represented by multipliers
+_
+The Rhino geometry of each Room2D is cached for the Rhino session such that
+only the rooms that have been edited are re-generated when the component
+is re-run. Stories with multipliers are copies of the geometry of the first
+story moved upward.
 -
 
     Args:
@@ -23,11 +28,23 @@ scene, including all stories represented by multipliers
 
 ghenv.Component.Name = 'DF Visualize Wireframe'
 ghenv.Component.NickName = 'VizWireF'
-ghenv.Component.Message = '1.10.0'
+ghenv.Component.Message = '1.10.1'
 ghenv.Component.Category = 'Dragonfly'
 ghenv.Component.SubCategory = '1 :: Visualize'
 ghenv.Component.AdditionalHelpFromDocStrings = '1'
 
+from collections import OrderedDict
+
+try:  # import the module for caching geometry in the Rhino session
+    import scriptcontext as sc
+except ImportError as e:
+    raise ImportError('\nFailed to import scriptcontext:\n\t{}'.format(e))
+
+try:  # import the Rhino dependencies
+    from Rhino.Geometry import Transform
+except ImportError as e:
+    raise ImportError('\nFailed to import Rhino:\n\t{}'.format(e))
+
 try:  # import the ladybug_geometry dependencies
     from ladybug_geometry.geometry3d import Face3D
 except ImportError as e:
@@ -55,10 +72,59 @@ except ImportError as e:
     raise ImportError('\nFailed to import ladybug_rhino:\n\t{}'.format(e))
 
 
-def room_2d_geometry(room_2ds):
-    """Get Rhino geometry curves from a list of Room2Ds."""
-    return [curve for room in room_2ds for curve in
-            from_face3d_to_wireframe(room.floor_geometry)]
+def cached_geometry(cache, key, create):
+    """Get geometry from a cache, creating it with a function if it is missing."""
+    try:
+        geo = cache.pop(key)  # remove it so that it is re-added as recently used
+    except KeyError:
+        geo = create()
+    cache[key] = geo
+    return geo
+
+
+def moved_geometry(geos, distance):
+    """Get copies of a list of Rhino geometry that are moved upward by a distance."""
+    xform = Transform.Translation(0, 0, distance)
+    new_geos = []
+    for geo in geos:
+        new_geo = geo.Duplicate()
+        new_geo.Transform(xform)
+        new_geos.append(new_geo)
+    return new_geos
+
+
+def room_2d_geometry(room_2ds, cache, distance=0):
+    """Get Rhino geometry curves from a list of Room2Ds.
+
+    Args:
+        room_2ds: A list of Room2Ds for which geometry will be returned.
+        cache: An OrderedDict of previously-generated Rhino geometry, which
+            is keyed by the floor geometry of the Room2Ds. Geometry that is
+            not found in the cache will be created and added to it.
+        distance: A number for the distance that the geometry is moved upward
+            from the Room2Ds, which is used for stories with multipliers.
+    """
+    room_geo = []
+    for room in room_2ds:
+        flr_geo = room.floor_geometry
+        curves = cached_geometry(
+            cache, flr_geo, lambda: from_face3d_to_wireframe(flr_geo))
+        if distance != 0:
+            curves = cached_geometry(
+                cache, (flr_geo, distance), lambda: moved_geometry(curves, distance))
+        room_geo.extend(curves)
+    return room_geo
+
+
+def building_geometry(building, cache):
+    """Get Rhino geometry from a Building, including stories with multipliers."""
+    room_geo = []
+    for story in building.unique_stories:
+        room_geo.extend(room_2d_geometry(story.room_2ds, cache))
+        for i in range(story.multiplier - 1):
+            distance = story.floor_to_floor_height * (i + 1)
+            room_geo.extend(room_2d_geometry(story.room_2ds, cache, distance))
+    return room_geo
 
 
 def room_3d_geometry(room_3ds):
@@ -82,25 +148,37 @@ def context_shade_geometry(context_shades):
     return shds
 
 
+# sticky key under which the Rhino geometry of Room2Ds is cached
+CACHE_KEY = 'dragonfly_room_2d_wireframes'
+# maximum number of Rhino geometries that are kept in the cache
+CACHE_MAX_GEOMETRY = 50000
+
+
 if all_required_inputs(ghenv.Component):
     # lists of rhino geometry to be filled with content
     geo = []
+    try:
+        cache = sc.sticky[CACHE_KEY]
+    except KeyError:
+        cache = sc.sticky[CACHE_KEY] = OrderedDict()
 
     # loop through all objects and add them
     for df_obj in _df_objs:
         if isinstance(df_obj, Model):
-            rooms = []
             for bldg in df_obj.buildings:
-                rooms.extend(bldg.all_room_2ds())
-            geo.extend(room_2d_geometry(rooms))
+                geo.extend(building_geometry(bldg, cache))
             geo.extend(room_3d_geometry(df_obj.room_3ds))
             geo.extend(context_shade_geometry(df_obj.context_shades))
         elif isinstance(df_obj, Building):
-            geo.extend(room_2d_geometry(df_obj.all_room_2ds()))
+            geo.extend(building_geometry(df_obj, cache))
             geo.extend(room_3d_geometry(df_obj.room_3ds))
         elif isinstance(df_obj, Story):
-            geo.extend(room_2d_geometry(df_obj.room_2ds))
+            geo.extend(room_2d_geometry(df_obj.room_2ds, cache))
         elif isinstance(df_obj, Room2D):
-            geo.extend(room_2d_geometry([df_obj]))
+            geo.extend(room_2d_geometry([df_obj], cache))
         elif isinstance(df_obj, ContextShade):
             geo.extend(context_shade_geometry([df_obj]))
+
+    # evict the least recently used geometry from the cache
+    while len(cache) > CACHE_MAX_GEOMETRY:
+        cache.popitem(last=False)